@@ -0,0 +1 @@
+"""Benchmarks for the nl2ltl project."""
@@ -0,0 +1,220 @@
+"""Deterministic local stand-ins for the OpenAI API and the Rasa agent."""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from nl2ltl.engines.gpt.core import PROMPT_PATH
+
+_EXAMPLE = re.compile(r"NL: (.*)\nPATTERN: (.*)\nSYMBOLS: (.*)")
+_ALLOWED_SYMBOLS = re.compile(r"ALLOWED_SYMBOLS: (.*)")
+_PACKED_UTTERANCE = re.compile(r"^NL (\d+): (.*)$", re.MULTILINE)
+_WORD_CHUNK = re.compile(r"\S+\s*|\s+")
+_KEYWORD_PATTERNS: List[Tuple[str, str]] = [
+    (r"\b(right|straight|immediately)\b", "chainResponse"),
+    (r"\b(whenever|every time|for every)\b", "response"),
+    (r"\b(twice|two times)\b", "existenceTwo"),
+    (r"\bif\b", "respondedExistence"),
+]
+
+
+class FakeTranslator:
+    """Deterministic NL to (pattern, symbols) translator seeded with the examples of the GPT prompt."""
+
+    def __init__(self, prompt: Optional[str] = None):
+        """Initialize the translator."""
+        if prompt is None:
+            with open(PROMPT_PATH) as f:
+                prompt = json.load(f)["prompt"]
+        self._examples: Dict[str, Tuple[str, List[str]]] = {
+            nl.strip().lower(): (pattern.strip(), symbols.strip().split(", "))
+            for nl, pattern, symbols in _EXAMPLE.findall(prompt)
+        }
+        allowed = _ALLOWED_SYMBOLS.search(prompt)
+        self._symbols = sorted(allowed.group(1).split(", ") if allowed else [], key=len, reverse=True)
+
+    def translate(self, utterance: str) -> Tuple[str, List[str]]:
+        """Translate an utterance into a pattern name and its symbols."""
+        example = self._examples.get(utterance.strip().lower())
+        if example is not None:
+            return example
+        symbols = sorted((utterance.find(symbol), symbol) for symbol in self._symbols if symbol in utterance)
+        pattern = next((p for regex, p in _KEYWORD_PATTERNS if re.search(regex, utterance, re.IGNORECASE)), "existence")
+        names = [symbol for _, symbol in symbols] or ["Slack"]
+        if pattern != "existence" and pattern != "existenceTwo" and len(names) < 2:
+            pattern = "existence"
+        return pattern, names
+
+
+class _FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Request handler implementing the chat completion and completion endpoints."""
+
+    translator: FakeTranslator
+    latency: float = 0.0
+    chunk_latency: float = 0.0
+    trailing: str = ""
+
+    def log_message(self, *args: Any) -> None:
+        """Do not log requests."""
+
+    def do_POST(self) -> None:
+        """Answer a completion request."""
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path.endswith("/chat/completions"):
+            text = "".join(message["content"] for message in body["messages"])
+        elif self.path.endswith("/completions"):
+            text = body["prompt"]
+        else:
+            self.send_error(404)
+            return
+        packed = _PACKED_UTTERANCE.findall(text)
+        if packed:
+            blocks = []
+            for index, utterance in packed:
+                pattern, symbols = self.translator.translate(utterance)
+                blocks.append(f"PATTERN {index}: {pattern}\nSYMBOLS {index}: {', '.join(symbols)}")
+            content = "\n\n".join(blocks)
+        else:
+            utterance = text.rstrip("\n").rsplit("NL: ", 1)[-1]
+            pattern, symbols = self.translator.translate(utterance)
+            content = f"PATTERN: {pattern}\nSYMBOLS: {', '.join(symbols)}"
+            if self.trailing:
+                content += "\n" + self.trailing
+        if self.latency:
+            time.sleep(self.latency)
+        chat = self.path.endswith("/chat/completions")
+        if body.get("stream"):
+            self._stream(body, content, chat)
+        else:
+            if self.chunk_latency:
+                time.sleep(self.chunk_latency * len(_WORD_CHUNK.findall(content)))
+            self._reply(body, content, chat, prompt_chars=len(text))
+
+    def _stream(self, body: Dict[str, Any], content: str, chat: bool) -> None:
+        """Send an OpenAI-compatible stream of server-sent events, one word per chunk."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        try:
+            for piece in _WORD_CHUNK.findall(content):
+                choice: Dict[str, Any] = {"index": 0, "finish_reason": None, "logprobs": None}
+                if chat:
+                    choice["delta"] = {"role": "assistant", "content": piece}
+                else:
+                    choice["text"] = piece
+                chunk = {
+                    "id": "cmpl-fake",
+                    "object": "chat.completion.chunk" if chat else "text_completion",
+                    "created": 0,
+                    "model": body["model"],
+                    "choices": [choice],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                if self.chunk_latency:
+                    time.sleep(self.chunk_latency)
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # the client cancelled the stream
+            pass
+
+    def _reply(self, body: Dict[str, Any], content: str, chat: bool, prompt_chars: int) -> None:
+        """Send an OpenAI-compatible response."""
+        choice: Dict[str, Any] = {"index": 0, "finish_reason": "stop", "logprobs": None}
+        if chat:
+            choice["message"] = {"role": "assistant", "content": content}
+        else:
+            choice["text"] = content
+        payload = {
+            "id": "cmpl-fake",
+            "object": "chat.completion" if chat else "text_completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [choice],
+            "usage": {
+                "prompt_tokens": prompt_chars // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": prompt_chars // 4 + len(content) // 4,
+            },
+        }
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeOpenAIServer:
+    """A local OpenAI-compatible server answering deterministically, usable as a context manager."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        chunk_latency: float = 0.0,
+        trailing: str = "",
+    ):
+        """Initialize the server.
+
+        :param host: the host to bind.
+        :param port: the port to bind; 0 picks a free port.
+        :param latency: the artificial latency of each response, in seconds.
+        :param chunk_latency: the artificial generation time of each word, in seconds; streams send one word per chunk.
+        :param trailing: text generated after the SYMBOLS line of single-utterance answers.
+        """
+        attributes = {
+            "translator": FakeTranslator(),
+            "latency": latency,
+            "chunk_latency": chunk_latency,
+            "trailing": trailing,
+        }
+        handler = type("Handler", (_FakeOpenAIHandler,), attributes)
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        """Get the base URL of the OpenAI-compatible API."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        """Start the server."""
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class StubRasaAgent:
+    """A stand-in for rasa.core.agent.Agent returning deterministic parse results."""
+
+    model_id = "stub"
+
+    def __init__(self, translator: Optional[FakeTranslator] = None):
+        """Initialize the agent."""
+        self._translator = translator or FakeTranslator()
+
+    async def parse_message(self, message: str) -> Dict[str, Any]:
+        """Parse a message like the DIET pipeline would."""
+        pattern, symbols = self._translator.translate(message)
+        others = [name for name in ("existence", "response", "chainResponse", "respondedExistence") if name != pattern]
+        ranking = [{"name": pattern, "confidence": 0.8}] + [
+            {"name": name, "confidence": round(0.2 / len(others), 4)} for name in others
+        ]
+        return {
+            "text": message,
+            "intent": ranking[0],
+            "entities": [
+                {"entity": "connector", "value": symbol, "confidence_entity": 0.99, "start": 0, "end": len(symbol)}
+                for symbol in symbols
+            ],
+            "intent_ranking": ranking,
+        }
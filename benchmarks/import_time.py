@@ -0,0 +1,80 @@
+"""Startup-time regression benchmark.
+
+Measure the cumulative import time of nl2ltl modules with `python -X importtime`, and check that
+heavy optional dependencies are not imported eagerly.
+
+Usage:
+
+    python -m benchmarks.import_time [--runs 5] [--max-ms 50] [--output import_time.json]
+
+"""
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Sequence
+
+MODULES: Sequence[str] = ("nl2ltl", "nl2ltl.engines.gpt.core", "nl2ltl.engines.rasa.core")
+HEAVY_MODULES: Sequence[str] = ("openai", "httpx", "rasa", "tensorflow")
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def _import_profile(module: str) -> Dict[str, int]:
+    """Import a module in a fresh interpreter and return the cumulative import time of each module, in us."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile: Dict[str, int] = {}
+    for line in process.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            profile[match.group(4)] = int(match.group(2))
+    return profile
+
+
+def measure(module: str, runs: int) -> Dict:
+    """Measure the import time of a module over several runs."""
+    timings: List[float] = []
+    heavy: List[str] = []
+    for _ in range(runs):
+        profile = _import_profile(module)
+        timings.append(profile[module] / 1000)
+        heavy = sorted(name for name in profile if name in HEAVY_MODULES)
+    return {
+        "module": module,
+        "runs": runs,
+        "min_ms": min(timings),
+        "median_ms": statistics.median(timings),
+        "heavy_imports": heavy,
+    }
+
+
+def main(argv: Sequence[str] = None) -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="number of fresh interpreters per module")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if a median import time exceeds this bound")
+    parser.add_argument("--output", default=None, help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = [measure(module, args.runs) for module in MODULES]
+    report = json.dumps({"benchmark": "import_time", "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    print(report)
+
+    failed = [r for r in results if r["heavy_imports"] or (args.max_ms is not None and r["median_ms"] > args.max_ms)]
+    for result in failed:
+        print(f"regression: {result['module']} {result}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
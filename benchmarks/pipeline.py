@@ -0,0 +1,207 @@
+"""Benchmark of the translation pipeline, stage by stage.
+
+The GPT engine runs against a local, deterministic OpenAI-compatible server, and the Rasa pipeline against a stub
+agent, so that only the overhead of nl2ltl itself is measured.
+
+Usage:
+
+    python -m benchmarks.pipeline [--number 200] [--repeat 5] [--output pipeline.json]
+                                  [--baseline previous.json --tolerance 0.25]
+
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from typing import Callable, Dict, List, Optional, Sequence
+
+from pylogics.syntax.ltl import Atomic
+
+from benchmarks.fakes import FakeOpenAIServer, StubRasaAgent
+from nl2ltl.declare.declare import ChainResponse, Existence, NotCoExistence, Precedence, Response
+from nl2ltl.engines.grounding import ground_response
+from nl2ltl.engines.rasa.core import _process_utterance as rasa_process_utterance
+from nl2ltl.engines.rasa.helpers import _EventLoopThread
+from nl2ltl.engines.rasa.output import parse_rasa_output, parse_rasa_result
+from nl2ltl.engines.rules.core import RuleEngine
+from nl2ltl.engines.utils import _get_formulas
+from nl2ltl.filters.simple_filters import GreedyFilter
+
+UTTERANCES: Sequence[str] = (
+    "whenever I get a Slack, send a Gmail.",
+    "Invite Sales employees.",
+    "If a new Eventbrite is created, alert me through Slack.",
+    "send me a Slack whenever I get a Gmail.",
+)
+
+
+def _time(function: Callable[[], object], number: int, repeat: int) -> Dict[str, float]:
+    """Time a function and return per-call statistics, in microseconds."""
+    timings = [t / number * 1e6 for t in timeit.repeat(function, number=number, repeat=repeat)]
+    return {"number": number, "repeat": repeat, "min_us": min(timings), "median_us": statistics.median(timings)}
+
+
+def _gpt_stages(base_url: str, number: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Benchmark the GPT stages against the fake server."""
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "fake")
+    from openai.types import Completion
+    from openai.types.chat import ChatCompletion
+
+    from nl2ltl.engines.gpt.core import GPTEngine, OperationModes, _get_client
+    from nl2ltl.engines.gpt.output import parse_gpt_output, parse_gpt_result
+
+    engine = GPTEngine()
+    request = dict(model=engine.model, temperature=engine.temperature, max_tokens=200)
+    chat = _get_client().chat.completions.create(
+        messages=[{"role": "user", "content": "NL: " + UTTERANCES[0]}], **request
+    )
+    completion = _get_client().completions.create(prompt="NL: " + UTTERANCES[0], **request)
+    assert isinstance(chat, ChatCompletion) and isinstance(completion, Completion)
+    gpt_output = parse_gpt_output(chat, OperationModes.CHAT.value)
+
+    results = {
+        "parse_gpt_output[chat]": _time(lambda: parse_gpt_output(chat, OperationModes.CHAT.value), number, repeat),
+        "parse_gpt_output[completion]": _time(
+            lambda: parse_gpt_output(completion, OperationModes.COMPLETION.value), number, repeat
+        ),
+        "parse_gpt_result": _time(lambda: parse_gpt_result(gpt_output), number, repeat),
+        "parse_gpt_result[greedy]": _time(lambda: parse_gpt_result(gpt_output, GreedyFilter()), number, repeat),
+    }
+    network_number = max(1, number // 10)
+    results["gpt_translate[end_to_end]"] = _time(lambda: engine.translate(UTTERANCES[0]), network_number, repeat)
+    results["gpt_translate_many[end_to_end]"] = _time(lambda: engine.translate_many(UTTERANCES), network_number, repeat)
+    packed_engine = GPTEngine(pack_size=len(UTTERANCES))
+    results["gpt_translate_many[packed]"] = _time(
+        lambda: packed_engine.translate_many(UTTERANCES), network_number, repeat
+    )
+    results["gpt_atranslate_many[end_to_end]"] = _time(
+        lambda: asyncio.run(engine.atranslate_many(UTTERANCES)), network_number, repeat
+    )
+    return results
+
+
+def _rasa_stages(number: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Benchmark the Rasa stages against the stub agent."""
+    agent = StubRasaAgent()
+    prediction = asyncio.run(agent.parse_message(UTTERANCES[0]))
+    rasa_output = parse_rasa_output(prediction)
+    event_loop = _EventLoopThread()
+    try:
+        return {
+            "parse_rasa_output": _time(lambda: parse_rasa_output(prediction), number, repeat),
+            "parse_rasa_result": _time(lambda: parse_rasa_result(rasa_output), number, repeat),
+            "parse_rasa_result[greedy]": _time(lambda: parse_rasa_result(rasa_output, GreedyFilter()), number, repeat),
+            "rasa_translate[end_to_end]": _time(
+                lambda: rasa_process_utterance(UTTERANCES[0], agent, None, event_loop), number, repeat
+            ),
+        }
+    finally:
+        event_loop.close()
+
+
+def _embedding_stages(number: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Benchmark the embedding engine, if NumPy is installed."""
+    if importlib.util.find_spec("numpy") is None:
+        return {}
+    from nl2ltl.engines.embedding.core import EmbeddingEngine
+
+    engine = EmbeddingEngine()
+    batch = list(UTTERANCES) * 25
+    return {
+        "embedding_rank": _time(lambda: engine.rank(UTTERANCES[:1]), number, repeat),
+        "embedding_rank[batch_100]": _time(lambda: engine.rank(batch), number, repeat),
+        "embedding_translate[end_to_end]": _time(lambda: engine.translate(UTTERANCES[0]), number, repeat),
+    }
+
+
+def _core_stages(number: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Benchmark the engine-independent stages."""
+    connectors = {"Slack": 1.0, "Gmail": 1.0}
+    slack, gmail = Atomic("slack"), Atomic("gmail")
+    output = {
+        Response(slack, gmail): 0.8,
+        Existence(slack): 0.1,
+        ChainResponse(slack, gmail): 0.05,
+        Precedence(gmail, slack): 0.03,
+        NotCoExistence(slack, gmail): 0.02,
+    }
+    templates = list(output)
+    results = {
+        "_get_formulas[exact]": _time(lambda: _get_formulas("Response", connectors), number, repeat),
+        "_get_formulas[case_insensitive]": _time(lambda: _get_formulas("response", connectors), number, repeat),
+        "_get_formulas[fuzzy]": _time(lambda: _get_formulas("reponse", connectors), number, repeat),
+        "grounding": _time(lambda: ground_response(connectors), number, repeat),
+        "GreedyFilter.enforce": _time(lambda: GreedyFilter.enforce(output, connectors), number, repeat),
+    }
+    rule_engine = RuleEngine()
+    results["symbols_extract"] = _time(lambda: rule_engine.extractor.extract(UTTERANCES[3]), number, repeat)
+    results["rules_translate[fast_path]"] = _time(lambda: rule_engine.translate(UTTERANCES[3]), number, repeat)
+    for name in ("to_ltlf", "to_ppltl", "to_english"):
+        results[f"{name}[memoized]"] = _time(lambda: [getattr(t, name)() for t in templates], number, repeat)
+        results[f"{name}[uncached]"] = _time(
+            lambda: [getattr(type(t), name).__wrapped__(t) for t in templates], number, repeat
+        )
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    """Get the current git commit, if any."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _regressions(results: Dict[str, Dict[str, float]], baseline_path: str, tolerance: float) -> List[str]:
+    """Compare the results with a baseline report, and return the stages slower than the tolerance."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    return [
+        f"{stage}: {result['median_us']:.1f}us vs {baseline[stage]['median_us']:.1f}us"
+        for stage, result in results.items()
+        if stage in baseline and result["median_us"] > baseline[stage]["median_us"] * (1 + tolerance)
+    ]
+
+
+def main(argv: Sequence[str] = None) -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200, help="calls per timing of the local stages")
+    parser.add_argument("--repeat", type=int, default=5, help="timings per stage")
+    parser.add_argument("--output", default=None, help="write the results as JSON to this file")
+    parser.add_argument("--baseline", default=None, help="a previous JSON report to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown w.r.t. the baseline")
+    args = parser.parse_args(argv)
+
+    results = _core_stages(args.number, args.repeat)
+    results.update(_rasa_stages(args.number, args.repeat))
+    results.update(_embedding_stages(args.number, args.repeat))
+    with FakeOpenAIServer() as server:
+        results.update(_gpt_stages(server.base_url, args.number, args.repeat))
+
+    report = {
+        "benchmark": "pipeline",
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+    regressions = _regressions(results, args.baseline, args.tolerance) if args.baseline else []
+    for regression in regressions:
+        print(f"regression: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
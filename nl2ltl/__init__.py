@@ -1,3 +1,3 @@
 """From Natural Language to Linear-time Temporal Logic on Finite Traces."""
 
-from .core import translate  # noqa: F401
+from .core import atranslate, atranslate_many, translate, translate_many  # noqa: F401
@@ -0,0 +1,6 @@
+"""Run the nl2ltl command-line interface with `python -m nl2ltl`."""
+import sys
+
+from nl2ltl.cli import main
+
+sys.exit(main())
@@ -0,0 +1,241 @@
+"""Bulk translation of streams of utterances.
+
+Records are read lazily, translated in chunks and yielded in input order, with a bounded number of chunks in flight,
+so that memory stays bounded whatever the size of the input. Three modes are available: in-process batches, a pool
+of processes, each with its own engine, for CPU-bound local engines, and concurrent asynchronous batches for
+network-bound engines such as GPT.
+"""
+import asyncio
+import csv
+import itertools
+import json
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from nl2ltl.engines.base import Engine
+from nl2ltl.engines.utils import serialize_result
+from nl2ltl.filters.base import Filter
+
+FORMATS = ("jsonl", "csv", "text")
+_SUFFIX_FORMATS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "jsonl", ".csv": "csv"}
+
+_worker_engine: Optional[Engine] = None
+
+
+@dataclass(frozen=True)
+class Record:
+    """Dataclass to represent an utterance to translate, with its identifier."""
+
+    id: Any
+    utterance: str
+
+
+def guess_format(path: Optional[str]) -> str:
+    """Guess the format of an input file from its extension; text, one utterance per line, by default."""
+    return _SUFFIX_FORMATS.get(Path(path).suffix.lower(), "text") if path else "text"
+
+
+def read_records(
+    lines: Iterable[str], input_format: str, id_field: str = "id", text_field: str = "utterance"
+) -> Iterator[Record]:
+    """Read the records of an input stream, lazily.
+
+    :param lines: the lines of the input.
+    :param input_format: one of 'jsonl', 'csv' and 'text', one utterance per line.
+    :param id_field: the field of the record identifiers, for JSONL and CSV inputs.
+    :param text_field: the field of the utterances, for JSONL and CSV inputs.
+    :return: the records; those with no identifier get their 0-based position in the input.
+    """
+    if input_format not in FORMATS:
+        raise ValueError(f"Unknown format {input_format!r}, expected one of {FORMATS}.")
+    if input_format == "text":
+        rows: Iterable[Dict[str, Any]] = ({text_field: line.rstrip("\r\n")} for line in lines if line.strip())
+    elif input_format == "jsonl":
+        rows = (json.loads(line) for line in lines if line.strip())
+    else:
+        rows = csv.DictReader(lines)
+    for position, row in enumerate(rows):
+        utterance = row.get(text_field) if isinstance(row, dict) else None
+        if not isinstance(utterance, str):
+            raise ValueError(f"Record {position} has no {text_field!r} string field.")
+        yield Record(row.get(id_field, position), utterance)
+
+
+def completed_ids(path: Path) -> Set[str]:
+    """Get the identifiers of the records already written to an output file, to resume an interrupted run.
+
+    A trailing partial line, left by an interrupted write, is truncated.
+
+    :param path: the JSONL output file.
+    :return: the identifiers, as strings; empty if the file does not exist.
+    """
+    ids: Set[str] = set()
+    if not path.exists():
+        return ids
+    with open(path, "rb+") as f:
+        end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                f.truncate(end)
+                break
+            end += len(line)
+            if line.strip():
+                ids.add(str(json.loads(line)["id"]))
+    return ids
+
+
+def _chunks(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    """Split records into chunks, lazily."""
+    if size < 1:
+        raise ValueError(f"The batch size must be positive, found {size}.")
+    iterator = iter(records)
+    chunk = list(itertools.islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(iterator, size))
+
+
+def _error(e: Exception) -> Dict[str, Any]:
+    """Serialize a translation error."""
+    return {"error": f"{type(e).__name__}: {e}"}
+
+
+def _translate_chunk(engine: Engine, utterances: Sequence[str], filtering: Optional[Filter]) -> List[Dict[str, Any]]:
+    """Translate a chunk as a batch; if the batch fails, translate its utterances one by one to isolate the errors."""
+    try:
+        return [{"formulas": serialize_result(result)} for result in engine.translate_many(utterances, filtering)]
+    except Exception as e:
+        if len(utterances) == 1:
+            return [_error(e)]
+    outcomes = []
+    for utterance in utterances:
+        try:
+            outcomes.append({"formulas": serialize_result(engine.translate(utterance, filtering))})
+        except Exception as e:
+            outcomes.append(_error(e))
+    return outcomes
+
+
+async def _atranslate_chunk(
+    engine: Engine, utterances: Sequence[str], filtering: Optional[Filter]
+) -> List[Dict[str, Any]]:
+    """Translate a chunk as an asynchronous batch, isolating the errors as _translate_chunk."""
+    try:
+        results = await engine.atranslate_many(utterances, filtering)
+        return [{"formulas": serialize_result(result)} for result in results]
+    except Exception as e:
+        if len(utterances) == 1:
+            return [_error(e)]
+    outcomes = []
+    for utterance in utterances:
+        try:
+            outcomes.append({"formulas": serialize_result(await engine.atranslate(utterance, filtering))})
+        except Exception as e:
+            outcomes.append(_error(e))
+    return outcomes
+
+
+def _results(chunk: Sequence[Record], outcomes: Sequence[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Attach the records of a chunk to their outcomes."""
+    for record, outcome in zip(chunk, outcomes):
+        yield {"id": record.id, "utterance": record.utterance, **outcome}
+
+
+def translate_records(
+    records: Iterable[Record], engine: Engine, filtering: Filter = None, batch_size: int = 64
+) -> Iterator[Dict[str, Any]]:
+    """Translate records in batches, in the current process.
+
+    :param records: the records.
+    :param engine: the engine to use.
+    :param filtering: the filtering function to use.
+    :param batch_size: the number of utterances per engine batch.
+    :return: one result per record, in input order, with the id, the utterance, and either the serialized
+        formulas (see nl2ltl.engines.utils.serialize_result) or the error.
+    """
+    for chunk in _chunks(records, batch_size):
+        yield from _results(chunk, _translate_chunk(engine, [record.utterance for record in chunk], filtering))
+
+
+def _init_worker(engine_factory: Callable[[], Engine]) -> None:
+    """Build the engine of a worker process."""
+    global _worker_engine
+    _worker_engine = engine_factory()
+
+
+def _process_chunk(utterances: Sequence[str], filtering: Optional[Filter]) -> List[Dict[str, Any]]:
+    """Translate a chunk with the engine of the worker process."""
+    if _worker_engine is None:
+        raise RuntimeError("The worker process has no engine.")
+    return _translate_chunk(_worker_engine, utterances, filtering)
+
+
+def translate_records_in_processes(
+    records: Iterable[Record],
+    engine_factory: Callable[[], Engine],
+    filtering: Filter = None,
+    batch_size: int = 64,
+    processes: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Translate records in batches, on a pool of processes, each with its own engine.
+
+    At most two chunks per process are in flight at a time.
+
+    :param records: the records.
+    :param engine_factory: a picklable function building the engine of each process.
+    :param filtering: the filtering function to use.
+    :param batch_size: the number of utterances per engine batch.
+    :param processes: the number of processes; defaults to the number of CPUs.
+    :return: one result per record, in input order, as translate_records.
+    """
+    processes = processes or os.cpu_count() or 1
+    pending: Deque[Tuple[List[Record], Future]] = deque()
+    with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(engine_factory,)) as pool:
+        try:
+            for chunk in _chunks(records, batch_size):
+                pending.append((chunk, pool.submit(_process_chunk, [record.utterance for record in chunk], filtering)))
+                if len(pending) >= 2 * processes:
+                    chunk, future = pending.popleft()
+                    yield from _results(chunk, future.result())
+            while pending:
+                chunk, future = pending.popleft()
+                yield from _results(chunk, future.result())
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+async def atranslate_records(
+    records: Iterable[Record], engine: Engine, filtering: Filter = None, batch_size: int = 64, concurrency: int = 4
+) -> AsyncIterator[Dict[str, Any]]:
+    """Translate records in concurrent asynchronous batches.
+
+    :param records: the records.
+    :param engine: the engine to use.
+    :param filtering: the filtering function to use.
+    :param batch_size: the number of utterances per engine batch.
+    :param concurrency: the maximum number of batches in flight.
+    :return: one result per record, in input order, as translate_records.
+    """
+    if concurrency < 1:
+        raise ValueError(f"The concurrency must be positive, found {concurrency}.")
+    pending: Deque[Tuple[List[Record], asyncio.Task]] = deque()
+    try:
+        for chunk in _chunks(records, batch_size):
+            utterances = [record.utterance for record in chunk]
+            pending.append((chunk, asyncio.ensure_future(_atranslate_chunk(engine, utterances, filtering))))
+            if len(pending) >= concurrency:
+                chunk, task = pending.popleft()
+                for result in _results(chunk, await task):
+                    yield result
+        while pending:
+            chunk, task = pending.popleft()
+            for result in _results(chunk, await task):
+                yield result
+    finally:
+        for _, task in pending:
+            task.cancel()
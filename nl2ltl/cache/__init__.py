@@ -0,0 +1,3 @@
+"""Caches for engine outputs."""
+
+from nl2ltl.cache.base import Cache, CacheStats  # noqa: F401
@@ -0,0 +1,100 @@
+"""Base classes for caches."""
+import hashlib
+import json
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, replace
+from typing import Any, Optional
+
+from nl2ltl.instrumentation import record_cache
+
+
+@dataclass
+class CacheStats:
+    """Dataclass to represent the cache counters."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Get the fraction of lookups that hit the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class Cache(ABC):
+    """Base class for all caches.
+
+    A cache maps content-addressed keys (see `make_key`) to parsed engine outputs,
+    e.g. GPTOutput or RasaOutput instances, so that filtering can change without re-querying the engine.
+    """
+
+    NAME: str
+
+    def __init__(self):
+        """Initialize the cache counters."""
+        self._stats = CacheStats()
+        self._stats_lock = threading.Lock()
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[Any]:
+        """Get the value stored for a key, or None if missing or expired."""
+
+    @abstractmethod
+    def _set(self, key: str, value: Any) -> int:
+        """Store a value for a key, and return the number of evicted entries."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all the entries."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Get the number of entries."""
+
+    def get(self, key: str) -> Optional[Any]:
+        """Look up a key and update the hit/miss counters."""
+        value = self._get(key)
+        record_cache(value is not None)
+        with self._stats_lock:
+            if value is None:
+                self._stats.misses += 1
+            else:
+                self._stats.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value for a key."""
+        evicted = self._set(key, value)
+        if evicted:
+            with self._stats_lock:
+                self._stats.evictions += evicted
+
+    @property
+    def stats(self) -> CacheStats:
+        """Get a snapshot of the cache counters."""
+        with self._stats_lock:
+            return replace(self._stats)
+
+    @property
+    def hits(self) -> int:
+        """Get the number of hits."""
+        return self._stats.hits
+
+    @property
+    def misses(self) -> int:
+        """Get the number of misses."""
+        return self._stats.misses
+
+
+def normalize_utterance(utterance: str) -> str:
+    """Normalize an utterance by stripping it and collapsing its whitespaces."""
+    return " ".join(utterance.split())
+
+
+def make_key(*parts: Any) -> str:
+    """Compute a content-addressed cache key from its parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
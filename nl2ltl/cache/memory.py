@@ -0,0 +1,61 @@
+"""In-memory LRU cache."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from nl2ltl.cache.base import Cache
+
+
+class LRUCache(Cache):
+    """An in-memory cache with least-recently-used eviction and optional time-to-live."""
+
+    NAME = "lru"
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        """Initialize the cache.
+
+        :param maxsize: the maximum number of entries.
+        :param ttl: the time-to-live of the entries, in seconds. None means entries never expire.
+        """
+        super().__init__()
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least 1, found {maxsize}")
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[Any]:
+        """Get the value stored for a key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: Any) -> int:
+        """Store a value for a key, and return the number of evicted entries."""
+        expires_at = time.monotonic() + self._ttl if self._ttl is not None else float("inf")
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                evicted += 1
+        return evicted
+
+    def clear(self) -> None:
+        """Remove all the entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        """Get the number of entries."""
+        return len(self._entries)
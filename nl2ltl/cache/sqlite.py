@@ -0,0 +1,110 @@
+"""On-disk cache backed by SQLite."""
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+from nl2ltl.cache.base import Cache
+from nl2ltl.engines.gpt.output import GPTOutput
+from nl2ltl.engines.rasa.output import RasaOutput
+
+_DECODERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    GPTOutput.__name__: lambda fields: GPTOutput(fields["pattern"], tuple(fields["entities"])),
+    RasaOutput.__name__: lambda fields: RasaOutput(**fields),
+}
+
+
+def _encode(value: Any) -> str:
+    """Encode a parsed engine output as JSON."""
+    type_name = type(value).__name__
+    if type_name not in _DECODERS:
+        raise ValueError(f"cannot store values of type {type_name} in the SQLite cache")
+    return json.dumps({"type": type_name, "fields": asdict(value)})
+
+
+def _decode(payload: str) -> Any:
+    """Decode a parsed engine output from JSON."""
+    data = json.loads(payload)
+    return _DECODERS[data["type"]](data["fields"])
+
+
+class SqliteCache(Cache):
+    """An on-disk cache with time-to-live and size-based (least-recently-used) eviction."""
+
+    NAME = "sqlite"
+
+    def __init__(
+        self,
+        path: Union[str, Path] = ":memory:",
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+    ):
+        """Initialize the cache.
+
+        :param path: the path of the SQLite database.
+        :param ttl: the time-to-live of the entries, in seconds. None means entries never expire.
+        :param max_entries: the maximum number of entries. None means no limit.
+        """
+        super().__init__()
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+
+    def _get(self, key: str) -> Optional[Any]:
+        """Get the value stored for a key, or None if missing or expired."""
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            payload, expires_at = row
+            if expires_at < now:
+                self._connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            self._connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return _decode(payload)
+
+    def _set(self, key: str, value: Any) -> int:
+        """Store a value for a key, and return the number of evicted entries."""
+        now = time.time()
+        expires_at = now + self._ttl if self._ttl is not None else float("inf")
+        payload = _encode(value)
+        evicted = 0
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, expires_at, now),
+            )
+            evicted += self._connection.execute("DELETE FROM entries WHERE expires_at < ?", (now,)).rowcount
+            if self._max_entries is not None:
+                evicted += self._connection.execute(
+                    "DELETE FROM entries WHERE key IN "
+                    "(SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self._max_entries,),
+                ).rowcount
+        return evicted
+
+    def clear(self) -> None:
+        """Remove all the entries."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM entries")
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self) -> int:
+        """Get the number of entries."""
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
@@ -0,0 +1,239 @@
+"""The nl2ltl command-line interface.
+
+Usage:
+
+    nl2ltl serve --engine rasa --port 8000
+    nl2ltl serve --engine rules,gpt --threshold 0.85
+    nl2ltl translate utterances.jsonl -o results.jsonl --engine embedding --mode process --resume
+    echo "Whenever I get a Slack, send a Gmail." | nl2ltl translate --engine gpt --filter greedy
+"""
+import argparse
+import asyncio
+import functools
+import json
+import sys
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, Sequence, TextIO
+
+from nl2ltl.bulk import (
+    FORMATS,
+    atranslate_records,
+    completed_ids,
+    guess_format,
+    read_records,
+    translate_records,
+    translate_records_in_processes,
+)
+from nl2ltl.engines.base import Engine
+from nl2ltl.filters import get_filter
+
+
+def _gpt_engine(args: argparse.Namespace) -> Engine:
+    """Build the GPT engine."""
+    from nl2ltl.engines.gpt.core import GPTEngine
+
+    return GPTEngine() if args.gpt_model is None else GPTEngine(model=args.gpt_model)
+
+
+def _rasa_engine(args: argparse.Namespace) -> Engine:
+    """Build the Rasa engine, loading the latest trained model unless a model is given."""
+    from nl2ltl.engines.rasa.core import RasaEngine
+
+    return RasaEngine(model=args.rasa_model)
+
+
+def _rules_engine(args: argparse.Namespace) -> Engine:
+    """Build the rule-based engine, with no fallback."""
+    from nl2ltl.engines.rules.core import RuleEngine
+
+    return RuleEngine()
+
+
+def _embedding_engine(args: argparse.Namespace) -> Engine:
+    """Build the embedding-based engine."""
+    from nl2ltl.engines.embedding.core import EmbeddingEngine
+
+    return EmbeddingEngine()
+
+
+ENGINES: Dict[str, Callable[[argparse.Namespace], Engine]] = {
+    "gpt": _gpt_engine,
+    "rasa": _rasa_engine,
+    "rules": _rules_engine,
+    "embedding": _embedding_engine,
+}
+
+
+def make_engine(args: argparse.Namespace) -> Engine:
+    """Build the engine of the command-line arguments.
+
+    :param args: the parsed arguments; a comma-separated list of engines builds a cascade.
+    :return: the engine.
+    """
+    names = [name.strip() for name in args.engine.split(",")]
+    unknown = [name for name in names if name not in ENGINES]
+    if unknown:
+        raise ValueError(f"Unknown engines {unknown}, expected some of {sorted(ENGINES)}.")
+    engines = [ENGINES[name](args) for name in names]
+    if len(engines) == 1:
+        return engines[0]
+    from nl2ltl.engines.cascade import CascadeEngine
+
+    return CascadeEngine(engines, thresholds=args.threshold, budget=args.budget)
+
+
+def _add_engine_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the arguments building the engine."""
+    parser.add_argument(
+        "--engine",
+        default="gpt",
+        help=f"the engine, one of {sorted(ENGINES)}, or a comma-separated cascade of them (default: gpt)",
+    )
+    parser.add_argument("--gpt-model", default=None, help="the GPT model")
+    parser.add_argument("--rasa-model", type=Path, default=None, help="the Rasa model (default: the latest trained)")
+    parser.add_argument(
+        "--threshold", type=float, default=0.8, help="the confidence accepting a cascade tier (default: 0.8)"
+    )
+    parser.add_argument(
+        "--budget", type=float, default=None, help="the seconds to wait for a cascade tier before racing the next one"
+    )
+
+
+def _serve(args: argparse.Namespace) -> int:
+    """Run the translation server."""
+    from nl2ltl.server import serve
+
+    serve(
+        make_engine(args),
+        host=args.host,
+        port=args.port,
+        max_batch_size=args.max_batch_size,
+        max_delay=args.max_delay_ms / 1000,
+        workers=args.workers,
+        max_pending=args.max_pending,
+        request_timeout=args.timeout,
+        verbose=args.verbose,
+    )
+    return 0
+
+
+def _write(results: Iterable[Dict[str, Any]], output: TextIO) -> Dict[str, int]:
+    """Write results as JSONL, flushing each line, and count them."""
+    counts = {"translated": 0, "failed": 0}
+    for result in results:
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+        counts["failed" if "error" in result else "translated"] += 1
+    return counts
+
+
+async def _awrite(results: AsyncIterator[Dict[str, Any]], output: TextIO) -> Dict[str, int]:
+    """Write asynchronous results as JSONL, as _write."""
+    counts = {"translated": 0, "failed": 0}
+    async for result in results:
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+        counts["failed" if "error" in result else "translated"] += 1
+    return counts
+
+
+def _translate(args: argparse.Namespace) -> int:
+    """Translate a stream of utterances to JSONL."""
+    if args.resume and args.output == "-":
+        raise ValueError("--resume needs an --output file.")
+    filtering = get_filter(args.filter)
+    done = completed_ids(Path(args.output)) if args.resume else set()
+    input_format = args.format or guess_format(None if args.input == "-" else args.input)
+    source = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    output = sys.stdout if args.output == "-" else open(args.output, "a" if args.resume else "w", encoding="utf-8")
+    engine: Optional[Engine] = None
+    try:
+        records = read_records(source, input_format, args.id_field, args.text_field)
+        pending = (record for record in records if str(record.id) not in done)
+        if args.mode == "process":
+            engine_factory = functools.partial(make_engine, args)
+            counts = _write(
+                translate_records_in_processes(pending, engine_factory, filtering, args.batch_size, args.jobs), output
+            )
+        elif args.mode == "async":
+            engine = make_engine(args)
+            results = atranslate_records(pending, engine, filtering, args.batch_size, args.jobs or 4)
+            counts = asyncio.run(_awrite(results, output))
+        else:
+            engine = make_engine(args)
+            counts = _write(translate_records(pending, engine, filtering, args.batch_size), output)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+        close = getattr(engine, "close", None)
+        if callable(close):
+            close()
+    print(
+        f"nl2ltl: translated {counts['translated']}, failed {counts['failed']}, skipped {len(done)}.", file=sys.stderr
+    )
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the parser of the command-line arguments."""
+    parser = argparse.ArgumentParser(prog="nl2ltl", description="Natural Language (NL) to Linear Temporal Logic (LTL)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="serve translations over HTTP/JSON, with a warm engine")
+    _add_engine_arguments(serve)
+    serve.add_argument("--host", default="127.0.0.1", help="the host to bind (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8000, help="the port to bind (default: 8000)")
+    serve.add_argument("--max-batch-size", type=int, default=32, help="the utterances per engine batch (default: 32)")
+    serve.add_argument(
+        "--max-delay-ms", type=float, default=5.0, help="the milliseconds to wait for a batch to fill (default: 5)"
+    )
+    serve.add_argument("--workers", type=int, default=4, help="the engine batches running at once (default: 4)")
+    serve.add_argument("--max-pending", type=int, default=1024, help="the queued utterances before 503 (default: 1024)")
+    serve.add_argument("--timeout", type=float, default=60.0, help="the seconds before a request gets a 504")
+    serve.add_argument("--verbose", action="store_true", help="log every request")
+    serve.set_defaults(func=_serve)
+
+    translate = commands.add_parser("translate", help="translate a stream of utterances to JSONL")
+    _add_engine_arguments(translate)
+    translate.add_argument("input", nargs="?", default="-", help="the input file (default: stdin)")
+    translate.add_argument("-o", "--output", default="-", help="the JSONL output file (default: stdout)")
+    translate.add_argument(
+        "--format",
+        choices=FORMATS,
+        default=None,
+        help="the input format (default: from the file extension, else text, one utterance per line)",
+    )
+    translate.add_argument("--id-field", default="id", help="the field of the record ids (default: id)")
+    translate.add_argument("--text-field", default="utterance", help="the field of the utterances (default: utterance)")
+    translate.add_argument("--filter", default=None, help="the filter, e.g. greedy (default: none)")
+    translate.add_argument("--batch-size", type=int, default=64, help="the utterances per engine batch (default: 64)")
+    translate.add_argument(
+        "--mode",
+        choices=["batch", "process", "async"],
+        default="batch",
+        help="in-process batches, a pool of processes for CPU-bound local engines, "
+        "or concurrent asynchronous batches for GPT (default: batch)",
+    )
+    translate.add_argument(
+        "--jobs", type=int, default=None, help="the processes, or the asynchronous batches in flight (default: CPUs, 4)"
+    )
+    translate.add_argument("--resume", action="store_true", help="append to the output, skipping the ids it holds")
+    translate.set_defaults(func=_translate)
+
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the command-line interface.
+
+    :param argv: the command-line arguments, without the program name; defaults to sys.argv.
+    :return: the exit status.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except (ValueError, ModuleNotFoundError) as e:
+        parser.exit(2, f"{parser.prog}: error: {e}\n")
@@ -1,15 +1,16 @@
 """NL2LTLf core module."""
-from typing import Dict
+from typing import Any, Dict, List, Sequence, Union
 
 from pylogics.syntax.base import Formula
 
 from nl2ltl.engines import Engine
 from nl2ltl.filters.base import Filter
+from nl2ltl.instrumentation import stage
 
 
 def _call_translation_method(
-    utterance: str, engine: Engine, filtering: Filter, method_name: str
-) -> Dict[Formula, float]:
+    utterance: Union[str, Sequence[str]], engine: Engine, filtering: Filter, method_name: str
+) -> Any:
     """Call the translation method."""
     method = getattr(engine, method_name)
     return method(utterance, filtering)
@@ -23,4 +24,43 @@ def translate(utterance: str, engine: Engine, filtering: Filter = None) -> Dict[
     :param filtering: the filtering function to use.
     :return: the best matching LTL formulas with their confidence.
     """
-    return _call_translation_method(utterance, engine, filtering, translate.__name__)
+    with stage(translate.__name__):
+        return _call_translation_method(utterance, engine, filtering, translate.__name__)
+
+
+def translate_many(utterances: Sequence[str], engine: Engine, filtering: Filter = None) -> List[Dict[Formula, float]]:
+    """From many NL utterances to LTLf.
+
+    :param utterances: the natural language utterances to translate.
+    :param engine: the engine to use.
+    :param filtering: the filtering function to use.
+    :return: the best matching LTL formulas with their confidence, one dict per utterance, in input order.
+    """
+    with stage(translate_many.__name__):
+        return _call_translation_method(utterances, engine, filtering, translate_many.__name__)
+
+
+async def atranslate(utterance: str, engine: Engine, filtering: Filter = None) -> Dict[Formula, float]:
+    """From NL to LTLf, asynchronously.
+
+    :param utterance: the natural language utterance to translate.
+    :param engine: the engine to use.
+    :param filtering: the filtering function to use.
+    :return: the best matching LTL formulas with their confidence.
+    """
+    with stage(atranslate.__name__):
+        return await _call_translation_method(utterance, engine, filtering, atranslate.__name__)
+
+
+async def atranslate_many(
+    utterances: Sequence[str], engine: Engine, filtering: Filter = None
+) -> List[Dict[Formula, float]]:
+    """From many NL utterances to LTLf, asynchronously.
+
+    :param utterances: the natural language utterances to translate.
+    :param engine: the engine to use.
+    :param filtering: the filtering function to use.
+    :return: the best matching LTL formulas with their confidence, one dict per utterance, in input order.
+    """
+    with stage(atranslate_many.__name__):
+        return await _call_translation_method(utterances, engine, filtering, atranslate_many.__name__)
@@ -0,0 +1,271 @@
+"""Compilation of templates to DFAs, and incremental monitoring.
+
+Each template compiles to a small deterministic automaton over the argument positions of its shape: symbol i stands
+for an event of the i-th distinct argument, the last symbol for an event of any other activity. The automata are
+hand-built for every template kind and argument pattern, e.g. Response(a, b) and Response(a, a), and shared by all
+the constraints with the same shape. Their states are labeled with the verdict of the monitored prefix: permanently
+satisfied, permanently violated, or still pending.
+
+A monitor advances all the constraints of a specification by one transition per event, visiting only the constraints
+that mention the activity of the event, or whose current state changes on any other activity.
+"""
+import functools
+from dataclasses import dataclass, field
+from enum import Enum, unique
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Sequence, Set, Tuple, Type
+
+from nl2ltl.declare.base import Template
+from nl2ltl.declare.declare import (
+    Absence,
+    ChainResponse,
+    Existence,
+    ExistenceTwo,
+    NotCoExistence,
+    Precedence,
+    RespondedExistence,
+    Response,
+)
+
+
+@unique
+class Verdict(Enum):
+    """Verdict of a monitored constraint."""
+
+    SATISFIED = "satisfied"
+    VIOLATED = "violated"
+    PENDING = "pending"
+
+
+@dataclass(frozen=True)
+class DFA:
+    """A deterministic finite automaton over the symbols of a template shape, starting from state 0."""
+
+    transitions: Tuple[Tuple[int, ...], ...]
+    """The next state of every state, for every symbol."""
+    accepting: FrozenSet[int]
+    verdicts: Tuple[Verdict, ...] = field(init=False)
+    """The verdict of every state: satisfied (violated) if every (no) reachable state is accepting."""
+
+    def __post_init__(self):
+        """Do consistency checks after initialization, and label the states with their verdict."""
+        n_symbols = len(self.transitions[0])
+        states = range(len(self.transitions))
+        if any(len(row) != n_symbols or not set(row) <= set(states) for row in self.transitions):
+            raise ValueError("Every state must have a valid next state for every symbol.")
+        verdicts = []
+        for state in states:
+            reachable = self._reachable(state)
+            if reachable <= self.accepting:
+                verdicts.append(Verdict.SATISFIED)
+            elif not reachable & self.accepting:
+                verdicts.append(Verdict.VIOLATED)
+            else:
+                verdicts.append(Verdict.PENDING)
+        object.__setattr__(self, "verdicts", tuple(verdicts))
+
+    @property
+    def n_symbols(self) -> int:
+        """Get the number of symbols, the last one standing for any other activity."""
+        return len(self.transitions[0])
+
+    def _reachable(self, state: int) -> Set[int]:
+        """Get the states reachable from a state, including it."""
+        reachable, frontier = {state}, [state]
+        while frontier:
+            for successor in self.transitions[frontier.pop()]:
+                if successor not in reachable:
+                    reachable.add(successor)
+                    frontier.append(successor)
+        return reachable
+
+    def run(self, symbols: Iterable[int], state: int = 0) -> int:
+        """Get the state reached by reading symbols from a state."""
+        for symbol in symbols:
+            state = self.transitions[state][symbol]
+        return state
+
+
+_TRUE = DFA(((0, 0),), frozenset({0}))
+
+# transitions[state] = (next state on a, next state on b, next state on other), or (on a, on other) if a == b
+_AUTOMATA: Dict[Tuple[Type[Template], Tuple[int, ...]], DFA] = {
+    (Existence, (0,)): DFA(((1, 0), (1, 1)), frozenset({1})),
+    (ExistenceTwo, (0,)): DFA(((1, 0), (2, 1), (2, 2)), frozenset({2})),
+    (Absence, (0,)): DFA(((1, 0), (1, 1)), frozenset({0})),
+    # 0: no a, 1: a but no b yet, 2: b
+    (RespondedExistence, (0, 1)): DFA(((1, 2, 0), (1, 2, 1), (2, 2, 2)), frozenset({0, 2})),
+    (RespondedExistence, (0, 0)): _TRUE,
+    # 0: every a answered, 1: an a waits for a b
+    (Response, (0, 1)): DFA(((1, 0, 0), (1, 0, 1)), frozenset({0})),
+    (Response, (0, 0)): _TRUE,
+    # 0: neither a nor b, 1: a first, 2: b first
+    (Precedence, (0, 1)): DFA(((1, 2, 0), (1, 1, 1), (2, 2, 2)), frozenset({0, 1})),
+    (Precedence, (0, 0)): _TRUE,
+    # 0: no obligation, 1: the next event must be b, 2: failed
+    (ChainResponse, (0, 1)): DFA(((1, 0, 0), (2, 0, 2), (2, 2, 2)), frozenset({0})),
+    (ChainResponse, (0, 0)): DFA(((1, 0), (1, 2), (2, 2)), frozenset({0})),
+    # 0: neither a nor b, 1: a only, 2: b only, 3: both
+    (NotCoExistence, (0, 1)): DFA(((1, 2, 0), (1, 3, 1), (3, 2, 2), (3, 3, 3)), frozenset({0, 1, 2})),
+    (NotCoExistence, (0, 0)): DFA(((1, 0), (1, 1)), frozenset({0})),
+}
+
+
+def _shape(template: Template) -> Tuple[Tuple[int, ...], Tuple[str, ...]]:
+    """Get the argument pattern of a template, e.g. (0, 1) or (0, 0), and its distinct argument names."""
+    names = tuple(dict.fromkeys(template.argument_names))
+    return tuple(names.index(name) for name in template.argument_names), names
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_shape(template_cls: Type[Template], pattern: Tuple[int, ...]) -> DFA:
+    """Get the automaton of a template shape."""
+    dfa = _AUTOMATA.get((template_cls, pattern))
+    if dfa is None:
+        raise ValueError(f"No automaton for {template_cls.__name__} with argument pattern {pattern}.")
+    return dfa
+
+
+def to_dfa(template: Template) -> Tuple[DFA, Tuple[str, ...]]:
+    """Compile a template to the automaton of its shape.
+
+    :param template: the template.
+    :return: the automaton, shared by the templates of the same shape, and the activities of its symbols.
+    """
+    pattern, names = _shape(template)
+    return _compile_shape(type(template), pattern), names
+
+
+class Specification:
+    """A set of constraints compiled for monitoring."""
+
+    def __init__(self, constraints: Sequence[Template]):
+        """Compile the constraints.
+
+        :param constraints: the constraints, e.g. the templates of a translation.
+        """
+        self._constraints = tuple(constraints)
+        automata: List[DFA] = []
+        index: Dict[str, List[Tuple[int, int]]] = {}
+        for position, constraint in enumerate(self._constraints):
+            dfa, names = to_dfa(constraint)
+            automata.append(dfa)
+            for symbol, name in enumerate(names):
+                index.setdefault(name, []).append((position, symbol))
+        self._automata = tuple(automata)
+        self._index: Mapping[str, Tuple[Tuple[int, int], ...]] = MappingProxyType(
+            {name: tuple(entries) for name, entries in index.items()}
+        )
+        self._touched: Mapping[str, FrozenSet[int]] = MappingProxyType(
+            {name: frozenset(position for position, _ in entries) for name, entries in index.items()}
+        )
+        # the states whose transition on other activities is not a self-loop, e.g. a pending ChainResponse
+        self._volatile = tuple(
+            tuple(row[-1] != state for state, row in enumerate(dfa.transitions)) for dfa in self._automata
+        )
+
+    @property
+    def constraints(self) -> List[Template]:
+        """Get the constraints."""
+        return list(self._constraints)
+
+    @property
+    def automata(self) -> Tuple[DFA, ...]:
+        """Get the automaton of every constraint."""
+        return self._automata
+
+    @property
+    def index(self) -> Mapping[str, Tuple[Tuple[int, int], ...]]:
+        """Get the (constraint position, symbol) pairs of every activity of the constraints."""
+        return self._index
+
+    @property
+    def touched(self) -> Mapping[str, FrozenSet[int]]:
+        """Get the positions of the constraints mentioning every activity."""
+        return self._touched
+
+    @property
+    def volatile(self) -> Tuple[Tuple[bool, ...], ...]:
+        """Get, for every constraint and every state, whether an event of any other activity leaves the state."""
+        return self._volatile
+
+    def __len__(self) -> int:
+        """Get the number of constraints."""
+        return len(self._constraints)
+
+    def monitor(self) -> "Monitor":
+        """Start monitoring a new process instance."""
+        return Monitor(self)
+
+
+class Monitor:
+    """Monitor the constraints of a specification over the events of a process instance."""
+
+    def __init__(self, specification: Specification):
+        """Start from the empty prefix.
+
+        :param specification: the compiled constraints.
+        """
+        self._specification = specification
+        self._automata = specification.automata
+        self._index = specification.index
+        self._touched = specification.touched
+        self._volatile_states = specification.volatile
+        self._states: List[int] = []
+        self._volatile: Set[int] = set()
+        self._length = 0
+        self.reset()
+
+    @property
+    def specification(self) -> Specification:
+        """Get the monitored specification."""
+        return self._specification
+
+    def __len__(self) -> int:
+        """Get the number of events monitored so far."""
+        return self._length
+
+    def reset(self) -> None:
+        """Restart from the empty prefix."""
+        self._states = [0] * len(self._automata)
+        self._volatile = {position for position, volatile in enumerate(self._volatile_states) if volatile[0]}
+        self._length = 0
+
+    def _move(self, position: int, symbol: int) -> None:
+        """Advance a constraint by a symbol."""
+        state = self._automata[position].transitions[self._states[position]][symbol]
+        self._states[position] = state
+        if self._volatile_states[position][state]:
+            self._volatile.add(position)
+        else:
+            self._volatile.discard(position)
+
+    def step(self, activity: str) -> None:
+        """Advance all the constraints by an event.
+
+        :param activity: the activity of the event.
+        """
+        for position, symbol in self._index.get(activity, ()):
+            self._move(position, symbol)
+        if self._volatile:
+            touched = self._touched.get(activity, frozenset())
+            for position in [position for position in self._volatile if position not in touched]:
+                self._move(position, self._automata[position].n_symbols - 1)
+        self._length += 1
+
+    def steps(self, activities: Iterable[str]) -> None:
+        """Advance all the constraints by many events, in order."""
+        for activity in activities:
+            self.step(activity)
+
+    def verdict(self, position: int) -> Verdict:
+        """Get the verdict of a constraint on the prefix monitored so far."""
+        return self._automata[position].verdicts[self._states[position]]
+
+    def verdicts(self) -> List[Verdict]:
+        """Get the verdict of every constraint on the prefix monitored so far."""
+        return [dfa.verdicts[state] for dfa, state in zip(self._automata, self._states)]
+
+    def finish(self) -> List[bool]:
+        """Get whether every constraint holds on the prefix monitored so far, taken as a complete trace."""
+        return [state in dfa.accepting for dfa, state in zip(self._automata, self._states)]
@@ -1,9 +1,15 @@
 """Base classes for declare templates."""
 
+import threading
+import weakref
 from abc import abstractmethod
 from enum import Enum, unique
+from typing import Any, Dict, Iterable, List, Tuple
 
-from pylogics.syntax.base import Formula, Logic
+from pylogics.syntax.base import Formula, Logic, _BinaryOp, _HashConsing
+from pylogics.syntax.ltl import Atomic
+
+from nl2ltl.declare.misc import memoize_translation, share_subformulas
 
 
 @unique
@@ -20,11 +26,68 @@ class TemplateEnum(Enum):
     NOT_CO_EXISTENCE = "NotCoExistence"
 
 
-class Template(Formula):
+_atoms: "weakref.WeakValueDictionary[str, Atomic]" = weakref.WeakValueDictionary()
+
+
+def atom(name: str) -> Atomic:
+    """Get the interned atomic proposition with the given name."""
+    instance = _atoms.get(name)
+    if instance is None:
+        instance = _atoms.setdefault(name, Atomic(name))
+    return instance
+
+
+class _InternedTemplate(_HashConsing):
+    """Metaclass for templates that interns their instances.
+
+    Building the same template twice, e.g. Response(a, b), returns the same object, built on interned atoms.
+    Instances are kept in a weak table indexed by (template, argument names), so memory scales with the number of
+    distinct live templates, not with the number of constructions. The pylogics hash consing is bypassed: it keeps
+    every formula alive and does not return the cached instances.
+    """
+
+    _instances: "weakref.WeakValueDictionary[Tuple[Any, ...], Template]" = weakref.WeakValueDictionary()
+    _lock = threading.Lock()
+
+    def __new__(mcs, *args, **kwargs):
+        """Create a template class hashing its (interned) instances by identity.
+
+        The pylogics Hashable metaclass wraps __hash__ to cache it; the identity hash needs no caching.
+        """
+        template_cls = super().__new__(mcs, *args, **kwargs)
+        template_cls.__hash__ = object.__hash__
+        return template_cls
+
+    def __call__(cls, *args, **kwargs):
+        """Get the interned instance of the template."""
+        if kwargs or not all(isinstance(arg, Atomic) for arg in args):
+            # build the template to validate and normalize its arguments, then intern it.
+            return cls(*super(_HashConsing, cls).__call__(*args, **kwargs).arguments)
+        names = tuple(arg.name for arg in args)
+        key = (cls, names)
+        instance = _InternedTemplate._instances.get(key)
+        if instance is None:
+            new_instance = super(_HashConsing, cls).__call__(*map(atom, names))
+            new_instance._argument_names = names
+            with _InternedTemplate._lock:
+                instance = _InternedTemplate._instances.setdefault(key, new_instance)
+        return instance
+
+
+class Template(Formula, metaclass=_InternedTemplate):
     """Base class for all templates."""
 
     SYMBOL: str
+    _TRANSLATIONS: Tuple[str, ...] = ("to_ltlf", "to_ppltl", "to_english")
+
+    def __init_subclass__(cls, **kwargs):
+        """Memoize the translations implemented by the subclass."""
+        super().__init_subclass__(**kwargs)
+        for name in Template._TRANSLATIONS:
+            if name in cls.__dict__ and not hasattr(cls.__dict__[name], "memoized_attribute"):
+                setattr(cls, name, memoize_translation(cls.__dict__[name]))
 
+    @property
     def logic(self) -> Logic:
         """Get the logic."""
         return Logic.LTL
@@ -43,6 +106,55 @@ class Template(Formula):
     def to_ppltl(self) -> "Formula":
         """Get the template translation to PPLTL."""
 
-    def __hash__(self):
-        """Delegate the computation of the hash to the superclass."""
-        return super(Formula, self).__hash__()
+    @property
+    def arguments(self) -> Tuple[Formula, ...]:
+        """Get the template arguments, in order."""
+        return tuple(self.operands) if isinstance(self, _BinaryOp) else (self.argument,)
+
+    @property
+    def argument_names(self) -> Tuple[str, ...]:
+        """Get the names of the template arguments, in order."""
+        return self._argument_names
+
+    def __reduce__(self):
+        """Rebuild (and intern) the template from the names of its arguments when unpickled or copied."""
+        return _make_template, (type(self), self.argument_names)
+
+    def __eq__(self, other) -> bool:
+        """Compare with another object. Templates are interned, hence equal templates are identical."""
+        return self is other
+
+
+def _translate_many(templates: Iterable[Template], method_name: str) -> List[Formula]:
+    """Translate many templates, sharing the common subformulas among the translations."""
+    table: Dict[Formula, Formula] = {}
+    formulas: List[Formula] = []
+    for template in templates:
+        method = getattr(template, method_name)
+        formula = share_subformulas(method(), table)
+        template.__dict__[method.memoized_attribute] = formula
+        formulas.append(formula)
+    return formulas
+
+
+def to_ltlf_many(templates: Iterable[Template]) -> List[Formula]:
+    """Translate many templates to LTLf in one pass, sharing the common subformulas.
+
+    :param templates: the templates to translate.
+    :return: the LTLf formulas, in input order.
+    """
+    return _translate_many(templates, Template.to_ltlf.__name__)
+
+
+def to_ppltl_many(templates: Iterable[Template]) -> List[Formula]:
+    """Translate many templates to PPLTL in one pass, sharing the common subformulas.
+
+    :param templates: the templates to translate.
+    :return: the PPLTL formulas, in input order.
+    """
+    return _translate_many(templates, Template.to_ppltl.__name__)
+
+
+def _make_template(template_cls: type, names: Tuple[str, ...]) -> Template:
+    """Build a template from the names of its atomic arguments."""
+    return template_cls(*map(atom, names))
@@ -0,0 +1,245 @@
+"""Vectorized conformance checking of DECLARE templates over event logs.
+
+An event log is encoded as a flat array of integer activity ids, with the offsets of its traces. A checker compiles
+its constraints once, then checks a log a chunk of traces at a time: one pass computes, for every trace and every
+activity of the constraints, the number of occurrences, the first and the last positions, and the number of
+occurrences directly followed by each activity of a ChainResponse. Every template kind is then decided for all
+its constraints at once, by comparing these matrices, e.g. Precedence(a, b) holds iff the first a is not after
+the first b. The semantics is that of `to_ltlf()` over finite traces with one activity per event. It requires NumPy.
+"""
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from nl2ltl.declare.base import Template
+from nl2ltl.declare.declare import (
+    Absence,
+    ChainResponse,
+    Existence,
+    ExistenceTwo,
+    NotCoExistence,
+    Precedence,
+    RespondedExistence,
+    Response,
+)
+from nl2ltl.helpers import requires_optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_CHUNK_SIZE = 2**16
+_NEVER = 2**31 - 1
+"""The first position of the activities that do not occur."""
+
+
+class EventLog:
+    """An event log, encoded as integer activity arrays."""
+
+    def __init__(self, events: "np.ndarray", offsets: "np.ndarray", activities: Sequence[str]):
+        """Wrap the encoded log.
+
+        :param events: the activity ids of all the events, trace after trace.
+        :param offsets: the (traces + 1) offsets of the traces in `events`, from 0 to len(events).
+        :param activities: the activity names, indexed by id; they match the argument names of the templates.
+        """
+        import numpy as np
+
+        self._events = np.asarray(events, dtype=np.int64)
+        self._offsets = np.asarray(offsets, dtype=np.int64)
+        self._activities = list(activities)
+        if self._offsets.ndim != 1 or len(self._offsets) == 0 or self._offsets[0] != 0:
+            raise ValueError("The offsets must be a non-empty vector starting from 0.")
+        if self._offsets[-1] != len(self._events) or np.any(np.diff(self._offsets) < 0):
+            raise ValueError("The offsets must be non-decreasing, up to the number of events.")
+        if len(self._events) and (self._events.min() < 0 or self._events.max() >= len(self._activities)):
+            raise ValueError("The events must be ids of the activities.")
+
+    @classmethod
+    def from_traces(cls, traces: Iterable[Sequence[str]]) -> "EventLog":
+        """Encode traces of activity names.
+
+        :param traces: the traces, e.g. [['slack', 'gmail'], ['gmail']].
+        :return: the encoded log.
+        """
+        import numpy as np
+
+        ids: Dict[str, int] = {}
+        events: List[int] = []
+        offsets = [0]
+        for trace in traces:
+            events.extend(ids.setdefault(activity, len(ids)) for activity in trace)
+            offsets.append(len(events))
+        return cls(np.array(events, dtype=np.int64), np.array(offsets, dtype=np.int64), list(ids))
+
+    @property
+    def events(self) -> "np.ndarray":
+        """Get the activity ids of all the events."""
+        return self._events
+
+    @property
+    def offsets(self) -> "np.ndarray":
+        """Get the offsets of the traces."""
+        return self._offsets
+
+    @property
+    def activities(self) -> List[str]:
+        """Get the activity names, indexed by id."""
+        return list(self._activities)
+
+    def __len__(self) -> int:
+        """Get the number of traces."""
+        return len(self._offsets) - 1
+
+
+class _Statistics:
+    """The occurrence statistics of a chunk of traces, over the activities of the constraints."""
+
+    def __init__(self, activities: "np.ndarray", offsets: "np.ndarray", n_activities: int, pairs: "np.ndarray"):
+        """Compute the statistics.
+
+        :param activities: the activity index of every event, n_activities for the activities of no constraint.
+        :param offsets: the offsets of the traces, from 0.
+        :param n_activities: the number of activities of the constraints.
+        :param pairs: the (n_activities + 1) x (n_activities + 1) table of the ChainResponse pair indices, or -1.
+        """
+        import numpy as np
+
+        n_traces = len(offsets) - 1
+        lengths = np.diff(offsets)
+        traces = np.repeat(np.arange(n_traces, dtype=np.int64), lengths)
+        positions = np.arange(len(activities), dtype=np.int64) - np.repeat(offsets[:-1], lengths)
+        relevant = activities < n_activities
+        keys = traces[relevant] * n_activities + activities[relevant]
+        positions = positions[relevant]
+        shape = (n_traces, n_activities)
+
+        # a stable sort groups the occurrences of each (trace, activity), in order of position
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.diff(sorted_keys, prepend=-1))
+        ends = np.append(starts[1:], len(keys))[: len(starts)]
+        unique_keys = sorted_keys[starts]
+        self.count = np.zeros(n_traces * n_activities, dtype=np.int64)
+        self.count[unique_keys] = ends - starts
+        self.first = np.full(n_traces * n_activities, _NEVER, dtype=np.int64)
+        self.first[unique_keys] = positions[order[starts]]
+        self.last = np.full(n_traces * n_activities, -1, dtype=np.int64)
+        self.last[unique_keys] = positions[order[ends - 1]]
+        self.count, self.first, self.last = (a.reshape(shape) for a in (self.count, self.first, self.last))
+
+        n_pairs = int(pairs.max(initial=-1)) + 1
+        self.pairs = np.zeros((n_traces, n_pairs), dtype=np.int64)
+        if n_pairs and len(activities):
+            following = np.empty_like(activities)
+            following[:-1] = activities[1:]
+            following[offsets[1:][lengths > 0] - 1] = n_activities
+            pair_indices = pairs[activities, following]
+            matched = pair_indices >= 0
+            pair_keys = traces[matched] * n_pairs + pair_indices[matched]
+            self.pairs = np.bincount(pair_keys, minlength=n_traces * n_pairs).reshape(n_traces, n_pairs)
+
+
+_Check = Callable[[_Statistics, "np.ndarray", "np.ndarray", "np.ndarray"], "np.ndarray"]
+
+_CHECKS: Dict[Type[Template], _Check] = {
+    Existence: lambda s, a, b, p: s.count[:, a] >= 1,
+    ExistenceTwo: lambda s, a, b, p: s.count[:, a] >= 2,
+    Absence: lambda s, a, b, p: s.count[:, a] == 0,
+    RespondedExistence: lambda s, a, b, p: (s.count[:, a] == 0) | (s.count[:, b] > 0),
+    Response: lambda s, a, b, p: s.last[:, b] >= s.last[:, a],
+    Precedence: lambda s, a, b, p: s.first[:, a] <= s.first[:, b],
+    ChainResponse: lambda s, a, b, p: s.count[:, a] == s.pairs[:, p],
+    NotCoExistence: lambda s, a, b, p: (s.count[:, a] == 0) | (s.count[:, b] == 0),
+}
+"""The vectorized checks of each template kind, given the statistics, the activity indices of the arguments of its
+constraints, and the pair indices of ChainResponse."""
+
+
+@requires_optional(module="numpy", name="NumPy")
+class ConformanceChecker:
+    """Check many DECLARE constraints against event logs in batched passes."""
+
+    def __init__(self, constraints: Sequence[Template], chunk_size: int = _CHUNK_SIZE):
+        """Compile the constraints.
+
+        :param constraints: the constraints, e.g. the templates of a translation.
+        :param chunk_size: the number of traces checked per pass, bounding the memory.
+        """
+        import numpy as np
+
+        if chunk_size < 1:
+            raise ValueError(f"The chunk size must be positive, found {chunk_size}.")
+        self._constraints = list(constraints)
+        self._chunk_size = chunk_size
+        self._activities: Dict[str, int] = {}
+        groups: Dict[Type[Template], List[Tuple[int, int, int, int]]] = {}
+        pairs: Dict[Tuple[int, int], int] = {}
+        for column, constraint in enumerate(self._constraints):
+            if type(constraint) not in _CHECKS:
+                raise ValueError(f"Unsupported constraint {constraint}.")
+            names = constraint.argument_names
+            a = self._activities.setdefault(names[0], len(self._activities))
+            b = self._activities.setdefault(names[-1], len(self._activities))
+            pair = pairs.setdefault((a, b), len(pairs)) if isinstance(constraint, ChainResponse) else -1
+            groups.setdefault(type(constraint), []).append((column, a, b, pair))
+        n_activities = len(self._activities)
+        self._pairs = np.full((n_activities + 1, n_activities + 1), -1, dtype=np.int64)
+        for (a, b), pair in pairs.items():
+            self._pairs[a, b] = pair
+        self._groups = [
+            (_CHECKS[template_cls], *(np.array(column, dtype=np.int64) for column in zip(*rows)))
+            for template_cls, rows in groups.items()
+        ]
+
+    @property
+    def constraints(self) -> List[Template]:
+        """Get the constraints, in column order."""
+        return list(self._constraints)
+
+    @property
+    def activities(self) -> List[str]:
+        """Get the activities of the constraints."""
+        return list(self._activities)
+
+    @property
+    def chunk_size(self) -> int:
+        """Get the number of traces checked per pass."""
+        return self._chunk_size
+
+    def check(self, log: EventLog) -> "np.ndarray":
+        """Check the constraints against every trace of a log.
+
+        :param log: the event log.
+        :return: the traces x constraints boolean satisfaction matrix.
+        """
+        import numpy as np
+
+        n_activities = len(self._activities)
+        lookup = np.array([self._activities.get(name, n_activities) for name in log.activities], dtype=np.int64)
+        satisfied = np.empty((len(log), len(self._constraints)), dtype=bool)
+        offsets = log.offsets
+        for start in range(0, len(log), self._chunk_size):
+            end = min(start + self._chunk_size, len(log))
+            events = log.events[offsets[start] : offsets[end]]
+            activities = lookup[events]
+            statistics = _Statistics(activities, offsets[start : end + 1] - offsets[start], n_activities, self._pairs)
+            for check, columns, a, b, pairs in self._groups:
+                satisfied[start:end, columns] = check(statistics, a, b, pairs)
+        return satisfied
+
+    def check_traces(self, traces: Iterable[Sequence[str]]) -> "np.ndarray":
+        """Check the constraints against traces of activity names.
+
+        :param traces: the traces.
+        :return: the traces x constraints boolean satisfaction matrix.
+        """
+        return self.check(EventLog.from_traces(traces))
+
+
+def check(log: EventLog, constraints: Sequence[Template], chunk_size: Optional[int] = None) -> "np.ndarray":
+    """Check constraints against every trace of a log.
+
+    :param log: the event log.
+    :param constraints: the constraints.
+    :param chunk_size: the number of traces checked per pass.
+    :return: the traces x constraints boolean satisfaction matrix.
+    """
+    return ConformanceChecker(constraints, chunk_size or _CHUNK_SIZE).check(log)
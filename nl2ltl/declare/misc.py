@@ -1,9 +1,12 @@
 """Helper functions."""
-from typing import Sequence, Type
+import functools
+from typing import Callable, Dict, Sequence, Type, TypeVar
 
-from pylogics.syntax.base import Formula
+from pylogics.syntax.base import Formula, _BinaryOp, _UnaryOp
 from pylogics.syntax.ltl import Atomic
 
+T = TypeVar("T")
+
 
 def _enforce(condition: bool, message: str = "", exception_cls: Type[Exception] = AssertionError):
     """User-defined assert."""
@@ -32,3 +35,41 @@ def enforce_binary(operands: Sequence[Formula]):
         "some argument is not an instance of 'Atomic'",
         exception_cls=ValueError,
     )
+
+
+def memoize_translation(method: Callable[..., T]) -> Callable[..., T]:
+    """Memoize a translation method (e.g. to_ltlf) on the instance it is called on."""
+    attribute = f"_memoized_{method.__name__}"
+
+    @functools.wraps(method)
+    def wrapper(self) -> T:
+        try:
+            return self.__dict__[attribute]
+        except KeyError:
+            result = self.__dict__[attribute] = method(self)
+            return result
+
+    wrapper.memoized_attribute = attribute  # type: ignore
+    return wrapper
+
+
+def share_subformulas(formula: Formula, table: Dict[Formula, Formula]) -> Formula:
+    """Rebuild a formula so that its subformulas are shared with the ones already in the table.
+
+    :param formula: the formula to rebuild.
+    :param table: the table of shared subformulas, updated in place.
+    :return: a formula equal to the input, made of shared subformulas.
+    """
+    shared = table.get(formula)
+    if shared is not None:
+        return shared
+    if isinstance(formula, _UnaryOp):
+        argument = share_subformulas(formula.argument, table)
+        if argument is not formula.argument:
+            formula = type(formula)(argument)
+    elif isinstance(formula, _BinaryOp):
+        operands = tuple(share_subformulas(operand, table) for operand in formula.operands)
+        if any(new is not old for new, old in zip(operands, formula.operands)):
+            formula = type(formula)(*operands)
+    table[formula] = formula
+    return formula
@@ -0,0 +1,208 @@
+"""Serialization of templates and translation results.
+
+A template serializes to its name and the names of its arguments, e.g. {"template": "Response", "arguments":
+["slack", "gmail"]}, and parses back from its string representation, e.g. '(Response slack gmail)'.
+
+Many results, e.g. a translated corpus, serialize to a columnar table: a dictionary of the template names, a
+dictionary of the symbols, and one row per formula with the template id, the symbol ids of its arguments (-1 when
+missing), and its confidence; `offsets` delimit the rows of each result. The table is written as JSON, or as the
+more compact msgpack, which requires the msgpack package. Neither requires pickle.
+"""
+import json
+import re
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple, Type
+
+from pylogics.syntax.base import Formula
+
+from nl2ltl.declare.base import Template, atom
+from nl2ltl.declare.declare import (
+    Absence,
+    ChainResponse,
+    Existence,
+    ExistenceTwo,
+    NotCoExistence,
+    Precedence,
+    RespondedExistence,
+    Response,
+)
+
+TEMPLATES: Mapping[str, Type[Template]] = MappingProxyType(
+    {
+        template_cls.SYMBOL: template_cls
+        for template_cls in (
+            Existence,
+            ExistenceTwo,
+            Absence,
+            RespondedExistence,
+            Response,
+            Precedence,
+            ChainResponse,
+            NotCoExistence,
+        )
+    }
+)
+"""The template classes, indexed by name."""
+
+TABLE_VERSION = 1
+_COLUMNS = ("offsets", "template", "argument1", "argument2", "confidence")
+_TOKEN = re.compile(r'"[^"]*"|[^\s()"]+')
+
+
+def template_to_json(template: Formula) -> Dict[str, Any]:
+    """Serialize a template.
+
+    :param template: the template.
+    :return: a JSON-compatible dict with the template name and the names of its arguments.
+    """
+    if not isinstance(template, Template):
+        raise ValueError(f"Only templates can be serialized, found {type(template).__name__}.")
+    return {"template": template.SYMBOL, "arguments": list(template.argument_names)}
+
+
+def make_template(name: str, arguments: Sequence[str]) -> Template:
+    """Build a template from its name and the names of its arguments.
+
+    :param name: the template name, e.g. 'Response'.
+    :param arguments: the names of the atomic arguments.
+    :return: the (interned) template.
+    """
+    template_cls = TEMPLATES.get(name)
+    if template_cls is None:
+        raise ValueError(f"Unknown template {name!r}, expected one of {sorted(TEMPLATES)}.")
+    try:
+        return template_cls(*map(atom, arguments))
+    except TypeError as e:
+        raise ValueError(f"Wrong arguments {list(arguments)} for template {name!r}.") from e
+
+
+def template_from_json(data: Mapping[str, Any]) -> Template:
+    """Deserialize a template.
+
+    :param data: a dict with the template name and the names of its arguments, e.g. produced by
+        template_to_json or nl2ltl.engines.utils.serialize_result.
+    :return: the template.
+    """
+    return make_template(data["template"], data["arguments"])
+
+
+def parse_template(text: str) -> Template:
+    """Parse a template from its string representation.
+
+    :param text: the string representation, e.g. '(Response slack gmail)'.
+    :return: the template.
+    """
+    stripped = text.strip()
+    tokens = _TOKEN.findall(stripped)
+    if not (stripped.startswith("(") and stripped.endswith(")")) or len(tokens) < 2:
+        raise ValueError(f"Cannot parse a template from {text!r}.")
+    return make_template(tokens[0], tokens[1:])
+
+
+def result_to_json(result: Dict[Formula, float]) -> List[Dict[str, Any]]:
+    """Serialize a translation result, in order.
+
+    :param result: the formulas with their confidence.
+    :return: one JSON-compatible dict per formula, with the template name, the names of its arguments and the
+        confidence.
+    """
+    return [{**template_to_json(formula), "confidence": float(confidence)} for formula, confidence in result.items()]
+
+
+def result_from_json(data: Iterable[Mapping[str, Any]]) -> Dict[Formula, float]:
+    """Deserialize a translation result.
+
+    :param data: the dicts produced by result_to_json, or nl2ltl.engines.utils.serialize_result.
+    :return: the formulas with their confidence, in order.
+    """
+    return {template_from_json(item): float(item["confidence"]) for item in data}
+
+
+def results_to_table(results: Iterable[Dict[Formula, float]]) -> Dict[str, Any]:
+    """Serialize many translation results to a columnar table.
+
+    :param results: the translation results.
+    :return: a JSON-compatible dict with the dictionaries of the templates and of the symbols, and the columns.
+    """
+    template_ids: Dict[str, int] = {}
+    symbol_ids: Dict[str, int] = {}
+    offsets: List[int] = [0]
+    templates: List[int] = []
+    arguments1: List[int] = []
+    arguments2: List[int] = []
+    confidences: List[float] = []
+    for result in results:
+        for formula, confidence in result.items():
+            if not isinstance(formula, Template):
+                raise ValueError(f"Only templates can be serialized, found {type(formula).__name__}.")
+            names = formula.argument_names
+            templates.append(template_ids.setdefault(formula.SYMBOL, len(template_ids)))
+            arguments1.append(symbol_ids.setdefault(names[0], len(symbol_ids)))
+            arguments2.append(symbol_ids.setdefault(names[1], len(symbol_ids)) if len(names) > 1 else -1)
+            confidences.append(float(confidence))
+        offsets.append(len(templates))
+    return {
+        "version": TABLE_VERSION,
+        "templates": list(template_ids),
+        "symbols": list(symbol_ids),
+        "offsets": offsets,
+        "template": templates,
+        "argument1": arguments1,
+        "argument2": arguments2,
+        "confidence": confidences,
+    }
+
+
+def results_from_table(table: Mapping[str, Any]) -> List[Dict[Formula, float]]:
+    """Deserialize many translation results from a columnar table.
+
+    :param table: the table produced by results_to_table.
+    :return: the translation results, in order.
+    """
+    if table.get("version") != TABLE_VERSION:
+        raise ValueError(f"Unsupported table version {table.get('version')!r}, expected {TABLE_VERSION}.")
+    missing = [column for column in _COLUMNS if column not in table]
+    if missing:
+        raise ValueError(f"Missing columns {missing}.")
+    names = table["templates"]
+    symbols = table["symbols"]
+    # rows repeat across results: build each distinct template once
+    interned: Dict[Tuple[int, int, int], Template] = {}
+    formulas: List[Template] = []
+    for key in zip(table["template"], table["argument1"], table["argument2"]):
+        formula = interned.get(key)
+        if formula is None:
+            template_id, argument1, argument2 = key
+            arguments = [symbols[argument1]] if argument2 < 0 else [symbols[argument1], symbols[argument2]]
+            formula = interned[key] = make_template(names[template_id], arguments)
+        formulas.append(formula)
+    confidences = table["confidence"]
+    offsets = table["offsets"]
+    return [
+        {formulas[row]: float(confidences[row]) for row in range(start, end)}
+        for start, end in zip(offsets, offsets[1:])
+    ]
+
+
+def dumps(results: Iterable[Dict[Formula, float]]) -> str:
+    """Serialize many translation results to a JSON columnar table."""
+    return json.dumps(results_to_table(results), separators=(",", ":"))
+
+
+def loads(data: str) -> List[Dict[Formula, float]]:
+    """Deserialize many translation results from a JSON columnar table."""
+    return results_from_table(json.loads(data))
+
+
+def packb(results: Iterable[Dict[Formula, float]]) -> bytes:
+    """Serialize many translation results to a msgpack columnar table. It requires msgpack."""
+    import msgpack
+
+    return msgpack.packb(results_to_table(results))
+
+
+def unpackb(data: bytes) -> List[Dict[Formula, float]]:
+    """Deserialize many translation results from a msgpack columnar table. It requires msgpack."""
+    import msgpack
+
+    return results_from_table(msgpack.unpackb(data))
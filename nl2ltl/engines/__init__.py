@@ -1,3 +1,5 @@
 """Engines for nl2ltl."""
 
+# importing the grounding module registers the DECLARE grounding functions.
+from nl2ltl.engines import grounding  # noqa: F401
 from nl2ltl.engines.base import Engine  # noqa: F401
@@ -1,6 +1,7 @@
 """Abstract definition of a engine."""
+import asyncio
 from abc import ABC, ABCMeta
-from typing import Dict
+from typing import Dict, List, Sequence
 
 from pylogics.syntax.base import Formula
 
@@ -32,3 +33,37 @@ class Engine(ABC, metaclass=_MetaEngine):
         :return: the corresponding LTLf formula template
         """
         raise self.__not_supported_error(self.translate.__name__)
+
+    def translate_many(self, utterances: Sequence[str], filtering: Filter = None) -> List[Dict[Formula, float]]:
+        """Transform many Natural Language utterances into LTLf formulas.
+
+        Engines that can process utterances in batch should override this method.
+        The default implementation translates the utterances one at a time.
+
+        :param utterances: a sequence of Natural Language utterances
+        :param filtering: a custom filtering algorithm
+        :return: the corresponding LTLf formula templates, in input order
+        """
+        return [self.translate(utterance, filtering) for utterance in utterances]
+
+    async def atranslate(self, utterance: str, filtering: Filter = None) -> Dict[Formula, float]:
+        """Transform a Natural Language utterance into an LTLf formula, asynchronously.
+
+        Engines with a native asynchronous interface should override this method.
+        The default implementation runs `translate` in the default executor of the running loop.
+
+        :param utterance: a Natural Language utterance
+        :param filtering: a custom filtering algorithm
+        :return: the corresponding LTLf formula template
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.translate, utterance, filtering)
+
+    async def atranslate_many(self, utterances: Sequence[str], filtering: Filter = None) -> List[Dict[Formula, float]]:
+        """Transform many Natural Language utterances into LTLf formulas, asynchronously.
+
+        :param utterances: a sequence of Natural Language utterances
+        :param filtering: a custom filtering algorithm
+        :return: the corresponding LTLf formula templates, in input order
+        """
+        return list(await asyncio.gather(*(self.atranslate(utterance, filtering) for utterance in utterances)))
@@ -0,0 +1,297 @@
+"""Implementation of the cascading engine.
+
+The cascade tries cheap engines first, e.g. the rule-based or the Rasa engine, and escalates to the next tier,
+e.g. the GPT engine, when the best confidence of a tier is below its threshold, when grounding gives no formula,
+or when the tier fails. With a latency budget, a tier that does not answer in time is raced against the next one.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Sequence, Set, Union
+
+from pylogics.syntax.base import Formula
+
+from nl2ltl.engines.base import Engine
+from nl2ltl.filters.base import Filter
+from nl2ltl.instrumentation import stage
+
+
+@dataclass
+class TierStats:
+    """Dataclass to represent the counters of a tier."""
+
+    calls: int = 0
+    accepted: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+    @property
+    def escalated(self) -> int:
+        """Get the number of answers of the tier that were not accepted."""
+        return self.calls - self.accepted - self.errors
+
+    @property
+    def acceptance_rate(self) -> float:
+        """Get the fraction of calls whose answer was accepted."""
+        return self.accepted / self.calls if self.calls else 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        """Get the mean latency of the calls, in seconds."""
+        return self.seconds / self.calls if self.calls else 0.0
+
+
+class CascadeEngine(Engine):
+    """The cascading engine."""
+
+    def __init__(
+        self,
+        engines: Sequence[Engine],
+        thresholds: Union[float, Sequence[float]] = 0.8,
+        budget: Optional[float] = None,
+    ):
+        """Cascading Engine initialization.
+
+        :param engines: the tiers, from the cheapest to the most expensive.
+        :param thresholds: the minimum confidence of the best formula for an answer to be accepted,
+            either one for all tiers or one per tier; the answer of the last tier is always accepted.
+        :param budget: the seconds to wait for a tier before racing it against the next one;
+            None escalates only when a tier answers with no acceptable formula.
+        """
+        self._engines = list(engines)
+        self._thresholds = (
+            [float(thresholds)] * len(self._engines) if isinstance(thresholds, (int, float)) else list(thresholds)
+        )
+        self._budget = budget
+        self._stats = [TierStats() for _ in self._engines]
+        self._stats_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self._check_consistency()
+
+    def _check_consistency(self) -> None:
+        """Run consistency checks."""
+        if not self._engines:
+            raise ValueError("The cascade needs at least one engine.")
+        if len(self._thresholds) != len(self._engines):
+            raise ValueError(f"Expected {len(self._engines)} thresholds, found {len(self._thresholds)}.")
+        if self._budget is not None and self._budget < 0:
+            raise ValueError(f"The latency budget must be non-negative, found {self._budget}.")
+
+    @property
+    def engines(self) -> List[Engine]:
+        """Get the tiers."""
+        return list(self._engines)
+
+    @property
+    def thresholds(self) -> List[float]:
+        """Get the confidence threshold of each tier."""
+        return list(self._thresholds)
+
+    @property
+    def budget(self) -> Optional[float]:
+        """Get the latency budget of each tier, in seconds."""
+        return self._budget
+
+    @property
+    def stats(self) -> List[TierStats]:
+        """Get a snapshot of the counters of each tier."""
+        with self._stats_lock:
+            return [replace(stats) for stats in self._stats]
+
+    def _accepts(self, tier: int, result: Dict[Formula, float]) -> bool:
+        """Check whether the answer of a tier is acceptable."""
+        if tier == len(self._engines) - 1:
+            return True
+        return bool(result) and max(result.values()) >= self._thresholds[tier]
+
+    def _record(self, tier: int, seconds: float, calls: int = 1, errors: int = 0) -> None:
+        """Update the counters of a tier after some calls."""
+        with self._stats_lock:
+            self._stats[tier].calls += calls
+            self._stats[tier].errors += errors
+            self._stats[tier].seconds += seconds
+
+    def _accept(self, tier: int, n: int = 1) -> None:
+        """Count the accepted answers of a tier."""
+        with self._stats_lock:
+            self._stats[tier].accepted += n
+
+    def _collect(
+        self,
+        tier: int,
+        pending: List[int],
+        outputs: Sequence[Dict[Formula, float]],
+        results: List[Optional[Dict[Formula, float]]],
+    ) -> List[int]:
+        """Store the accepted answers of a tier to a batch, and return the indices of the utterances to escalate."""
+        escalated = []
+        for index, output in zip(pending, outputs):
+            if self._accepts(tier, output):
+                results[index] = output
+            else:
+                escalated.append(index)
+        self._accept(tier, len(pending) - len(escalated))
+        return escalated
+
+    def _run(self, tier: int, utterance: str, filtering: Filter = None) -> Dict[Formula, float]:
+        """Translate an utterance with a tier, updating its counters."""
+        start = time.perf_counter()
+        try:
+            with stage(f"cascade.tier{tier}"):
+                result = self._engines[tier].translate(utterance, filtering)
+        except Exception:
+            self._record(tier, time.perf_counter() - start, errors=1)
+            raise
+        self._record(tier, time.perf_counter() - start)
+        return result
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the executor running the raced tiers, creating it on first use."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(thread_name_prefix="nl2ltl-cascade")
+        return self._executor
+
+    def translate(self, utterance: str, filtering: Filter = None) -> Dict[Formula, float]:
+        """From NL to best matching LTL formulas with confidence, escalating through the tiers."""
+        if self._budget is not None:
+            return self._translate_raced(utterance, filtering)
+        last_tier = len(self._engines) - 1
+        for tier in range(len(self._engines)):
+            try:
+                result = self._run(tier, utterance, filtering)
+            except Exception:
+                if tier == last_tier:
+                    raise
+                continue
+            if self._accepts(tier, result):
+                self._accept(tier)
+                return result
+        raise AssertionError("unreachable")
+
+    def _translate_raced(self, utterance: str, filtering: Filter = None) -> Dict[Formula, float]:
+        """Escalate through the tiers, starting the next tier also when the running ones exceed the budget.
+
+        The first acceptable answer wins; the slower tiers keep running in the background, but are ignored.
+        """
+        executor = self._get_executor()
+        last_tier = len(self._engines) - 1
+        pending: Dict[Future, int] = {}
+        next_tier = 0
+        error: Optional[BaseException] = None
+        done: Set[Future] = set()
+        while True:
+            # escalate when no tier is running anymore, race the next tier when the budget is exceeded
+            if not pending and next_tier > last_tier:
+                raise error  # type: ignore[misc]
+            if not pending or (not done and next_tier <= last_tier):
+                pending[executor.submit(self._run, next_tier, utterance, filtering)] = next_tier
+                next_tier += 1
+            timeout = self._budget if next_tier <= last_tier else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                tier = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if self._accepts(tier, result):
+                    self._accept(tier)
+                    return result
+
+    def translate_many(self, utterances: Sequence[str], filtering: Filter = None) -> List[Dict[Formula, float]]:
+        """From many NL utterances to best matching LTL formulas with confidence.
+
+        Each tier translates the utterances escalated by the previous one in a single batch.
+        The latency budget does not apply to batches.
+        """
+        results: List[Optional[Dict[Formula, float]]] = [None] * len(utterances)
+        pending = list(range(len(utterances)))
+        last_tier = len(self._engines) - 1
+        for tier, engine in enumerate(self._engines):
+            if not pending:
+                break
+            start = time.perf_counter()
+            try:
+                with stage(f"cascade.tier{tier}"):
+                    outputs = engine.translate_many([utterances[index] for index in pending], filtering)
+            except Exception:
+                self._record(tier, time.perf_counter() - start, calls=len(pending), errors=len(pending))
+                if tier == last_tier:
+                    raise
+                continue
+            self._record(tier, time.perf_counter() - start, calls=len(pending))
+            pending = self._collect(tier, pending, outputs, results)
+        return [result if result is not None else {} for result in results]
+
+    async def atranslate(self, utterance: str, filtering: Filter = None) -> Dict[Formula, float]:
+        """From NL to best matching LTL formulas with confidence, asynchronously; see translate."""
+        last_tier = len(self._engines) - 1
+        tasks: Dict[asyncio.Task, int] = {}
+        next_tier = 0
+
+        async def run(tier: int) -> Dict[Formula, float]:
+            start = time.perf_counter()
+            try:
+                with stage(f"cascade.tier{tier}"):
+                    result = await self._engines[tier].atranslate(utterance, filtering)
+            except Exception:
+                self._record(tier, time.perf_counter() - start, errors=1)
+                raise
+            self._record(tier, time.perf_counter() - start)
+            return result
+
+        error: Optional[BaseException] = None
+        done: Set[asyncio.Task] = set()
+        try:
+            while True:
+                if not tasks and next_tier > last_tier:
+                    raise error  # type: ignore[misc]
+                if not tasks or (not done and next_tier <= last_tier):
+                    tasks[asyncio.ensure_future(run(next_tier))] = next_tier
+                    next_tier += 1
+                timeout = self._budget if next_tier <= last_tier else None
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tier = tasks.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        error = e
+                        continue
+                    if self._accepts(tier, result):
+                        self._accept(tier)
+                        return result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def atranslate_many(self, utterances: Sequence[str], filtering: Filter = None) -> List[Dict[Formula, float]]:
+        """From many NL utterances to best matching LTL formulas with confidence, asynchronously; see translate_many."""
+        results: List[Optional[Dict[Formula, float]]] = [None] * len(utterances)
+        pending = list(range(len(utterances)))
+        last_tier = len(self._engines) - 1
+        for tier, engine in enumerate(self._engines):
+            if not pending:
+                break
+            start = time.perf_counter()
+            try:
+                with stage(f"cascade.tier{tier}"):
+                    outputs = await engine.atranslate_many([utterances[index] for index in pending], filtering)
+            except Exception:
+                self._record(tier, time.perf_counter() - start, calls=len(pending), errors=len(pending))
+                if tier == last_tier:
+                    raise
+                continue
+            self._record(tier, time.perf_counter() - start, calls=len(pending))
+            pending = self._collect(tier, pending, outputs, results)
+        return [result if result is not None else {} for result in results]
+
+    def close(self) -> None:
+        """Stop the executor running the raced tiers."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
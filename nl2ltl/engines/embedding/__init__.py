@@ -0,0 +1 @@
+"""Implementation of the embedding-based engine."""
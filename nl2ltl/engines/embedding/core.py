@@ -0,0 +1,224 @@
+"""Implementation of the embedding-based engine.
+
+A lightweight CPU alternative to the Rasa DIET pipeline: utterances are embedded as hashed word and char n-gram
+counts, as the CountVectorsFeaturizer of the Rasa configuration, and scored against the template centroids of the
+Rasa NLU training examples with a single matrix product per batch. It requires NumPy.
+"""
+import functools
+import re
+import zlib
+from itertools import chain
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Sequence, Tuple
+
+from pylogics.syntax.base import Formula
+
+from nl2ltl.engines.base import Engine
+from nl2ltl.engines.rasa.core import TRAINING_PATH
+from nl2ltl.engines.rasa.output import RasaOutput, parse_rasa_result
+from nl2ltl.engines.symbols import SymbolExtractor
+from nl2ltl.engines.utils import _load_examples, _match_template_name
+from nl2ltl.filters.base import Filter
+from nl2ltl.helpers import requires_optional
+from nl2ltl.instrumentation import stage
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_WORD = re.compile(r"\w+")
+_SYMBOL_PLACEHOLDER = " symbol "
+_BATCH_SIZE = 1024
+_WORD_CACHE_SIZE = 2**16
+
+
+class HashedNgramVectorizer:
+    """Embed texts as L2-normalized, sublinear counts of hashed words and char n-grams.
+
+    Char n-grams are taken within word boundaries, as the 'char_wb' analyzer of Rasa. Hashing keeps the
+    dimension fixed with no vocabulary to store; hashes are stable across processes. The feature indices of the
+    most recent words are memoized in a bounded LRU cache.
+    """
+
+    def __init__(self, n_features: int = 2**12, min_ngram: int = 1, max_ngram: int = 4):
+        """Initialize the vectorizer.
+
+        :param n_features: the dimension of the embeddings.
+        :param min_ngram: the minimum length of the char n-grams.
+        :param max_ngram: the maximum length of the char n-grams.
+        """
+        if n_features < 1:
+            raise ValueError(f"The number of features must be positive, found {n_features}.")
+        if not 1 <= min_ngram <= max_ngram:
+            raise ValueError(f"Invalid n-gram range ({min_ngram}, {max_ngram}).")
+        self._n_features = n_features
+        self._min_ngram = min_ngram
+        self._max_ngram = max_ngram
+        self._word_indices = functools.lru_cache(maxsize=_WORD_CACHE_SIZE)(self._hash_word)
+
+    @property
+    def n_features(self) -> int:
+        """Get the dimension of the embeddings."""
+        return self._n_features
+
+    def _hash_word(self, word: str) -> Tuple[int, ...]:
+        """Get the feature indices of a word and of its char n-grams."""
+        padded = f" {word} "
+        ngrams = [f"w:{word}"] + [
+            padded[start : start + n]
+            for n in range(self._min_ngram, self._max_ngram + 1)
+            for start in range(len(padded) - n + 1)
+        ]
+        return tuple(zlib.crc32(ngram.encode()) % self._n_features for ngram in ngrams)
+
+    def features(self, text: str) -> List[int]:
+        """Get the feature indices of a text, with repetitions."""
+        return list(chain.from_iterable(map(self._word_indices, _WORD.findall(text.lower()))))
+
+    def transform(self, texts: Sequence[str]) -> "np.ndarray":
+        """Embed many texts.
+
+        :param texts: the texts.
+        :return: a (len(texts), n_features) float32 matrix with L2-normalized rows.
+        """
+        import numpy as np
+
+        features = [self.features(text) for text in texts]
+        n_texts, n_features = len(texts), self._n_features
+        rows = np.repeat(np.arange(n_texts, dtype=np.int64), [len(text_features) for text_features in features])
+        columns = np.array(list(chain.from_iterable(features)), dtype=np.int64)
+        # normalize the non-zero entries only, then scatter them into the dense matrix
+        keys, counts = np.unique(rows * n_features + columns, return_counts=True)
+        values = np.log1p(counts.astype(np.float32))
+        norms = np.sqrt(np.bincount(keys // n_features, weights=values * values, minlength=n_texts))
+        matrix = np.zeros(n_texts * n_features, dtype=np.float32)
+        matrix[keys] = values / norms[keys // n_features]
+        matrix = matrix.reshape(n_texts, n_features)
+        return matrix
+
+
+@requires_optional(module="numpy", name="NumPy")
+class EmbeddingEngine(Engine):
+    """The embedding-based engine."""
+
+    def __init__(
+        self,
+        training: Path = TRAINING_PATH,
+        symbols: Iterable[str] = (),
+        n_features: int = 2**12,
+        min_ngram: int = 1,
+        max_ngram: int = 4,
+        temperature: float = 0.02,
+    ):
+        """Embedding Engine initialization.
+
+        The centroid of each template is the normalized mean embedding of its training examples, with the symbol
+        mentions masked. Confidences are the softmax of the cosine similarities to the centroids, divided by
+        `temperature`.
+
+        :param training: the Rasa NLU training file with the examples and the known symbols.
+        :param symbols: additional known symbols.
+        :param n_features: the dimension of the hashed embeddings.
+        :param min_ngram: the minimum length of the char n-grams.
+        :param max_ngram: the maximum length of the char n-grams.
+        :param temperature: the softmax temperature of the confidences.
+        """
+        if temperature <= 0:
+            raise ValueError(f"The temperature must be positive, found {temperature}.")
+        self._temperature = temperature
+        self._vectorizer = HashedNgramVectorizer(n_features, min_ngram, max_ngram)
+        examples, seed_symbols = _load_examples(None, training)
+        self._extractor = SymbolExtractor([*seed_symbols, *symbols])
+        self._templates, self._centroids = self._fit([(text, pattern) for text, pattern, _ in examples])
+        self._arities: Dict[str, int] = {name: 1 for name in self._templates}
+        for _, pattern, example_symbols in examples:
+            name = _match_template_name(pattern)
+            self._arities[name] = max(self._arities[name], len(set(example_symbols)))
+
+    @property
+    def templates(self) -> List[str]:
+        """Get the template names, in centroid order."""
+        return list(self._templates)
+
+    @property
+    def centroids(self) -> "np.ndarray":
+        """Get the (templates, n_features) matrix of the template centroids."""
+        return self._centroids
+
+    @property
+    def temperature(self) -> float:
+        """Get the softmax temperature of the confidences."""
+        return self._temperature
+
+    @property
+    def extractor(self) -> SymbolExtractor:
+        """Get the extractor of the known symbols."""
+        return self._extractor
+
+    def _mask(self, utterance: str) -> str:
+        """Replace the symbol mentions of an utterance with a placeholder."""
+        return self._extractor.mask(utterance, _SYMBOL_PLACEHOLDER)
+
+    def _fit(self, examples: Sequence[Tuple[str, str]]) -> Tuple[List[str], "np.ndarray"]:
+        """Compute the template centroids of the training examples."""
+        import numpy as np
+
+        names = [_match_template_name(pattern) for _, pattern in examples]
+        templates = sorted(set(names))
+        embeddings = self._vectorizer.transform([self._mask(text) for text, _ in examples])
+        centroids = np.zeros((len(templates), self._vectorizer.n_features), dtype=np.float32)
+        for row, name in enumerate(names):
+            centroids[templates.index(name)] += embeddings[row]
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        np.divide(centroids, norms, out=centroids, where=norms > 0)
+        return templates, centroids
+
+    def rank(self, utterances: Sequence[str]) -> List[Dict[str, float]]:
+        """Rank the templates for many utterances.
+
+        :param utterances: the natural language utterances.
+        :return: the confidence of every template, in decreasing order, for every utterance.
+        """
+        import numpy as np
+
+        rankings: List[Dict[str, float]] = []
+        for start in range(0, len(utterances), _BATCH_SIZE):
+            batch = utterances[start : start + _BATCH_SIZE]
+            with stage("embedding.vectorize"):
+                embeddings = self._vectorizer.transform([self._mask(utterance) for utterance in batch])
+            with stage("embedding.score"):
+                logits = embeddings @ self._centroids.T / self._temperature
+                logits -= logits.max(axis=1, keepdims=True)
+                confidences = np.exp(logits)
+                confidences /= confidences.sum(axis=1, keepdims=True)
+                orders = np.argsort(-confidences, axis=1, kind="stable")
+            rankings.extend(
+                {self._templates[column]: float(scores[column]) for column in order}
+                for scores, order in zip(confidences.tolist(), orders.tolist())
+            )
+        return rankings
+
+    def _outputs(self, utterances: Sequence[str]) -> List[RasaOutput]:
+        """Classify many utterances into Rasa-like outputs.
+
+        The ranking of each output only keeps the templates that its symbols can ground, e.g. no binary template
+        for a single symbol.
+        """
+        outputs = []
+        mentions = self._extractor.extract_many(utterances)
+        for utterance, ranking, utterance_mentions in zip(utterances, self.rank(utterances), mentions):
+            top = next(iter(ranking))
+            entities = {symbol: 1.0 for symbol in utterance_mentions}
+            groundable = {
+                name: confidence for name, confidence in ranking.items() if self._arities[name] <= len(entities)
+            }
+            outputs.append(RasaOutput(utterance, {top: ranking[top]}, entities, groundable))
+        return outputs
+
+    def translate(self, utterance: str, filtering: Filter = None) -> Dict[Formula, float]:
+        """From NL to best matching LTL formulas with confidence."""
+        (output,) = self._outputs([utterance])
+        return parse_rasa_result(output, filtering)
+
+    def translate_many(self, utterances: Sequence[str], filtering: Filter = None) -> List[Dict[Formula, float]]:
+        """From many NL utterances to best matching LTL formulas with confidence, classified as a single batch."""
+        return [parse_rasa_result(output, filtering) for output in self._outputs(utterances)]
@@ -5,23 +5,45 @@ Website:
     https://openai.com
 
 """
+import asyncio
+import hashlib
+import importlib.metadata
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from enum import Enum
 from pathlib import Path
-from typing import Dict, Set
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Set, Tuple, cast
 
-from openai import OpenAI
 from pylogics.syntax.base import Formula
 
+from nl2ltl.cache.base import Cache, make_key, normalize_utterance
 from nl2ltl.engines.base import Engine
 from nl2ltl.engines.gpt import ENGINE_ROOT
-from nl2ltl.engines.gpt.output import GPTOutput, parse_gpt_output, parse_gpt_result
+from nl2ltl.engines.gpt.output import (
+    GPTOutput,
+    _aread_gpt_stream,
+    _GPTStreamParser,
+    _read_gpt_stream,
+    correct_gpt_output,
+    parse_gpt_output,
+    parse_gpt_result,
+    parse_packed_gpt_output,
+)
+from nl2ltl.engines.gpt.prompt import SUPPORTED_PROMPT_MODES, FewShotSelector, PromptModes
+from nl2ltl.engines.gpt.scheduler import Priority, RequestScheduler
+from nl2ltl.engines.symbols import SymbolExtractor
 from nl2ltl.filters.base import Filter
+from nl2ltl.instrumentation import record_usage, stage
 
-try:
-    client = OpenAI()
-except Exception:
-    client = None
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
+_client: Optional["OpenAI"] = None
+_async_client: Optional["AsyncOpenAI"] = None
+_client_lock = threading.Lock()
 
 engine_root = ENGINE_ROOT
 DATA_DIR = engine_root / "data"
@@ -48,6 +70,38 @@ class OperationModes(Enum):
 
 SUPPORTED_MODES: Set[str] = {v.value for v in OperationModes}
 
+PACKED_INSTRUCTIONS = (
+    "Translate each of the following numbered sentences. "
+    "For the sentence number i, answer with the lines 'PATTERN i: ...' and 'SYMBOLS i: ...', "
+    "followed by a blank line.\n"
+)
+_MAX_TOKENS = 200
+_PACKED_MAX_TOKENS = 60
+
+
+def _get_client() -> "OpenAI":
+    """Get the OpenAI client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from openai import OpenAI
+
+                _client = OpenAI()
+    return _client
+
+
+def _get_async_client() -> "AsyncOpenAI":
+    """Get the asynchronous OpenAI client, creating it on first use."""
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                from openai import AsyncOpenAI
+
+                _async_client = AsyncOpenAI()
+    return _async_client
+
 
 class GPTEngine(Engine):
     """The GPT engine."""
@@ -58,14 +112,55 @@ class GPTEngine(Engine):
         prompt: Path = PROMPT_PATH,
         operation_mode: str = OperationModes.CHAT.value,
         temperature: float = 0.5,
+        max_concurrency: int = 8,
+        cache: Optional[Cache] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        priority: int = Priority.INTERACTIVE,
+        prompt_mode: str = PromptModes.INLINE.value,
+        few_shot: Optional[int] = None,
+        pack_size: int = 1,
+        stream: bool = False,
+        vocabulary: Optional[SymbolExtractor] = None,
     ):
-        """GPT LLM Engine initialization."""
+        """GPT LLM Engine initialization.
+
+        A scheduler enforces rate limits and retries failed requests; it can be shared by several engines,
+        whose requests are admitted by priority.
+        With `few_shot` set, each request includes only the `few_shot` prompt examples most similar to the utterance.
+        With `pack_size` greater than 1, batch translations send up to `pack_size` utterances per request.
+        With `stream`, single-utterance responses are streamed and closed as soon as the pattern and symbols are parsed.
+        With a `vocabulary`, the predicted symbols are validated and corrected against the known symbols.
+        """
         self._model = model
         self._prompt = self._load_prompt(prompt)
         self._operation_mode = operation_mode
         self._temperature = temperature
+        self._max_concurrency = max_concurrency
+        self._cache = cache
+        self._scheduler = scheduler
+        self._priority = priority
+        self._prompt_mode = prompt_mode
+        self._pack_size = pack_size
+        self._stream = stream
+        self._vocabulary = vocabulary
+        self._selector = FewShotSelector.from_prompt(self._prompt, few_shot) if few_shot is not None else None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
 
         self._check_consistency()
+        self._settings = _RequestSettings(
+            model,
+            self._prompt,
+            operation_mode,
+            temperature,
+            cache,
+            scheduler,
+            priority,
+            prompt_mode,
+            self._selector,
+            stream,
+            vocabulary,
+        )
 
     def _load_prompt(self, prompt):
         return json.load(open(prompt))["prompt"]
@@ -75,10 +170,13 @@ class GPTEngine(Engine):
         self.__check_openai_version()
         self.__check_model_support()
         self.__check_operation_mode()
+        self.__check_prompt_mode()
+        self.__check_max_concurrency()
+        self.__check_pack_size()
 
     def __check_openai_version(self):
         """Check that the GPT tool is at the right version."""
-        is_right_version = client._version == "1.12.0"
+        is_right_version = importlib.metadata.version("openai") == "1.12.0"
         if not is_right_version:
             raise Exception(
                 "OpenAI needs to be at version 1.12.0. "
@@ -99,6 +197,27 @@ class GPTEngine(Engine):
         if not is_supported:
             raise Exception(f"The operation mode {self.operation_mode} is not currently supported by nl2ltl.")
 
+    def __check_prompt_mode(self):
+        """Check if the prompt mode is a supported mode."""
+        is_supported = self.prompt_mode in SUPPORTED_PROMPT_MODES
+        if not is_supported:
+            raise Exception(f"The prompt mode {self.prompt_mode} is not currently supported by nl2ltl.")
+
+    def __check_max_concurrency(self):
+        """Check that the maximum number of concurrent requests is valid."""
+        if self.max_concurrency < 1:
+            raise Exception(f"The maximum concurrency must be at least 1, found {self.max_concurrency}.")
+
+    def __check_pack_size(self):
+        """Check that the number of utterances per request is valid."""
+        if self.pack_size < 1:
+            raise Exception(f"The number of utterances per request must be at least 1, found {self.pack_size}.")
+
+    def connect(self) -> None:
+        """Create the OpenAI clients eagerly, instead of on the first request."""
+        _get_client()
+        _get_async_client()
+
     @property
     def model(self) -> str:
         """Get the GPT model."""
@@ -114,66 +233,449 @@ class GPTEngine(Engine):
         """Get the GPT operation mode."""
         return self._operation_mode
 
+    @property
+    def prompt_mode(self) -> str:
+        """Get the GPT prompt mode."""
+        return self._prompt_mode
+
+    @property
+    def selector(self) -> Optional[FewShotSelector]:
+        """Get the selector of the few-shot examples, if any."""
+        return self._selector
+
     @property
     def temperature(self) -> float:
         """Get the GPT temperature."""
         return self._temperature
 
+    @property
+    def max_concurrency(self) -> int:
+        """Get the maximum number of concurrent requests."""
+        return self._max_concurrency
+
+    @property
+    def pack_size(self) -> int:
+        """Get the maximum number of utterances per request of a batch translation."""
+        return self._pack_size
+
+    @property
+    def stream(self) -> bool:
+        """Get whether single-utterance responses are streamed."""
+        return self._stream
+
+    @property
+    def vocabulary(self) -> Optional[SymbolExtractor]:
+        """Get the vocabulary validating the predicted symbols."""
+        return self._vocabulary
+
+    @property
+    def cache(self) -> Optional[Cache]:
+        """Get the cache of parsed GPT outputs."""
+        return self._cache
+
+    @property
+    def scheduler(self) -> Optional[RequestScheduler]:
+        """Get the scheduler of the GPT requests."""
+        return self._scheduler
+
+    @property
+    def priority(self) -> int:
+        """Get the priority of the GPT requests."""
+        return self._priority
+
     def translate(self, utterance: str, filtering: Filter = None) -> Dict[Formula, float]:
         """From NL to best matching LTL formulas with confidence."""
-        return _process_utterance(
+        return _process_utterance(utterance, self._settings, filtering)
+
+    def translate_many(self, utterances: Sequence[str], filtering: Filter = None) -> List[Dict[Formula, float]]:
+        """From many NL utterances to best matching LTL formulas with confidence.
+
+        Utterances are packed by `pack_size` per request, and requests are fanned out over at most
+        `max_concurrency` worker threads.
+        """
+        if len(utterances) <= 1:
+            return [self.translate(utterance, filtering) for utterance in utterances]
+        batches = _pack(utterances, self.pack_size)
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+            results = executor.map(lambda batch: self._translate_batch(batch, filtering), batches)
+            return [result for batch_results in results for result in batch_results]
+
+    def _translate_batch(self, utterances: Sequence[str], filtering: Filter = None) -> List[Dict[Formula, float]]:
+        """Translate a batch of utterances, with a single request if packing is enabled."""
+        if len(utterances) == 1:
+            return [self.translate(utterances[0], filtering)]
+        return _process_packed(utterances, self._settings, filtering)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Get the semaphore bounding the in-flight requests on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def atranslate(self, utterance: str, filtering: Filter = None) -> Dict[Formula, float]:
+        """From NL to best matching LTL formulas with confidence, asynchronously.
+
+        At most `max_concurrency` requests are in flight at the same time.
+        """
+        async with self._get_semaphore():
+            return await _aprocess_utterance(utterance, self._settings, filtering)
+
+    async def atranslate_many(self, utterances: Sequence[str], filtering: Filter = None) -> List[Dict[Formula, float]]:
+        """From many NL utterances to best matching LTL formulas with confidence, asynchronously.
+
+        Utterances are packed by `pack_size` per request, and at most `max_concurrency` requests are in flight.
+        """
+        if self.pack_size == 1:
+            return await super().atranslate_many(utterances, filtering)
+
+        async def translate_batch(batch: Sequence[str]) -> List[Dict[Formula, float]]:
+            if len(batch) == 1:
+                return [await self.atranslate(batch[0], filtering)]
+            async with self._get_semaphore():
+                return await _aprocess_packed(batch, self._settings, filtering)
+
+        results = await asyncio.gather(*(translate_batch(batch) for batch in _pack(utterances, self.pack_size)))
+        return [result for batch_results in results for result in batch_results]
+
+
+def _pack(utterances: Sequence[str], pack_size: int) -> List[Sequence[str]]:
+    """Split utterances into consecutive batches of at most `pack_size`."""
+    return [utterances[start : start + pack_size] for start in range(0, len(utterances), pack_size)]
+
+
+def _cache_key(
+    utterance: str,
+    model: str,
+    prompt: str,
+    operation_mode: str,
+    temperature: float,
+    prompt_mode: str = PromptModes.INLINE.value,
+    selector: Optional[FewShotSelector] = None,
+) -> str:
+    """Compute the cache key of a GPT request.
+
+    The prompt mode and the few-shot selection are part of the key only when not the default, so that existing
+    persistent caches stay valid.
+    """
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    parts: List[Any] = [
+        GPTEngine.__name__,
+        normalize_utterance(utterance),
+        model,
+        prompt_hash,
+        operation_mode,
+        temperature,
+    ]
+    if prompt_mode != PromptModes.INLINE.value or selector is not None:
+        parts.extend([prompt_mode, selector.k if selector is not None else None])
+    return make_key(*parts)
+
+
+def _make_request(
+    examples: str,
+    query: str,
+    model: str,
+    prompt: str,
+    operation_mode: str,
+    temperature: float,
+    prompt_mode: str,
+    selector: Optional[FewShotSelector],
+    max_tokens: int,
+    stop: Optional[List[str]],
+) -> Dict[str, Any]:
+    """Build the arguments of a GPT request, given the selected examples and the query."""
+    if selector is not None:
+        prompt = selector.header
+    if prompt_mode == PromptModes.PREFIX.value and operation_mode == OperationModes.CHAT.value:
+        messages = [{"role": "system", "content": prompt}, {"role": "user", "content": examples + query}]
+    else:
+        messages = [{"role": "user", "content": prompt + examples + query}]
+    request: Dict[str, Any] = dict(
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        top_p=1.0,
+        frequency_penalty=0.0,
+        presence_penalty=0.0,
+    )
+    if stop is not None:
+        request["stop"] = stop
+    if operation_mode == OperationModes.CHAT.value:
+        request["messages"] = messages
+    else:
+        request["prompt"] = messages[0]["content"]
+    return request
+
+
+def _build_request(
+    utterance: str,
+    model: str,
+    prompt: str,
+    operation_mode: str,
+    temperature: float,
+    prompt_mode: str = PromptModes.INLINE.value,
+    selector: Optional[FewShotSelector] = None,
+    stream: bool = False,
+) -> Dict[str, Any]:
+    """Build the arguments of the GPT request for the given operation and prompt modes."""
+    examples = selector.render(utterance) if selector is not None else ""
+    query = f"NL: {utterance}\n"
+    request = _make_request(
+        examples, query, model, prompt, operation_mode, temperature, prompt_mode, selector, _MAX_TOKENS, ["\n\n"]
+    )
+    if stream:
+        request["stream"] = True
+    return request
+
+
+def _build_packed_request(
+    utterances: Sequence[str],
+    model: str,
+    prompt: str,
+    operation_mode: str,
+    temperature: float,
+    prompt_mode: str = PromptModes.INLINE.value,
+    selector: Optional[FewShotSelector] = None,
+) -> Dict[str, Any]:
+    """Build the arguments of a GPT request translating many numbered utterances at once."""
+    examples = selector.render_many(utterances) if selector is not None else ""
+    query = PACKED_INSTRUCTIONS + "".join(f"NL {index}: {utterance}\n" for index, utterance in enumerate(utterances, 1))
+    max_tokens = _PACKED_MAX_TOKENS * len(utterances)
+    return _make_request(
+        examples, query, model, prompt, operation_mode, temperature, prompt_mode, selector, max_tokens, None
+    )
+
+
+@dataclass(frozen=True)
+class _RequestSettings:
+    """Dataclass to represent the settings shared by the GPT requests of an engine."""
+
+    model: str
+    prompt: str
+    operation_mode: str
+    temperature: float
+    cache: Optional[Cache] = None
+    scheduler: Optional[RequestScheduler] = None
+    priority: int = Priority.INTERACTIVE
+    prompt_mode: str = PromptModes.INLINE.value
+    selector: Optional[FewShotSelector] = None
+    stream: bool = False
+    vocabulary: Optional[SymbolExtractor] = None
+
+    def cache_key(self, utterance: str) -> str:
+        """Compute the cache key of the request translating an utterance."""
+        return _cache_key(
+            utterance, self.model, self.prompt, self.operation_mode, self.temperature, self.prompt_mode, self.selector
+        )
+
+    def request(self, utterance: str) -> Dict[str, Any]:
+        """Build the arguments of the request translating an utterance."""
+        return _build_request(
             utterance,
             self.model,
             self.prompt,
             self.operation_mode,
             self.temperature,
-            filtering,
+            self.prompt_mode,
+            self.selector,
+            self.stream,
         )
 
+    def packed_request(self, utterances: Sequence[str]) -> Dict[str, Any]:
+        """Build the arguments of the request translating many utterances at once."""
+        return _build_packed_request(
+            utterances, self.model, self.prompt, self.operation_mode, self.temperature, self.prompt_mode, self.selector
+        )
 
-def _process_utterance(
-    utterance: str,
-    model: str,
-    prompt: str,
-    operation_mode: str,
-    temperature: float,
-    filtering: Filter,
+
+def _create(client: Any, request: Dict[str, Any], operation_mode: str) -> Any:
+    """Send a request with the endpoint of the operation mode; with an asynchronous client, return the awaitable."""
+    if operation_mode == OperationModes.CHAT.value:
+        return client.chat.completions.create(**request)
+    return client.completions.create(**request)
+
+
+def _estimate_prompt_tokens(request: Dict[str, Any]) -> int:
+    """Estimate the prompt tokens of a request, at about four characters per token."""
+    prompt = request.get("prompt") or "".join(message["content"] for message in request.get("messages", ()))
+    return len(prompt) // 4
+
+
+def _estimate_tokens(request: Dict[str, Any]) -> int:
+    """Estimate the prompt and completion tokens of a request, at most max_tokens completion tokens."""
+    return _estimate_prompt_tokens(request) + request["max_tokens"]
+
+
+def _settle_stream(request: Dict[str, Any], text: str, scheduler: Optional[RequestScheduler]) -> None:
+    """Report the usage of a streamed response, and settle it on the scheduler.
+
+    Streams report no usage, and are closed before their end: the usage is estimated from the prompt and the text
+    received, at about four characters per token.
+    """
+    prompt_tokens = _estimate_prompt_tokens(request)
+    completion_tokens = min(len(text) // 4 + 1, request["max_tokens"])
+    record_usage(SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens))
+    if scheduler is not None:
+        scheduler.settle(_estimate_tokens(request), prompt_tokens + completion_tokens)
+
+
+def _send_request(
+    request: Dict[str, Any], operation_mode: str, scheduler: Optional[RequestScheduler], priority: int
+) -> Any:
+    """Send a request, through the scheduler if any; the scheduler then owns the retries."""
+    if scheduler is None:
+        return _create(_get_client(), request, operation_mode)
+    client = _get_client().with_options(max_retries=0)
+    return scheduler.call(lambda: _create(client, request, operation_mode), _estimate_tokens(request), priority)
+
+
+async def _asend_request(
+    request: Dict[str, Any], operation_mode: str, scheduler: Optional[RequestScheduler], priority: int
+) -> Any:
+    """Send a request asynchronously, through the scheduler if any; the scheduler then owns the retries."""
+    if scheduler is None:
+        return await _create(_get_async_client(), request, operation_mode)
+    client = _get_async_client().with_options(max_retries=0)
+    return await scheduler.acall(lambda: _create(client, request, operation_mode), _estimate_tokens(request), priority)
+
+
+def _fetch(request: Dict[str, Any], settings: _RequestSettings) -> Any:
+    """Send a request and receive its response; a streamed response is read into a parser, and closed early."""
+    with stage("gpt.request"):
+        prediction = _send_request(request, settings.operation_mode, settings.scheduler, settings.priority)
+    if not request.get("stream"):
+        return prediction
+    parser = _GPTStreamParser(settings.operation_mode)
+    with stage("gpt.stream"):
+        _read_gpt_stream(prediction, parser)
+    return parser
+
+
+async def _afetch(request: Dict[str, Any], settings: _RequestSettings) -> Any:
+    """Send a request and receive its response, asynchronously; see _fetch."""
+    with stage("gpt.request"):
+        prediction = await _asend_request(request, settings.operation_mode, settings.scheduler, settings.priority)
+    if not request.get("stream"):
+        return prediction
+    parser = _GPTStreamParser(settings.operation_mode)
+    with stage("gpt.stream"):
+        await _aread_gpt_stream(prediction, parser)
+    return parser
+
+
+def _parse_response(request: Dict[str, Any], response: Any, settings: _RequestSettings) -> GPTOutput:
+    """Parse the response to a single-utterance request, and report its usage."""
+    if isinstance(response, _GPTStreamParser):
+        with stage("gpt.stream"):
+            gpt_result = response.result()
+        _settle_stream(request, response.text, settings.scheduler)
+        return gpt_result
+    record_usage(response.usage)
+    with stage("gpt.parse_output"):
+        return parse_gpt_output(response, settings.operation_mode)
+
+
+def _parse_packed_response(response: Any, settings: _RequestSettings, size: int) -> List[Optional[GPTOutput]]:
+    """Parse the response to a packed request, and report its usage."""
+    record_usage(response.usage)
+    with stage("gpt.parse_output"):
+        return parse_packed_gpt_output(response, settings.operation_mode, size)
+
+
+def _lookup(
+    utterances: Sequence[str], settings: _RequestSettings
+) -> Tuple[List[Optional[str]], List[Optional[GPTOutput]]]:
+    """Look up the parsed GPT outputs of many utterances in the cache."""
+    if settings.cache is None:
+        return [None] * len(utterances), [None] * len(utterances)
+    keys: List[Optional[str]] = [settings.cache_key(utterance) for utterance in utterances]
+    return keys, [settings.cache.get(cast(str, key)) for key in keys]
+
+
+def _store(settings: _RequestSettings, key: Optional[str], gpt_result: Optional[GPTOutput]) -> None:
+    """Store a parsed GPT output in the cache, if any."""
+    if settings.cache is not None and gpt_result is not None:
+        settings.cache.set(cast(str, key), gpt_result)
+
+
+def _ground(
+    gpt_result: GPTOutput, utterance: str, settings: _RequestSettings, filtering: Filter
 ) -> Dict[Formula, float]:
+    """Correct a parsed GPT output against the vocabulary, and ground it to the matching formulas."""
+    return parse_gpt_result(correct_gpt_output(gpt_result, utterance, settings.vocabulary), filtering)
+
+
+def _process_utterance(utterance: str, settings: _RequestSettings, filtering: Filter) -> Dict[Formula, float]:
     """Process NL utterance.
 
     :param utterance: the natural language utterance
-    :param model: the GPT model
-    :param prompt: the prompt
-    :param operation_mode: the operation mode
-    :param temperature: the temperature
+    :param settings: the settings of the GPT requests
     :param filtering: the filter used to remove formulas
     :return: a dict matching formulas to their confidence
     """
-    query = f"NL: {utterance}\n"
-    messages = [{"role": "user", "content": prompt + query}]
-    if operation_mode == OperationModes.CHAT.value:
-        prediction = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=200,
-            top_p=1.0,
-            frequency_penalty=0.0,
-            presence_penalty=0.0,
-            stop=["\n\n"],
-        )
-    else:
-        prediction = client.completions.create(
-            model=model,
-            prompt=messages[0]["content"],
-            temperature=temperature,
-            max_tokens=200,
-            top_p=1.0,
-            frequency_penalty=0.0,
-            presence_penalty=0.0,
-            stop=["\n\n"],
-        )
-
-    gpt_result: GPTOutput = parse_gpt_output(prediction, operation_mode)
-    matching_formulas: Dict[Formula, float] = parse_gpt_result(gpt_result, filtering)
-    return matching_formulas
+    (key,), (gpt_result,) = _lookup([utterance], settings)
+    if gpt_result is None:
+        request = settings.request(utterance)
+        gpt_result = _parse_response(request, _fetch(request, settings), settings)
+        _store(settings, key, gpt_result)
+    return _ground(gpt_result, utterance, settings, filtering)
+
+
+async def _aprocess_utterance(utterance: str, settings: _RequestSettings, filtering: Filter) -> Dict[Formula, float]:
+    """Process NL utterance asynchronously; see _process_utterance."""
+    (key,), (gpt_result,) = _lookup([utterance], settings)
+    if gpt_result is None:
+        request = settings.request(utterance)
+        gpt_result = _parse_response(request, await _afetch(request, settings), settings)
+        _store(settings, key, gpt_result)
+    return _ground(gpt_result, utterance, settings, filtering)
+
+
+def _process_packed(
+    utterances: Sequence[str], settings: _RequestSettings, filtering: Filter
+) -> List[Dict[Formula, float]]:
+    """Process many NL utterances with a single request; the utterances whose answer is invalid are retried alone.
+
+    :param utterances: the natural language utterances
+    :param settings: the settings of the GPT requests
+    :param filtering: the filter used to remove formulas
+    :return: a list of dicts matching formulas to their confidence, in input order
+    """
+    keys, gpt_results = _lookup(utterances, settings)
+    missing = [index for index, gpt_result in enumerate(gpt_results) if gpt_result is None]
+    if len(missing) > 1:
+        request = settings.packed_request([utterances[index] for index in missing])
+        packed_results = _parse_packed_response(_fetch(request, settings), settings, len(missing))
+        for index, gpt_result in zip(missing, packed_results):
+            gpt_results[index] = gpt_result
+            _store(settings, keys[index], gpt_result)
+    single = replace(settings, stream=False)
+    return [
+        _ground(gpt_result, utterance, settings, filtering)
+        if gpt_result is not None
+        else _process_utterance(utterance, single, filtering)
+        for utterance, gpt_result in zip(utterances, gpt_results)
+    ]
+
+
+async def _aprocess_packed(
+    utterances: Sequence[str], settings: _RequestSettings, filtering: Filter
+) -> List[Dict[Formula, float]]:
+    """Process many NL utterances with a single request, asynchronously; see _process_packed."""
+    keys, gpt_results = _lookup(utterances, settings)
+    missing = [index for index, gpt_result in enumerate(gpt_results) if gpt_result is None]
+    if len(missing) > 1:
+        request = settings.packed_request([utterances[index] for index in missing])
+        packed_results = _parse_packed_response(await _afetch(request, settings), settings, len(missing))
+        for index, gpt_result in zip(missing, packed_results):
+            gpt_results[index] = gpt_result
+            _store(settings, keys[index], gpt_result)
+    single = replace(settings, stream=False)
+    return [
+        _ground(gpt_result, utterance, settings, filtering)
+        if gpt_result is not None
+        else await _aprocess_utterance(utterance, single, filtering)
+        for utterance, gpt_result in zip(utterances, gpt_results)
+    ]
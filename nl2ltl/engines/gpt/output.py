@@ -1,12 +1,25 @@
 """Parse GPT output to produce Dict[Formula, Float] result."""
 import re
 from dataclasses import dataclass
-from typing import Dict, Match, Set, Tuple, cast
+from typing import Any, AsyncIterable, Dict, Iterable, List, Match, Optional, Pattern, Set, Tuple, cast
 
 from pylogics.syntax.base import Formula
 
-from nl2ltl.engines.utils import _get_formulas
+from nl2ltl.engines.symbols import SymbolExtractor
+from nl2ltl.engines.utils import _get_formulas, _match_template_name
 from nl2ltl.filters.base import Filter
+from nl2ltl.instrumentation import stage
+
+_PATTERN_LINE = re.compile("PATTERN: (.*)\n")
+_SYMBOLS_LINE = re.compile("SYMBOLS: (.*)\n")
+_PACKED_PATTERN = re.compile(r"^PATTERN (\d+): (.*)$", re.MULTILINE)
+_PACKED_SYMBOLS = re.compile(r"^SYMBOLS (\d+): (.*)$", re.MULTILINE)
+
+
+def _line_value(line: Pattern, text: str) -> str:
+    """Get the value of a line of the generated text, whose last line may lack its newline."""
+    text = text if text.endswith("\n") else text + "\n"
+    return cast(Match, line.search(text)).group(1)
 
 
 @dataclass
@@ -30,44 +43,24 @@ class _GPTOutputWrapper:
     mode: str
 
     @property
-    def pattern(self) -> str:
-        """Get the predicted pattern."""
+    def text(self) -> str:
+        """Get the generated text."""
         from nl2ltl.engines.gpt.core import OperationModes
 
         if self.mode == OperationModes.CHAT.value:
-            return str(
-                cast(
-                    Match,
-                    re.search(
-                        "PATTERN: (.*)\n",
-                        self.output.choices[0].message.content,
-                    ),
-                ).group(1)
-            )
+            return self.output.choices[0].message.content
         else:
-            return str(
-                cast(
-                    Match,
-                    re.search("PATTERN: (.*)\n", self.output.choices[0].text),
-                ).group(1)
-            )
+            return self.output.choices[0].text
+
+    @property
+    def pattern(self) -> str:
+        """Get the predicted pattern."""
+        return _line_value(_PATTERN_LINE, self.text)
 
     @property
     def entities(self) -> Tuple[str]:
         """Get the predicted entities."""
-        from nl2ltl.engines.gpt.core import OperationModes
-
-        if self.mode == OperationModes.CHAT.value:
-            return tuple(
-                cast(
-                    Match,
-                    re.search("SYMBOLS: (.*)", self.output.choices[0].message.content),
-                )
-                .group(1)
-                .split(", ")
-            )
-        else:
-            return tuple(cast(Match, re.search("SYMBOLS: (.*)", self.output.choices[0].text)).group(1).split(", "))
+        return tuple(_line_value(_SYMBOLS_LINE, self.text).split(", "))
 
 
 def parse_gpt_output(gpt_output: dict, operation_mode: str) -> GPTOutput:
@@ -84,6 +77,129 @@ def parse_gpt_output(gpt_output: dict, operation_mode: str) -> GPTOutput:
     return gpt_result
 
 
+class _GPTStreamParser:
+    """An incremental parser of the streamed output of GPT."""
+
+    def __init__(self, operation_mode: str):
+        """Initialize the parser."""
+        from nl2ltl.engines.gpt.core import OperationModes
+
+        self._chat = operation_mode == OperationModes.CHAT.value
+        self._text = ""
+
+    @property
+    def text(self) -> str:
+        """Get the text received so far."""
+        return self._text
+
+    def feed(self, chunk: Any) -> bool:
+        """Add a streamed chunk, and return whether both the PATTERN and SYMBOLS lines are complete."""
+        if not chunk.choices:
+            return False
+        piece = (chunk.choices[0].delta.content if self._chat else chunk.choices[0].text) or ""
+        self._text += piece
+        return (
+            "\n" in piece
+            and _PATTERN_LINE.search(self._text) is not None
+            and _SYMBOLS_LINE.search(self._text) is not None
+        )
+
+    def result(self) -> GPTOutput:
+        """Get the parsed output."""
+        pattern = _line_value(_PATTERN_LINE, self._text)
+        entities = tuple(_line_value(_SYMBOLS_LINE, self._text).split(", "))
+        return GPTOutput(pattern, entities)
+
+
+def parse_gpt_stream(stream: Iterable[Any], operation_mode: str) -> GPTOutput:
+    """Parse a streamed GPT output, closing the stream as soon as the PATTERN and SYMBOLS lines are complete.
+
+    :param stream: the stream of chunks of the GPT prediction.
+    :param operation_mode: the operation mode of the GPT engine.
+    :return: a GPTOutput instance.
+    """
+    parser = _GPTStreamParser(operation_mode)
+    _read_gpt_stream(stream, parser)
+    return parser.result()
+
+
+def _read_gpt_stream(stream: Iterable[Any], parser: _GPTStreamParser) -> None:
+    """Feed a stream to a parser until both lines are complete, then close it."""
+    try:
+        for chunk in stream:
+            if parser.feed(chunk):
+                break
+    finally:
+        stream.close()  # type: ignore
+
+
+async def aparse_gpt_stream(stream: AsyncIterable[Any], operation_mode: str) -> GPTOutput:
+    """Parse a streamed GPT output asynchronously; see parse_gpt_stream.
+
+    :param stream: the asynchronous stream of chunks of the GPT prediction.
+    :param operation_mode: the operation mode of the GPT engine.
+    :return: a GPTOutput instance.
+    """
+    parser = _GPTStreamParser(operation_mode)
+    await _aread_gpt_stream(stream, parser)
+    return parser.result()
+
+
+async def _aread_gpt_stream(stream: AsyncIterable[Any], parser: _GPTStreamParser) -> None:
+    """Feed an asynchronous stream to a parser until both lines are complete, then close it."""
+    try:
+        async for chunk in stream:
+            if parser.feed(chunk):
+                break
+    finally:
+        await stream.close()  # type: ignore
+
+
+def _is_valid_block(pattern: Optional[str], symbols: Optional[str]) -> bool:
+    """Check that a block of a packed output names a template and has symbols."""
+    if not pattern or not symbols:
+        return False
+    try:
+        _match_template_name(pattern)
+    except ValueError:
+        return False
+    return True
+
+
+def parse_packed_gpt_output(gpt_output: dict, operation_mode: str, size: int) -> List[Optional[GPTOutput]]:
+    """Parse the GPT output of a packed request, i.e. one numbered PATTERN/SYMBOLS block per utterance.
+
+    :param gpt_output: the json description of the GPT prediction.
+    :param operation_mode: the operation mode of the GPT engine.
+    :param size: the number of utterances in the request.
+    :return: a GPTOutput instance per utterance, in request order, or None for the missing or invalid blocks.
+    """
+    text = _GPTOutputWrapper(gpt_output, operation_mode).text or ""
+    patterns = {int(index): value.strip() for index, value in _PACKED_PATTERN.findall(text)}
+    symbols = {int(index): value.strip() for index, value in _PACKED_SYMBOLS.findall(text)}
+    outputs: List[Optional[GPTOutput]] = []
+    for index in range(1, size + 1):
+        pattern, entities = patterns.get(index), symbols.get(index)
+        if _is_valid_block(pattern, entities):
+            outputs.append(GPTOutput(cast(str, pattern), tuple(cast(str, entities).split(", "))))
+        else:
+            outputs.append(None)
+    return outputs
+
+
+def correct_gpt_output(output: GPTOutput, utterance: str, vocabulary: Optional[SymbolExtractor]) -> GPTOutput:
+    """Validate and correct the symbols of a GPTOutput against a vocabulary, if any.
+
+    :param output: a GPTOutput instance.
+    :param utterance: the natural language utterance.
+    :param vocabulary: the known symbols.
+    :return: the corrected GPTOutput instance.
+    """
+    if vocabulary is None:
+        return output
+    return GPTOutput(output.pattern, tuple(vocabulary.correct(output.entities, utterance)))
+
+
 def parse_gpt_result(output: GPTOutput, filtering: Filter = None) -> Dict[Formula, float]:
     """Build a dict of formulas, given the GPTOutput object.
 
@@ -101,6 +217,7 @@ def parse_gpt_result(output: GPTOutput, filtering: Filter = None) -> Dict[Formul
         raise Exception("The output is not a valid formula.")
 
     if filtering:
-        return filtering.enforce(result, symbols)
+        with stage("filtering"):
+            return filtering.enforce(result, symbols)
     else:
         return result
@@ -0,0 +1,147 @@
+"""Prompt handling for the GPT engine: prompt modes and dynamic few-shot selection."""
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, List, Sequence, Set, Tuple
+
+_EXAMPLE = re.compile(r"^NL: (.*)\nPATTERN: (.*)\nSYMBOLS: (.*)$", re.MULTILINE)
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class PromptModes(Enum):
+    """The set of available prompt modes.
+
+    INLINE sends the few-shot prompt and the utterance as a single user message.
+    PREFIX sends the static part of the prompt as a system message, followed by the utterance as a user message,
+    so that the provider can cache the shared prefix across requests. In completion mode, both produce the same text.
+    """
+
+    INLINE = "inline"
+    PREFIX = "prefix"
+
+
+SUPPORTED_PROMPT_MODES: Set[str] = {v.value for v in PromptModes}
+
+
+@dataclass(frozen=True)
+class PromptExample:
+    """Dataclass to represent a few-shot example of the prompt."""
+
+    nl: str
+    pattern: str
+    symbols: str
+
+    def render(self) -> str:
+        """Render the example as in the prompt."""
+        return f"NL: {self.nl}\nPATTERN: {self.pattern}\nSYMBOLS: {self.symbols}\n\n"
+
+
+def parse_prompt(prompt: str) -> Tuple[str, List[PromptExample]]:
+    """Split a few-shot prompt into its header and its examples.
+
+    :param prompt: the prompt, i.e. a header followed by NL/PATTERN/SYMBOLS examples.
+    :return: the header, up to the first example, and the examples.
+    """
+    first = _EXAMPLE.search(prompt)
+    header = prompt[: first.start()] if first else prompt
+    examples = [PromptExample(*(group.strip() for group in match.groups())) for match in _EXAMPLE.finditer(prompt)]
+    return header, examples
+
+
+def _tokenize(text: str) -> List[str]:
+    """Split a text into lowercase words."""
+    return _WORD.findall(text.lower())
+
+
+class FewShotSelector:
+    """Select the few-shot examples most similar to an utterance.
+
+    Similarity is the cosine of TF-IDF word vectors, computed with an inverted index over the examples.
+    The selection includes the best example of every pattern first, so that no pattern is left without examples,
+    and is rendered in prompt order.
+    """
+
+    def __init__(self, header: str, examples: Sequence[PromptExample], k: int = 8):
+        """Build the index.
+
+        :param header: the static part of the prompt.
+        :param examples: the candidate examples.
+        :param k: the number of examples to select.
+        """
+        if k < 1:
+            raise ValueError(f"The number of examples must be at least 1, found {k}.")
+        self._header = header
+        self._examples = list(examples)
+        self._k = k
+        documents = [Counter(_tokenize(example.nl)) for example in self._examples]
+        frequencies = Counter(term for document in documents for term in document)
+        self._idf: Dict[str, float] = {
+            term: math.log((1 + len(documents)) / (1 + frequency)) + 1 for term, frequency in frequencies.items()
+        }
+        self._index: Dict[str, List[Tuple[int, float]]] = {}
+        for position, document in enumerate(documents):
+            weights = {term: count * self._idf[term] for term, count in document.items()}
+            norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+            for term, weight in weights.items():
+                self._index.setdefault(term, []).append((position, weight / norm))
+
+    @classmethod
+    def from_prompt(cls, prompt: str, k: int = 8) -> "FewShotSelector":
+        """Build a selector over the examples of a few-shot prompt."""
+        header, examples = parse_prompt(prompt)
+        return cls(header, examples, k)
+
+    @property
+    def header(self) -> str:
+        """Get the static part of the prompt."""
+        return self._header
+
+    @property
+    def examples(self) -> List[PromptExample]:
+        """Get the candidate examples."""
+        return list(self._examples)
+
+    @property
+    def k(self) -> int:
+        """Get the number of examples to select."""
+        return self._k
+
+    def scores(self, utterance: str) -> List[float]:
+        """Get the similarity of every example to an utterance."""
+        scores = [0.0] * len(self._examples)
+        for term, count in Counter(_tokenize(utterance)).items():
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for position, weight in self._index[term]:
+                scores[position] += count * idf * weight
+        return scores
+
+    def select(self, utterance: str) -> List[PromptExample]:
+        """Select the k examples most similar to an utterance.
+
+        :param utterance: the natural language utterance.
+        :return: the selected examples, in prompt order.
+        """
+        scores = self.scores(utterance)
+        ranking = sorted(range(len(self._examples)), key=lambda position: -scores[position])
+        selected: List[int] = []
+        covered: Set[str] = set()
+        for position in ranking:
+            if len(selected) < self._k and self._examples[position].pattern not in covered:
+                covered.add(self._examples[position].pattern)
+                selected.append(position)
+        chosen = set(selected)
+        selected.extend(position for position in ranking if position not in chosen)
+        return [self._examples[position] for position in sorted(selected[: self._k])]
+
+    def render(self, utterance: str) -> str:
+        """Render the examples selected for an utterance."""
+        return "".join(example.render() for example in self.select(utterance))
+
+    def render_many(self, utterances: Sequence[str]) -> str:
+        """Render the union of the examples selected for many utterances, in prompt order."""
+        selected = {example for utterance in utterances for example in self.select(utterance)}
+        return "".join(example.render() for example in self._examples if example in selected)
@@ -0,0 +1,336 @@
+"""Rate-limit aware scheduling of the GPT requests.
+
+Requests are admitted in priority order, as soon as both the requests-per-minute and the tokens-per-minute
+buckets can afford them. Failed requests are retried with jittered exponential backoff, honoring the
+Retry-After header of the OpenAI responses; a rate-limit error pauses the admission of every request.
+"""
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, List, Optional, Set, TypeVar
+
+from nl2ltl.instrumentation import stage
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    """The request priorities; lower values are admitted first."""
+
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+class TokenBucket:
+    """A token bucket refilled continuously at a per-minute rate.
+
+    The bucket is not thread-safe: the scheduler owning it serializes the accesses.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """Initialize a full bucket.
+
+        :param rate_per_minute: the refill rate.
+        :param capacity: the maximum burst; by default, one minute worth of refill.
+        """
+        if rate_per_minute <= 0:
+            raise ValueError(f"The rate must be positive, found {rate_per_minute}.")
+        self._rate = rate_per_minute / 60
+        self._capacity = float(capacity if capacity is not None else rate_per_minute)
+        self._level = self._capacity
+        self._updated = time.monotonic()
+
+    @property
+    def capacity(self) -> float:
+        """Get the capacity of the bucket."""
+        return self._capacity
+
+    @property
+    def level(self) -> float:
+        """Get the currently available amount."""
+        self._refill()
+        return self._level
+
+    def _refill(self) -> None:
+        """Add the amount accrued since the last update."""
+        now = time.monotonic()
+        self._level = min(self._capacity, self._level + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def delay(self, amount: float) -> float:
+        """Get the seconds to wait before the amount is available; amounts above the capacity are capped."""
+        self._refill()
+        missing = min(amount, self._capacity) - self._level
+        return missing / self._rate if missing > 0 else 0.0
+
+    def consume(self, amount: float) -> None:
+        """Take an amount from the bucket."""
+        self._refill()
+        self._level -= min(amount, self._capacity)
+
+    def refund(self, amount: float) -> None:
+        """Give back an amount, e.g. when a request used fewer tokens than estimated; negative amounts are debt."""
+        self._refill()
+        self._level = min(self._capacity, self._level + amount)
+
+
+def _is_retryable(error: BaseException) -> bool:
+    """Check whether a failed request is worth retrying."""
+    import openai
+
+    return isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError))
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """Get the seconds to wait suggested by the response headers of a failed request, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _used_tokens(response: Any) -> Optional[int]:
+    """Get the total tokens used by a response, if reported."""
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+
+class RequestScheduler:
+    """Admission control and retries of the GPT requests.
+
+    A scheduler can be shared by several engines, e.g. an interactive and a batch one, so that they share one quota.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        """Initialize the scheduler.
+
+        :param requests_per_minute: the requests-per-minute limit, or None if unlimited.
+        :param tokens_per_minute: the tokens-per-minute limit, or None if unlimited.
+        :param max_retries: the maximum number of retries of a failed request.
+        :param base_delay: the backoff delay of the first retry, in seconds.
+        :param max_delay: the maximum backoff delay, in seconds.
+        """
+        if max_retries < 0:
+            raise ValueError(f"The maximum number of retries must be non-negative, found {max_retries}.")
+        self._request_bucket = TokenBucket(requests_per_minute) if requests_per_minute is not None else None
+        self._token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute is not None else None
+        self._max_retries = max_retries
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._condition = threading.Condition()
+        self._wakers: Set[Callable[[], None]] = set()
+        self._waiting: List[List[Any]] = []
+        self._counter = itertools.count()
+        self._paused_until = 0.0
+
+    @property
+    def max_retries(self) -> int:
+        """Get the maximum number of retries of a failed request."""
+        return self._max_retries
+
+    @property
+    def queued(self) -> int:
+        """Get the number of requests waiting for admission."""
+        with self._condition:
+            return len(self._waiting)
+
+    def _notify(self) -> None:
+        """Wake up every waiting caller, e.g. when the head of the queue or the buckets change; hold the condition."""
+        self._condition.notify_all()
+        for wake in self._wakers:
+            wake()
+
+    def _enqueue(self, tokens: int, priority: int) -> List[Any]:
+        """Add a request to the admission queue."""
+        ticket = [priority, next(self._counter), tokens]
+        with self._condition:
+            heapq.heappush(self._waiting, ticket)
+        return ticket
+
+    def _dequeue(self, ticket: List[Any]) -> None:
+        """Remove a request from the admission queue, e.g. when the waiting caller is interrupted."""
+        with self._condition:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._notify()
+
+    def _admit(self, ticket: List[Any]) -> Optional[float]:
+        """Try to admit a request.
+
+        :return: 0 if admitted; otherwise, the seconds before the buckets can afford it, or None if it is not the
+            next request, which must wait for a notification.
+        """
+        with self._condition:
+            if self._waiting[0] is not ticket:
+                return None
+            delay = self._paused_until - time.monotonic()
+            if self._request_bucket is not None:
+                delay = max(delay, self._request_bucket.delay(1))
+            if self._token_bucket is not None:
+                delay = max(delay, self._token_bucket.delay(ticket[2]))
+            if delay > 0:
+                return delay
+            heapq.heappop(self._waiting)
+            if self._request_bucket is not None:
+                self._request_bucket.consume(1)
+            if self._token_bucket is not None:
+                self._token_bucket.consume(ticket[2])
+            self._notify()
+            return 0.0
+
+    def settle(self, tokens: int, used: int) -> None:
+        """Correct the token bucket with the tokens actually used by an admitted request.
+
+        Responses reporting their usage are settled automatically; others, e.g. streams, can be settled afterwards.
+
+        :param tokens: the estimated tokens the request was admitted with.
+        :param used: the tokens actually used.
+        """
+        if self._token_bucket is not None:
+            with self._condition:
+                self._token_bucket.refund(tokens - used)
+                self._notify()
+
+    def _settle(self, tokens: int, response: Any) -> None:
+        """Correct the token bucket with the tokens used by a response, if reported."""
+        used = _used_tokens(response)
+        if used is not None:
+            self.settle(tokens, used)
+
+    def _backoff(self, error: BaseException, attempt: int, tokens: int) -> Optional[float]:
+        """Get the seconds to wait before retrying a failed request, or None if it must not be retried.
+
+        A request failing with a retryable error, e.g. a rate limit, a server or a connection error, did not use its
+        tokens, which are refunded; a rate-limited request also pauses every admission.
+        """
+        if not _is_retryable(error):
+            return None
+        if self._token_bucket is not None:
+            with self._condition:
+                self._token_bucket.refund(tokens)
+                self._notify()
+        if attempt >= self._max_retries:
+            return None
+        delay = random.uniform(0, min(self._max_delay, self._base_delay * 2**attempt))
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if getattr(error, "status_code", None) == 429:
+            with self._condition:
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        return delay
+
+    def _acquire(self, tokens: int, priority: int) -> None:
+        """Block until a request is admitted, waking up when notified or when the buckets can afford it."""
+        ticket = self._enqueue(tokens, priority)
+        try:
+            with stage("gpt.queue"), self._condition:
+                delay = self._admit(ticket)
+                while delay != 0:
+                    self._condition.wait(delay)
+                    delay = self._admit(ticket)
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+
+    async def _aacquire(self, tokens: int, priority: int) -> None:
+        """Wait on the event loop until a request is admitted; see _acquire.
+
+        The scheduler can be shared across threads and event loops, so the waiter is woken up through an event
+        set thread-safely on its own loop.
+        """
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(event.set)
+
+        with self._condition:
+            self._wakers.add(wake)
+        ticket = self._enqueue(tokens, priority)
+        try:
+            with stage("gpt.queue"):
+                event.clear()
+                delay = self._admit(ticket)
+                while delay != 0:
+                    try:
+                        await asyncio.wait_for(event.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    event.clear()
+                    delay = self._admit(ticket)
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+        finally:
+            with self._condition:
+                self._wakers.discard(wake)
+
+    def call(self, request: Callable[[], T], tokens: int, priority: int = Priority.INTERACTIVE) -> T:
+        """Send a request once admitted, retrying it on transient failures.
+
+        :param request: the function sending the request.
+        :param tokens: the estimated prompt and completion tokens of the request.
+        :param priority: the request priority.
+        :return: the response.
+        """
+        for attempt in itertools.count():
+            self._acquire(tokens, priority)
+            try:
+                response = request()
+            except Exception as error:
+                delay = self._backoff(error, attempt, tokens)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            self._settle(tokens, response)
+            return response
+        raise AssertionError("unreachable")
+
+    async def acall(self, request: Callable[[], Awaitable[T]], tokens: int, priority: int = Priority.INTERACTIVE) -> T:
+        """Send a request once admitted, retrying it on transient failures, asynchronously.
+
+        :param request: the function returning the awaitable request.
+        :param tokens: the estimated prompt and completion tokens of the request.
+        :param priority: the request priority.
+        :return: the response.
+        """
+        for attempt in itertools.count():
+            await self._aacquire(tokens, priority)
+            try:
+                response = await request()
+            except Exception as error:
+                delay = self._backoff(error, attempt, tokens)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            self._settle(tokens, response)
+            return response
+        raise AssertionError("unreachable")
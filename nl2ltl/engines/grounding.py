@@ -2,9 +2,7 @@
 import logging
 from typing import Dict, Set
 
-from pylogics.syntax.ltl import Atomic
-
-from nl2ltl.declare.base import Template
+from nl2ltl.declare.base import Template, TemplateEnum, atom
 from nl2ltl.declare.declare import (
     Absence,
     ChainResponse,
@@ -15,43 +13,48 @@ from nl2ltl.declare.declare import (
     RespondedExistence,
     Response,
 )
-from nl2ltl.engines.utils import decapitalize
+from nl2ltl.engines.symbols import atom_name
+from nl2ltl.engines.utils import register_grounder
 
 
+@register_grounder(TemplateEnum.EXISTENCE.value)
 def ground_existence(connectors: Dict[str, float]) -> Set[Template]:
     """Compute ground for Existence."""
     if len(list(connectors)) > 0:
-        return {Existence(Atomic(decapitalize(list(connectors)[0])))}
+        return {Existence(atom(atom_name(list(connectors)[0])))}
     else:
         logging.warning("No valid matching, cannot instantiate Existence with < 1 connectors.")
         return set()
 
 
+@register_grounder(TemplateEnum.EXISTENCE_TWO.value)
 def ground_existencetwo(connectors: Dict[str, float]) -> Set[Template]:
     """Compute ground for ExistenceTwo."""
     if len(list(connectors)) > 0:
-        return {ExistenceTwo(Atomic(decapitalize(list(connectors)[0])))}
+        return {ExistenceTwo(atom(atom_name(list(connectors)[0])))}
     else:
         logging.warning("No valid matching, cannot instantiate ExistenceTwo with < 1 connectors.")
         return set()
 
 
+@register_grounder(TemplateEnum.ABSENCE.value)
 def ground_absence(connectors: Dict[str, float]) -> Set[Template]:
     """Compute ground for Absence."""
     if len(list(connectors)) > 0:
-        return {Absence(Atomic(decapitalize(list(connectors)[0])))}
+        return {Absence(atom(atom_name(list(connectors)[0])))}
     else:
         logging.warning("No valid matching, cannot instantiate Absence with < 1 connectors.")
         return set()
 
 
+@register_grounder(TemplateEnum.RESPONDED_EXISTENCE.value)
 def ground_respondedexistence(connectors: Dict[str, float]) -> Set[Template]:
     """Compute ground for RespondedExistence."""
     if len(list(connectors)) >= 2:
         return {
             RespondedExistence(
-                Atomic(decapitalize(list(connectors)[0])),
-                Atomic(decapitalize(list(connectors)[1])),
+                atom(atom_name(list(connectors)[0])),
+                atom(atom_name(list(connectors)[1])),
             )
         }
     else:
@@ -59,13 +62,14 @@ def ground_respondedexistence(connectors: Dict[str, float]) -> Set[Template]:
         return set()
 
 
+@register_grounder(TemplateEnum.RESPONSE.value)
 def ground_response(connectors: Dict[str, float]) -> Set[Template]:
     """Compute ground for Response."""
     if len(list(connectors)) >= 2:
         return {
             Response(
-                Atomic(decapitalize(list(connectors)[0])),
-                Atomic(decapitalize(list(connectors)[1])),
+                atom(atom_name(list(connectors)[0])),
+                atom(atom_name(list(connectors)[1])),
             )
         }
     else:
@@ -73,13 +77,14 @@ def ground_response(connectors: Dict[str, float]) -> Set[Template]:
         return set()
 
 
+@register_grounder(TemplateEnum.PRECEDENCE.value)
 def ground_precedence(connectors: Dict[str, float]) -> Set[Template]:
     """Compute ground for Precedence."""
     if len(list(connectors)) >= 2:
         return {
             Precedence(
-                Atomic(decapitalize(list(connectors)[0])),
-                Atomic(decapitalize(list(connectors)[1])),
+                atom(atom_name(list(connectors)[0])),
+                atom(atom_name(list(connectors)[1])),
             )
         }
     else:
@@ -87,13 +92,14 @@ def ground_precedence(connectors: Dict[str, float]) -> Set[Template]:
         return set()
 
 
+@register_grounder(TemplateEnum.CHAIN_RESPONSE.value)
 def ground_chainresponse(connectors: Dict[str, float]) -> Set[Template]:
     """Compute ground for ChainResponse."""
     if len(list(connectors)) >= 2:
         return {
             ChainResponse(
-                Atomic(decapitalize(list(connectors)[0])),
-                Atomic(decapitalize(list(connectors)[1])),
+                atom(atom_name(list(connectors)[0])),
+                atom(atom_name(list(connectors)[1])),
             )
         }
     else:
@@ -101,13 +107,14 @@ def ground_chainresponse(connectors: Dict[str, float]) -> Set[Template]:
         return set()
 
 
+@register_grounder(TemplateEnum.NOT_CO_EXISTENCE.value)
 def ground_notcoexistence(connectors: Dict[str, float]) -> Set[Template]:
     """Compute ground for NotCoExistence."""
     if len(list(connectors)) >= 2:
         return {
             NotCoExistence(
-                Atomic(decapitalize(list(connectors)[1])),
-                Atomic(decapitalize(list(connectors)[1])),
+                atom(atom_name(list(connectors)[1])),
+                atom(atom_name(list(connectors)[1])),
             )
         }
     else:
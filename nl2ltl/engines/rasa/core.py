@@ -8,23 +8,23 @@ Repository:
 import asyncio
 import shutil
 from pathlib import Path
-from typing import Dict
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, cast
 
 from pylogics.syntax.base import Formula
 
 from nl2ltl.helpers import requires_optional
 
-try:
-    import rasa
+if TYPE_CHECKING:
     from rasa.core.agent import Agent
-except ImportError:
-    rasa = Agent = None
 
+from nl2ltl.cache.base import Cache, make_key, normalize_utterance
 from nl2ltl.engines.base import Engine
 from nl2ltl.engines.rasa import ENGINE_ROOT
-from nl2ltl.engines.rasa.helpers import _get_latest_model
-from nl2ltl.engines.rasa.output import RasaOutput, parse_rasa_output, parse_rasa_result
+from nl2ltl.engines.rasa.helpers import _EventLoopThread, _get_latest_model
+from nl2ltl.engines.rasa.output import RasaOutput, correct_rasa_output, parse_rasa_output, parse_rasa_result
+from nl2ltl.engines.symbols import SymbolExtractor
 from nl2ltl.filters.base import Filter
+from nl2ltl.instrumentation import stage
 
 engine_root = ENGINE_ROOT
 DATA_DIR = engine_root / "data"
@@ -41,13 +41,23 @@ class RasaEngine(Engine):
     def __init__(
         self,
         model: Path = None,
+        cache: Optional[Cache] = None,
+        vocabulary: Optional[SymbolExtractor] = None,
     ):
-        """Rasa NLU Engine initialization."""
+        """Rasa NLU Engine initialization.
+
+        With a `vocabulary`, the predicted entities are validated and corrected against the known symbols.
+        """
         self._load_model(model)
+        self._event_loop = _EventLoopThread()
+        self._cache = cache
+        self._vocabulary = vocabulary
 
         self._check_consistency()
 
     def _load_model(self, model: Path = None):
+        from rasa.core.agent import Agent
+
         if model:
             self.agent = Agent.load(model)
         else:
@@ -69,6 +79,8 @@ class RasaEngine(Engine):
 
     def __check_rasa_version(self):
         """Check that the Rasa tool is at the right version."""
+        import rasa
+
         is_right_version = rasa.__version__ == "3.6.16"
         if not is_right_version:
             raise Exception(
@@ -78,6 +90,16 @@ class RasaEngine(Engine):
                 "pip install rasa==3.6.16"
             )
 
+    @property
+    def cache(self) -> Optional[Cache]:
+        """Get the cache of parsed Rasa outputs."""
+        return self._cache
+
+    @property
+    def vocabulary(self) -> Optional[SymbolExtractor]:
+        """Get the vocabulary validating the predicted entities."""
+        return self._vocabulary
+
     @staticmethod
     def train(
         domain: Path = DOMAIN_PATH,
@@ -85,6 +107,8 @@ class RasaEngine(Engine):
         training: Path = TRAINING_PATH,
     ) -> Path:
         """Train a Rasa model."""
+        import rasa
+
         result = rasa.train(
             domain=str(domain),
             config=str(config),
@@ -96,16 +120,89 @@ class RasaEngine(Engine):
 
     def translate(self, utterance: str, filtering: Filter = None) -> Dict[Formula, float]:
         """From NL to best matching LTL formulas with confidence."""
-        return _process_utterance(utterance, self.agent, filtering)
-
-
-def _process_utterance(utterance: str, rasa_agent: Agent, filtering: Filter) -> Dict[Formula, float]:
+        return _process_utterance(utterance, self.agent, filtering, self._event_loop, self.cache, self.vocabulary)
+
+    def translate_many(self, utterances: Sequence[str], filtering: Filter = None) -> List[Dict[Formula, float]]:
+        """From many NL utterances to best matching LTL formulas with confidence."""
+        return _process_utterances(utterances, self.agent, filtering, self._event_loop, self.cache, self.vocabulary)
+
+    async def atranslate(self, utterance: str, filtering: Filter = None) -> Dict[Formula, float]:
+        """From NL to best matching LTL formulas with confidence, awaiting the engine's event loop."""
+        (rasa_result,) = await self._event_loop.arun(_parse_outputs([utterance], self.agent, self.cache))
+        return parse_rasa_result(correct_rasa_output(rasa_result, self.vocabulary), filtering)
+
+    async def atranslate_many(self, utterances: Sequence[str], filtering: Filter = None) -> List[Dict[Formula, float]]:
+        """From many NL utterances to best matching LTL formulas with confidence, awaiting the engine's event loop."""
+        rasa_results = await self._event_loop.arun(_parse_outputs(utterances, self.agent, self.cache))
+        return [parse_rasa_result(correct_rasa_output(result, self.vocabulary), filtering) for result in rasa_results]
+
+    def close(self) -> None:
+        """Stop the event loop owned by the engine."""
+        self._event_loop.close()
+
+
+def _cache_key(utterance: str, rasa_agent: "Agent") -> str:
+    """Compute the cache key of a Rasa prediction."""
+    return make_key(RasaEngine.__name__, normalize_utterance(utterance), getattr(rasa_agent, "model_id", None))
+
+
+async def _parse_outputs(
+    utterances: Sequence[str], rasa_agent: "Agent", cache: Optional[Cache] = None
+) -> List[RasaOutput]:
+    """Parse many NL utterances concurrently on the same event loop, skipping the cached ones."""
+    keys: List[str] = []
+    rasa_results: List[Optional[RasaOutput]] = [None] * len(utterances)
+    if cache is not None:
+        keys = [_cache_key(utterance, rasa_agent) for utterance in utterances]
+        rasa_results = [cache.get(key) for key in keys]
+    missing = [index for index, rasa_result in enumerate(rasa_results) if rasa_result is None]
+    with stage("rasa.parse_message"):
+        predictions = await asyncio.gather(*(rasa_agent.parse_message(utterances[index].strip()) for index in missing))
+    with stage("rasa.parse_output"):
+        for index, prediction in zip(missing, predictions):
+            rasa_results[index] = parse_rasa_output(prediction)
+    if cache is not None:
+        for index in missing:
+            cache.set(keys[index], rasa_results[index])
+    return cast(List[RasaOutput], rasa_results)
+
+
+def _process_utterance(
+    utterance: str,
+    rasa_agent: "Agent",
+    filtering: Filter,
+    event_loop: _EventLoopThread,
+    cache: Optional[Cache] = None,
+    vocabulary: Optional[SymbolExtractor] = None,
+) -> Dict[Formula, float]:
     """Process NL utterance.
 
     :param utterance: the natural language utterance
+    :param event_loop: the long-lived event loop running the Rasa agent
+    :param cache: the cache of parsed Rasa outputs
+    :param vocabulary: the known symbols validating the predicted entities
     :return: a dict with matching formulas and confidence
     """
-    prediction = asyncio.run(rasa_agent.parse_message(utterance.strip()))
-    rasa_result: RasaOutput = parse_rasa_output(prediction)
-    matching_formulas: Dict[Formula, float] = parse_rasa_result(rasa_result, filtering)
+    (rasa_result,) = event_loop.run(_parse_outputs([utterance], rasa_agent, cache))
+    matching_formulas: Dict[Formula, float] = parse_rasa_result(correct_rasa_output(rasa_result, vocabulary), filtering)
     return matching_formulas
+
+
+def _process_utterances(
+    utterances: Sequence[str],
+    rasa_agent: "Agent",
+    filtering: Filter,
+    event_loop: _EventLoopThread,
+    cache: Optional[Cache] = None,
+    vocabulary: Optional[SymbolExtractor] = None,
+) -> List[Dict[Formula, float]]:
+    """Process many NL utterances.
+
+    :param utterances: the natural language utterances
+    :param event_loop: the long-lived event loop running the Rasa agent
+    :param cache: the cache of parsed Rasa outputs
+    :param vocabulary: the known symbols validating the predicted entities
+    :return: a list of dicts with matching formulas and confidence, in input order
+    """
+    rasa_results = event_loop.run(_parse_outputs(utterances, rasa_agent, cache))
+    return [parse_rasa_result(correct_rasa_output(result, vocabulary), filtering) for result in rasa_results]
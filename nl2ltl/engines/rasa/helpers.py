@@ -1,7 +1,11 @@
 """This module contains utilities to call the Lydia tool from Python."""
+import asyncio
 import glob
 import os
+import re
+import threading
 from pathlib import Path
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
 
 
 def _get_latest_model(path: Path):
@@ -12,3 +16,77 @@ def _get_latest_model(path: Path):
     if len(list_of_files) == 0:
         return None
     return max(list_of_files, key=os.path.getctime)
+
+
+_NLU_SECTION = re.compile(r"^- (intent|lookup): (\S+)")
+_NLU_EXAMPLE = re.compile(r"^\s+- (.*?)\s*$")
+_NLU_ENTITY = re.compile(r"\[([^\]]+)\]\((\w+)\)")
+
+
+def _parse_nlu_training(path: Path) -> Tuple[List[Tuple[str, str, Tuple[str, ...]]], Dict[str, List[str]]]:
+    """Parse the intent examples and the lookup tables of a Rasa NLU training file, without a YAML parser.
+
+    :param path: the path to the NLU training file.
+    :return: the (text, intent, entity values) of every example, with the entity markup removed,
+        and the lookup tables indexed by name.
+    """
+    examples: List[Tuple[str, str, Tuple[str, ...]]] = []
+    lookups: Dict[str, List[str]] = {}
+    kind, name = None, None
+    for line in Path(path).read_text().splitlines():
+        section = _NLU_SECTION.match(line)
+        if section is not None:
+            kind, name = section.groups()
+            continue
+        example = _NLU_EXAMPLE.match(line)
+        if example is None or name is None:
+            continue
+        text = example.group(1)
+        if kind == "intent":
+            entities = tuple(value for value, _ in _NLU_ENTITY.findall(text))
+            examples.append((_NLU_ENTITY.sub(r"\1", text), name, entities))
+        else:
+            lookups.setdefault(name, []).append(text)
+    return examples, lookups
+
+
+class _EventLoopThread:
+    """A long-lived asyncio event loop running in a background daemon thread.
+
+    Coroutines can be submitted from any thread, including threads that already run their own event loop.
+    """
+
+    def __init__(self):
+        """Initialize the (not yet started) event loop thread."""
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        """Start the event loop thread, if not already running."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="nl2ltl-rasa-loop", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def run(self, coroutine: Awaitable) -> Any:
+        """Run a coroutine on the event loop and wait for its result."""
+        loop = self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+    async def arun(self, coroutine: Awaitable) -> Any:
+        """Run a coroutine on the event loop, awaiting its result without blocking the caller's event loop."""
+        loop = self._ensure_started()
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, loop))
+
+    def close(self) -> None:
+        """Stop the event loop and join its thread."""
+        with self._lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = self._thread = None
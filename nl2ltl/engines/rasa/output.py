@@ -1,11 +1,13 @@
 """Parse Rasa output to produce Dict[Formula, Float] result."""
 from dataclasses import dataclass
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from pylogics.syntax.base import Formula
 
+from nl2ltl.engines.symbols import SymbolExtractor
 from nl2ltl.engines.utils import _get_formulas
 from nl2ltl.filters.base import Filter
+from nl2ltl.instrumentation import stage
 
 
 @dataclass
@@ -71,6 +73,25 @@ def parse_rasa_output(rasa_output: dict) -> RasaOutput:
     return rasa_result
 
 
+def correct_rasa_output(output: RasaOutput, vocabulary: Optional[SymbolExtractor]) -> RasaOutput:
+    """Validate and correct the entities of a RasaOutput against a vocabulary, if any.
+
+    :param output: a RasaOutput instance.
+    :param vocabulary: the known symbols.
+    :return: the corrected RasaOutput instance; corrected entities keep their confidence.
+    """
+    if vocabulary is None:
+        return output
+    confidences: Dict[str, float] = {}
+    for entity, confidence in output.entities.items():
+        symbol = vocabulary.canonical(entity)
+        if symbol is not None:
+            confidences.setdefault(symbol, confidence)
+    symbols = vocabulary.correct(list(output.entities), output.text)
+    entities = {symbol: confidences.get(symbol, 1.0) for symbol in symbols}
+    return RasaOutput(output.text, output.intent, entities, output.intent_ranking)
+
+
 def parse_rasa_result(output: RasaOutput, filtering: Filter = None) -> Dict[Formula, float]:
     """Build a dict of formulas, given the RasaOutput object.
 
@@ -85,6 +106,7 @@ def parse_rasa_result(output: RasaOutput, filtering: Filter = None) -> Dict[Form
             for f in formulas:
                 result[f] = confidence
     if filtering:
-        return filtering.enforce(result, output.entities)
+        with stage("filtering"):
+            return filtering.enforce(result, output.entities)
     else:
         return result
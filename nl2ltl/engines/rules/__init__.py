@@ -0,0 +1 @@
+"""Implementation of the rule-based engine."""
@@ -0,0 +1,337 @@
+"""Implementation of the rule-based engine.
+
+A deterministic fast path for templated utterances: symbols are matched against a dictionary and the pattern
+is selected by keyword rules, both seeded from the examples of the GPT prompt and of the Rasa NLU training data.
+The activation of a binary template is the symbol mentioned in the clause of its cue, e.g. 'whenever I get a Slack',
+and the target the other one. Negated utterances, and those that no rule resolves with enough confidence, are
+passed to a fallback engine.
+"""
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Pattern, Sequence, Tuple
+
+from pylogics.syntax.base import Formula
+
+from nl2ltl.declare.base import TemplateEnum
+from nl2ltl.engines.base import Engine
+from nl2ltl.engines.gpt.core import PROMPT_PATH
+from nl2ltl.engines.rasa.core import TRAINING_PATH
+from nl2ltl.engines.symbols import SymbolExtractor
+from nl2ltl.engines.utils import Example, _get_formulas, _load_examples, _match_template_name
+from nl2ltl.filters.base import Filter
+from nl2ltl.instrumentation import stage
+
+EXACT_ROUTE = "exact"
+FALLBACK_ROUTE = "fallback"
+UNRESOLVED_ROUTE = "unresolved"
+
+_NON_WORD = re.compile(r"[^a-z0-9{}]+")
+_NEGATION = re.compile(r"\b(never|not|no|nor|neither|none|without)\b|n't\b", re.IGNORECASE)
+_ACTIVATION = re.compile(r"\b(whenever|every time|each time|for every|for each|if|when|once|after)\b", re.IGNORECASE)
+_CLAUSE_END = re.compile(r"[,;.]|\bthen\b", re.IGNORECASE)
+
+_Skeleton = Tuple[str, Tuple[int, ...]]
+_Resolution = Tuple[str, str, float, Dict[str, float]]
+_Match = Tuple["Rule", Tuple[str, ...]]
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Dataclass to represent a keyword rule.
+
+    The rule selects a template if its regex matches the utterance and the utterance mentions exactly `arity`
+    distinct symbols (exactly one mention for unary templates).
+    """
+
+    template: str
+    regex: Pattern
+    arity: int
+
+    def matches(self, utterance: str, mentions: Sequence[str]) -> bool:
+        """Check whether the rule applies to an utterance with the given symbol mentions."""
+        if self.arity == 1:
+            arity_ok = len(mentions) == 1
+        else:
+            arity_ok = len(set(mentions)) == self.arity
+        return arity_ok and self.regex.search(utterance) is not None
+
+
+DEFAULT_RULES: Tuple[Rule, ...] = (
+    Rule(
+        TemplateEnum.CHAIN_RESPONSE.value,
+        re.compile(r"\b(right after|straight after|immediately|right away)\b", re.IGNORECASE),
+        2,
+    ),
+    Rule(TemplateEnum.EXISTENCE_TWO.value, re.compile(r"\b(twice|two times)\b", re.IGNORECASE), 1),
+    Rule(
+        TemplateEnum.RESPONDED_EXISTENCE.value,
+        re.compile(r"^\s*if\b|\bif\b.*\bthen\b|\beither before or after\b", re.IGNORECASE),
+        2,
+    ),
+    Rule(
+        TemplateEnum.RESPONSE.value,
+        re.compile(r"\b(whenever|every time|each time|for every|always)\b", re.IGNORECASE),
+        2,
+    ),
+    Rule(TemplateEnum.EXISTENCE.value, re.compile(r""), 1),
+)
+"""The keyword rules, tried in order; the first matching rule selects the template. No rule applies to a negated
+utterance, e.g. 'never send a Slack'."""
+
+
+class RuleEngine(Engine):
+    """The rule-based engine."""
+
+    def __init__(
+        self,
+        fallback: Optional[Engine] = None,
+        min_confidence: float = 0.85,
+        prompt: Optional[Path] = PROMPT_PATH,
+        training: Optional[Path] = TRAINING_PATH,
+        symbols: Iterable[str] = (),
+        rules: Sequence[Rule] = DEFAULT_RULES,
+    ):
+        """Rule-based Engine initialization.
+
+        The confidence of each rule is its Laplace-smoothed precision on the seed examples; rules below
+        `min_confidence` are never used. Seed examples are also matched verbatim, up to their symbols.
+
+        :param fallback: the engine translating the unresolved utterances, if any.
+        :param min_confidence: the minimum confidence of a rule.
+        :param prompt: the GPT prompt seeding the examples and the symbols, if any.
+        :param training: the Rasa NLU training file seeding the examples and the symbols, if any.
+        :param symbols: additional known symbols.
+        :param rules: the keyword rules, tried in order.
+        """
+        self._fallback = fallback
+        self._min_confidence = min_confidence
+        self._rules = tuple(rules)
+        examples, seed_symbols = _load_examples(prompt, training)
+        self._extractor = SymbolExtractor([*seed_symbols, *symbols])
+        self._skeletons = self._index_examples(examples)
+        self._confidences = self._evaluate_rules(examples)
+        self._routes: Counter = Counter()
+        self._routes_lock = threading.Lock()
+
+    @property
+    def fallback(self) -> Optional[Engine]:
+        """Get the fallback engine."""
+        return self._fallback
+
+    @property
+    def extractor(self) -> SymbolExtractor:
+        """Get the extractor of the known symbols."""
+        return self._extractor
+
+    @property
+    def min_confidence(self) -> float:
+        """Get the minimum confidence of a rule."""
+        return self._min_confidence
+
+    @property
+    def confidences(self) -> Dict[str, float]:
+        """Get the confidence of every rule, indexed by template name."""
+        return dict(self._confidences)
+
+    @property
+    def route_counts(self) -> Dict[str, int]:
+        """Get the number of utterances per route: 'exact', a template name, 'fallback' or 'unresolved'."""
+        with self._routes_lock:
+            return dict(self._routes)
+
+    @property
+    def hit_rate(self) -> float:
+        """Get the fraction of utterances resolved by the fast path."""
+        with self._routes_lock:
+            total = sum(self._routes.values())
+            missed = self._routes[FALLBACK_ROUTE] + self._routes[UNRESOLVED_ROUTE]
+        return (total - missed) / total if total else 0.0
+
+    def _mentions(self, utterance: str) -> List[str]:
+        """Get the known symbols mentioned in an utterance, in order."""
+        return self._extractor.extract(utterance)
+
+    def _skeleton(self, utterance: str) -> str:
+        """Normalize an utterance, replacing the symbols with placeholders."""
+        return _NON_WORD.sub(" ", self._extractor.mask(utterance, "{}").lower()).strip()
+
+    def _index_examples(self, examples: Sequence[Example]) -> Dict[str, _Skeleton]:
+        """Index the seed examples by skeleton, dropping the ambiguous ones.
+
+        Each skeleton maps to its template and to the mentions, by position, that are its symbols. The examples with
+        repeated or unmentioned symbols are skipped: grounding needs distinct symbols.
+        """
+        entries: Dict[str, set] = {}
+        for text, pattern, symbols in examples:
+            mentions = self._mentions(text)
+            if len(set(symbols)) != len(symbols) or not set(symbols) <= set(mentions):
+                continue
+            slots = tuple(mentions.index(symbol) for symbol in symbols)
+            entries.setdefault(self._skeleton(text), set()).add((_match_template_name(pattern), slots))
+        return {skeleton: values.pop() for skeleton, values in entries.items() if len(values) == 1}
+
+    def _order(self, utterance: str, arguments: Sequence[str]) -> Optional[Tuple[str, str]]:
+        """Order the arguments of a binary template: the activation is the only argument mentioned in the clause of
+        the first activation cue, the target is the other one.
+
+        :return: the arguments, or None if the clauses do not tell them apart.
+        """
+        cue = _ACTIVATION.search(utterance)
+        if cue is None:
+            return None
+        end = _CLAUSE_END.search(utterance, cue.end())
+        stop = end.start() if end is not None else len(utterance)
+        inside, outside = set(), set()
+        for start, _, symbol in self._extractor.finditer(utterance):
+            if symbol in arguments:
+                (inside if cue.start() <= start < stop else outside).add(symbol)
+        if len(inside) != 1 or len(outside) != 1 or inside == outside:
+            return None
+        activation = inside.pop()
+        return activation, outside.pop()
+
+    def _match(self, utterance: str, mentions: Sequence[str]) -> Optional[_Match]:
+        """Get the first rule matching an utterance, with its arguments in order."""
+        if _NEGATION.search(utterance):
+            return None
+        rule = next((rule for rule in self._rules if rule.matches(utterance, mentions)), None)
+        if rule is None:
+            return None
+        if rule.arity == 1:
+            return rule, (mentions[0],)
+        arguments = self._order(utterance, list(dict.fromkeys(mentions)))
+        return (rule, arguments) if arguments is not None else None
+
+    def _exact(self, utterance: str, mentions: Sequence[str]) -> Optional[Tuple[str, Tuple[str, ...]]]:
+        """Match an utterance verbatim against the seed examples, up to their symbols.
+
+        :return: the template and its arguments, ordered by clause as for the rules when they tell them apart,
+            or None if no seed example matches.
+        """
+        entry = self._skeletons.get(self._skeleton(utterance))
+        if entry is None:
+            return None
+        template, slots = entry
+        arguments = tuple(mentions[slot] for slot in slots)
+        ordered = self._order(utterance, arguments) if len(arguments) == 2 else None
+        return template, ordered or arguments
+
+    def _evaluate_rules(self, examples: Sequence[Example]) -> Dict[str, float]:
+        """Estimate the confidence of the rules on the seed examples.
+
+        Only the templates are compared: the seed symbols are listed in order of mention, not of argument.
+        """
+        fired: Counter = Counter()
+        correct: Counter = Counter()
+        for text, pattern, _ in examples:
+            match = self._match(text, self._mentions(text))
+            if match is not None:
+                rule = match[0]
+                fired[rule.template] += 1
+                correct[rule.template] += rule.template == _match_template_name(pattern)
+        return {rule.template: (correct[rule.template] + 1) / (fired[rule.template] + 2) for rule in self._rules}
+
+    def _count(self, route: str, n: int = 1) -> None:
+        """Update the route counters."""
+        with self._routes_lock:
+            self._routes[route] += n
+
+    def _resolve(self, utterance: str) -> Optional[_Resolution]:
+        """Resolve an utterance with the fast path.
+
+        :return: the route, the template name, the confidence and the symbols, or None if unresolved.
+        """
+        with stage("rules.match"):
+            mentions = self._mentions(utterance)
+            if not mentions:
+                return None
+            exact = self._exact(utterance, mentions)
+            if exact is not None:
+                template, arguments = exact
+                return EXACT_ROUTE, template, 1.0, dict.fromkeys(arguments, 1.0)
+            match = self._match(utterance, mentions)
+            if match is None or self._confidences[match[0].template] < self._min_confidence:
+                return None
+            rule, arguments = match
+            return rule.template, rule.template, self._confidences[rule.template], dict.fromkeys(arguments, 1.0)
+
+    def _translate_resolved(self, resolution: _Resolution, filtering: Filter = None) -> Dict[Formula, float]:
+        """Ground a resolved utterance."""
+        route, template, confidence, symbols = resolution
+        self._count(route)
+        result = {formula: confidence for formula in _get_formulas(template, symbols)}
+        if filtering:
+            with stage("filtering"):
+                return filtering.enforce(result, symbols)
+        return result
+
+    def translate(self, utterance: str, filtering: Filter = None) -> Dict[Formula, float]:
+        """From NL to best matching LTL formulas with confidence."""
+        resolution = self._resolve(utterance)
+        if resolution is not None:
+            return self._translate_resolved(resolution, filtering)
+        if self.fallback is None:
+            self._count(UNRESOLVED_ROUTE)
+            return {}
+        self._count(FALLBACK_ROUTE)
+        return self.fallback.translate(utterance, filtering)
+
+    def _split(self, utterances: Sequence[str]) -> Tuple[List[Optional[_Resolution]], List[int]]:
+        """Resolve the utterances with the fast path, and get the positions of the unresolved ones."""
+        resolutions = [self._resolve(utterance) for utterance in utterances]
+        missing = [index for index, resolution in enumerate(resolutions) if resolution is None]
+        return resolutions, missing
+
+    def translate_many(self, utterances: Sequence[str], filtering: Filter = None) -> List[Dict[Formula, float]]:
+        """From many NL utterances to best matching LTL formulas with confidence.
+
+        The unresolved utterances are translated in a single batch by the fallback engine.
+        """
+        resolutions, missing = self._split(utterances)
+        fallback_results = self._translate_missing([utterances[index] for index in missing], filtering)
+        return self._merge(resolutions, missing, fallback_results, filtering)
+
+    async def atranslate_many(self, utterances: Sequence[str], filtering: Filter = None) -> List[Dict[Formula, float]]:
+        """From many NL utterances to best matching LTL formulas with confidence, asynchronously."""
+        resolutions, missing = self._split(utterances)
+        pending = [utterances[index] for index in missing]
+        if self.fallback is not None and pending:
+            self._count(FALLBACK_ROUTE, len(pending))
+            fallback_results = await self.fallback.atranslate_many(pending, filtering)
+        else:
+            fallback_results = self._translate_missing(pending, filtering)
+        return self._merge(resolutions, missing, fallback_results, filtering)
+
+    async def atranslate(self, utterance: str, filtering: Filter = None) -> Dict[Formula, float]:
+        """From NL to best matching LTL formulas with confidence, asynchronously."""
+        (result,) = await self.atranslate_many([utterance], filtering)
+        return result
+
+    def _translate_missing(self, utterances: Sequence[str], filtering: Filter = None) -> List[Dict[Formula, float]]:
+        """Translate the unresolved utterances with the fallback engine, if any."""
+        if not utterances:
+            return []
+        if self.fallback is None:
+            self._count(UNRESOLVED_ROUTE, len(utterances))
+            return [{} for _ in utterances]
+        self._count(FALLBACK_ROUTE, len(utterances))
+        return self.fallback.translate_many(utterances, filtering)
+
+    def _merge(
+        self,
+        resolutions: Sequence[Optional[_Resolution]],
+        missing: Sequence[int],
+        fallback_results: Sequence[Dict[Formula, float]],
+        filtering: Filter = None,
+    ) -> List[Dict[Formula, float]]:
+        """Merge the fast-path and the fallback results, in input order."""
+        results = [
+            self._translate_resolved(resolution, filtering) if resolution is not None else {}
+            for resolution in resolutions
+        ]
+        for index, result in zip(missing, fallback_results):
+            results[index] = result
+        return results
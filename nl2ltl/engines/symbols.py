@@ -0,0 +1,153 @@
+"""Symbol extraction over a known vocabulary.
+
+The vocabulary is compiled into a trie, and the trie into a single regular expression, so that an utterance is
+scanned once, in C, whatever the size of the vocabulary. Matches are leftmost-longest, on word boundaries, so that
+multi-word symbols such as 'Microsoft Teams' or 'SAP and Salesforce' win over the symbols they contain.
+Symbols are grounded as atoms named after them, e.g. 'Microsoft Teams' as microsoft_Teams.
+"""
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Pattern, Sequence, Tuple
+
+_ALLOWED_SYMBOLS = re.compile(r"ALLOWED_SYMBOLS: (.*)")
+_NEVER = re.compile(r"(?!)")
+_END = ""
+_NON_ATOM_CHARS = re.compile(r"[^a-zA-Z0-9_-]+")
+
+
+def atom_name(symbol: str) -> str:
+    """Normalize a symbol to a legal atom name.
+
+    The first letter is decapitalized, and every run of characters other than letters, digits, '_' and '-' becomes
+    an underscore, e.g. 'Slack' becomes slack and 'Microsoft Dynamics 365' becomes microsoft_Dynamics_365.
+
+    :param symbol: the symbol.
+    :return: the atom name.
+    """
+    name = _NON_ATOM_CHARS.sub("_", symbol.strip()).strip("_-")
+    name = name[:1].lower() + name[1:]
+    return name if name[:1].isalpha() else "_" + name
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    """Render the sub-trie rooted at a node as a regular expression, trying the longest continuations first."""
+    alternatives = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char != _END]
+    if not alternatives:
+        return ""
+    if len(alternatives) == 1 and _END not in node:
+        return alternatives[0]
+    return "(?:" + "|".join(alternatives) + ")" + ("?" if _END in node else "")
+
+
+def _compile(symbols: Iterable[str], ignore_case: bool) -> Pattern:
+    """Compile symbols into a trie-shaped regular expression matching them as whole words."""
+    trie: Dict[str, dict] = {}
+    for symbol in symbols:
+        node = trie
+        for char in symbol.lower() if ignore_case else symbol:
+            node = node.setdefault(char, {})
+        node[_END] = {}
+    if not trie:
+        return _NEVER
+    return re.compile(r"(?<!\w)" + _trie_pattern(trie) + r"(?!\w)", re.IGNORECASE if ignore_case else 0)
+
+
+class SymbolExtractor:
+    """Extract the symbols of a vocabulary mentioned in utterances, and validate the symbols predicted by engines."""
+
+    def __init__(self, symbols: Iterable[str], ignore_case: bool = False):
+        """Compile the vocabulary.
+
+        :param symbols: the known symbols, in their canonical spelling.
+        :param ignore_case: whether mentions match the symbols regardless of case.
+        """
+        self._symbols = list(dict.fromkeys(symbol.strip() for symbol in symbols if symbol.strip()))
+        self._ignore_case = ignore_case
+        self._known = set(self._symbols)
+        self._canonical: Dict[str, str] = {}
+        for symbol in self._symbols:
+            self._canonical.setdefault(symbol.lower(), symbol)
+        self._regex = _compile(self._symbols, ignore_case)
+        self._lenient_regex: Optional[Pattern] = self._regex if ignore_case else None
+
+    @classmethod
+    def from_prompt(cls, prompt: str, ignore_case: bool = False) -> "SymbolExtractor":
+        """Build an extractor over the ALLOWED_SYMBOLS and the example symbols of a few-shot prompt."""
+        from nl2ltl.engines.gpt.prompt import parse_prompt
+
+        allowed = _ALLOWED_SYMBOLS.search(prompt)
+        symbols = allowed.group(1).split(", ") if allowed is not None else []
+        symbols.extend(symbol for example in parse_prompt(prompt)[1] for symbol in example.symbols.split(", "))
+        return cls(symbols, ignore_case)
+
+    @property
+    def symbols(self) -> List[str]:
+        """Get the known symbols."""
+        return list(self._symbols)
+
+    @property
+    def ignore_case(self) -> bool:
+        """Get whether mentions match the symbols regardless of case."""
+        return self._ignore_case
+
+    def __len__(self) -> int:
+        """Get the number of known symbols."""
+        return len(self._symbols)
+
+    def __contains__(self, symbol: object) -> bool:
+        """Check whether a symbol is known, in its canonical spelling."""
+        if not isinstance(symbol, str):
+            return False
+        return self._canonical.get(symbol.lower()) == symbol if self._ignore_case else symbol in self._known
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Get the start, the end and the canonical symbol of every mention in a text, in order."""
+        for match in self._regex.finditer(text):
+            mention = match.group()
+            yield match.start(), match.end(), self._canonical[mention.lower()] if self._ignore_case else mention
+
+    def extract(self, text: str) -> List[str]:
+        """Get the canonical symbols mentioned in a text, in order, with repetitions."""
+        if self._ignore_case:
+            return [self._canonical[mention.lower()] for mention in self._regex.findall(text)]
+        return self._regex.findall(text)
+
+    def extract_many(self, texts: Sequence[str]) -> List[List[str]]:
+        """Get the canonical symbols mentioned in many texts."""
+        return [self.extract(text) for text in texts]
+
+    def mask(self, text: str, placeholder: str) -> str:
+        """Replace every mention in a text with a placeholder."""
+        return self._regex.sub(placeholder, text)
+
+    def canonical(self, symbol: str) -> Optional[str]:
+        """Map a predicted symbol to the vocabulary.
+
+        :param symbol: a symbol predicted by an engine, e.g. 'slack' or 'a Slack message'.
+        :return: the known symbol equal to it regardless of case, or else the only known symbol it mentions,
+            or None.
+        """
+        known = self._canonical.get(symbol.strip().lower())
+        if known is not None:
+            return known
+        if self._lenient_regex is None:
+            self._lenient_regex = _compile(self._symbols, ignore_case=True)
+        mentions = {self._canonical[mention.lower()] for mention in self._lenient_regex.findall(symbol)}
+        return mentions.pop() if len(mentions) == 1 else None
+
+    def correct(self, entities: Sequence[str], utterance: str) -> List[str]:
+        """Validate and correct the symbols predicted by an engine for an utterance.
+
+        Predicted symbols are mapped to the vocabulary. If some cannot be mapped, and the utterance mentions as many
+        distinct known symbols as predicted, the mentions replace the prediction, in order of mention; otherwise,
+        the unknown symbols are dropped.
+
+        :param entities: the predicted symbols.
+        :param utterance: the natural language utterance.
+        :return: the corrected symbols, without duplicates.
+        """
+        corrected = [self.canonical(entity) for entity in entities]
+        valid = list(dict.fromkeys(symbol for symbol in corrected if symbol is not None))
+        if len(valid) == len(corrected):
+            return valid
+        mentions = list(dict.fromkeys(self.extract(utterance)))
+        return mentions if len(mentions) == len(entities) else valid
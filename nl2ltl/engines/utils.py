@@ -1,25 +1,98 @@
 """Engines utils."""
 import difflib
-from typing import Callable, Dict, Set, Union
+import functools
+import json
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple, Union
 
 from pylogics.syntax.base import AtomName, Formula
 
-from nl2ltl.declare.base import TemplateEnum
+from nl2ltl.declare.base import Template
+from nl2ltl.engines.gpt.prompt import parse_prompt
+from nl2ltl.engines.rasa.helpers import _parse_nlu_training
+from nl2ltl.engines.symbols import _ALLOWED_SYMBOLS
+from nl2ltl.instrumentation import stage
+
+Grounder = Callable[[Dict[str, float]], Set[Formula]]
+Example = Tuple[str, str, Tuple[str, ...]]
+
+_GROUNDERS: Dict[str, Grounder] = {}
+_GROUNDER_NAMES_BY_LOWERCASE: Dict[str, str] = {}
+
+GROUNDERS: Mapping[str, Grounder] = MappingProxyType(_GROUNDERS)
+"""Read-only view of the registered grounding functions, indexed by template name."""
+
+
+def register_grounder(name: str) -> Callable[[Grounder], Grounder]:
+    """Register a grounding function for a template name.
+
+    Usage:
+
+        @register_grounder("MyTemplate")
+        def ground_mytemplate(connectors: Dict[str, float]) -> Set[Template]:
+            ...
+
+    :param name: the template name, matched against intent names.
+    :return: the decorator registering the grounding function.
+    """
+
+    def decorator(grounder: Grounder) -> Grounder:
+        _GROUNDERS[name] = grounder
+        _GROUNDER_NAMES_BY_LOWERCASE[name.lower()] = name
+        _fuzzy_match.cache_clear()
+        return grounder
+
+    return decorator
+
+
+@functools.lru_cache(maxsize=1024)
+def _fuzzy_match(name: str) -> Optional[str]:
+    """Get the registered template name closest to the given name, if any."""
+    matches = difflib.get_close_matches(name, list(_GROUNDERS), n=1)
+    return matches[0] if matches else None
+
+
+def _match_template_name(name: str) -> str:
+    """Match an intent name against the registered template names.
+
+    Exact and case-insensitive matches are resolved with dict lookups; fuzzy matching is the (memoized) fallback.
+    """
+    if name in _GROUNDERS:
+        return name
+    template_name = _GROUNDER_NAMES_BY_LOWERCASE.get(name.lower()) or _fuzzy_match(name)
+    if template_name is None:
+        raise ValueError(f"no template matches the intent name '{name}'")
+    return template_name
 
 
 def _get_formulas(name: str, args: Dict[str, float]) -> Set[Formula]:
     """Instantiate matching formulas based on intent name and entities."""
-    import nl2ltl.declare.declare
-    import nl2ltl.engines.grounding
+    with stage("match_template"):
+        grounding_func: Grounder = _GROUNDERS[_match_template_name(name)]
+    with stage("grounding"):
+        grounded_formulas: Set[Formula] = grounding_func(args)
+    return grounded_formulas
 
-    class_name_match = difflib.get_close_matches(name, [x.value for x in TemplateEnum], n=1)
-    grounding_map: Dict[str, Callable] = {}
-    for c_name in TemplateEnum:
-        grounding_map[c_name.value] = getattr(nl2ltl.engines.grounding, f"ground_{c_name.value.lower()}")
 
-    grounding_func: Callable = grounding_map[str(class_name_match[0])]
-    grounded_formulas: Set[Formula] = grounding_func(args)
-    return grounded_formulas
+def _load_examples(prompt: Optional[Path], training: Optional[Path]) -> Tuple[List[Example], List[str]]:
+    """Load the seed examples and the known symbols from a GPT prompt and a Rasa NLU training file."""
+    examples: List[Example] = []
+    symbols: List[str] = []
+    if prompt is not None:
+        with open(prompt) as f:
+            text = json.load(f)["prompt"]
+        _, prompt_examples = parse_prompt(text)
+        examples.extend((e.nl, e.pattern, tuple(e.symbols.split(", "))) for e in prompt_examples)
+        allowed = _ALLOWED_SYMBOLS.search(text)
+        if allowed is not None:
+            symbols.extend(allowed.group(1).split(", "))
+    if training is not None:
+        training_examples, lookups = _parse_nlu_training(training)
+        examples.extend(training_examples)
+        symbols.extend(symbol for values in lookups.values() for symbol in values)
+    symbols.extend(symbol for _, _, example_symbols in examples for symbol in example_symbols)
+    return examples, symbols
 
 
 def pretty(result: Dict[Formula, float]):
@@ -31,6 +104,30 @@ def pretty(result: Dict[Formula, float]):
         print(f"Confidence:       {v!s}", end="\n\n")
 
 
+def serialize_result(result: Dict[Formula, float]) -> List[Dict[str, Any]]:
+    """Serialize a translation result in a stable, JSON-compatible form.
+
+    Formulas are sorted by decreasing confidence, then by their string representation, so that equal results
+    serialize equally whatever the order of the dict.
+
+    :param result: the best matching formulas with their confidence.
+    :return: one record per formula, with its string representation and its confidence; the records of DECLARE
+        templates also hold the template name, the argument names (see nl2ltl.declare.serialization) and the
+        LTLf, PPLTL and English renderings.
+    """
+    records: List[Dict[str, Any]] = []
+    for formula, confidence in sorted(result.items(), key=lambda item: (-item[1], str(item[0]))):
+        record: Dict[str, Any] = {"formula": str(formula), "confidence": float(confidence)}
+        if isinstance(formula, Template):
+            record["template"] = formula.SYMBOL
+            record["arguments"] = list(formula.argument_names)
+            record["ltlf"] = str(formula.to_ltlf())
+            record["ppltl"] = str(formula.to_ppltl())
+            record["english"] = formula.to_english()
+        records.append(record)
+    return records
+
+
 def check_(condition: bool, message: str = "") -> None:
     """User-defined assert.
 
@@ -18,3 +18,7 @@ class BadUtteranceException(Nl2ltlfException):
         """Initialize the exception."""
         format_args = dict(method_name=method_name, expected=expected, actual=actual)
         super().__init__(self.__ERROR_MSG.format(**format_args))
+
+
+class OverloadedException(Nl2ltlfException):
+    """Raise this exception when a translation request cannot be admitted because too many are pending."""
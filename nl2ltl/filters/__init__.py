@@ -1 +1,24 @@
 """Implementation of Filters."""
+from typing import Dict, Optional
+
+from nl2ltl.filters.base import Filter
+from nl2ltl.filters.simple_filters import BasicFilter, GreedyFilter
+from nl2ltl.filters.specification_filters import SpecificationFilter
+
+FILTERS: Dict[str, Filter] = {
+    filter_cls.NAME: filter_cls() for filter_cls in (BasicFilter, GreedyFilter, SpecificationFilter)
+}
+"""The built-in filters, with their default parameters, indexed by name."""
+
+
+def get_filter(name: Optional[str]) -> Optional[Filter]:
+    """Get a built-in filter by name.
+
+    :param name: the name of the filter, or None for no filtering.
+    :return: the filter, or None.
+    """
+    if name is None:
+        return None
+    if not isinstance(name, str) or name not in FILTERS:
+        raise ValueError(f"Unknown filter {name!r}, expected one of {sorted(FILTERS)}.")
+    return FILTERS[name]
@@ -3,10 +3,8 @@ from typing import Dict
 
 from pylogics.syntax.base import Formula
 
-from nl2ltl.declare.base import Template
 from nl2ltl.filters.base import Filter
-from nl2ltl.filters.utils.conflicts import conflicts
-from nl2ltl.filters.utils.subsumptions import subsumptions
+from nl2ltl.filters.utils.relations import RelationIndex
 
 
 class BasicFilter(Filter):
@@ -43,17 +41,12 @@ class GreedyFilter(Filter):
         - if the current formula subsumes the highest scoring formula, discard it and keep the highest scoring formula
         - else add the current formula to the result set
         """
-        result_set = set()
-
-        highest_scoring_formula = max(output, key=output.get, default=Template)
-        formula_conflicts = conflicts(highest_scoring_formula)
-        formula_subsumptions = subsumptions(highest_scoring_formula)
-
-        result_set.add(highest_scoring_formula)
-        for formula in output:
-            if formula in formula_subsumptions:
-                continue
-            if formula in formula_conflicts:
-                continue
-            result_set.add(formula)
-        return {formula: output[formula] for formula in result_set}
+        if not output:
+            return {}
+
+        highest_scoring_formula = max(output, key=output.get)
+        index = RelationIndex(output)
+        discarded = set(index.conflicts_of(highest_scoring_formula))
+        discarded.update(index.subsumptions_of(highest_scoring_formula))
+        discarded.discard(highest_scoring_formula)
+        return {formula: confidence for formula, confidence in output.items() if formula not in discarded}
@@ -0,0 +1,68 @@
+"""Filters over whole specifications."""
+from typing import Dict, Iterable, Set
+
+from pylogics.syntax.base import Formula
+
+from nl2ltl.filters.base import Filter
+from nl2ltl.filters.utils.relations import RelationIndex
+
+
+def merge_translations(results: Iterable[Dict[Formula, float]]) -> Dict[Formula, float]:
+    """Merge the translations of many utterances, keeping the highest confidence of each formula.
+
+    :param results: the translations of the utterances of a specification.
+    :return: the merged translation.
+    """
+    merged: Dict[Formula, float] = {}
+    for result in results:
+        for formula, confidence in result.items():
+            if confidence > merged.get(formula, float("-inf")):
+                merged[formula] = confidence
+    return merged
+
+
+class SpecificationFilter(Filter):
+    """Specification filter class."""
+
+    NAME = "specification"
+
+    def __init__(self, min_confidence: float = 0.0):
+        """Initialize the filter.
+
+        :param min_confidence: the minimum confidence of the formulas to keep.
+        """
+        self.min_confidence = min_confidence
+
+    def enforce(self, output: Dict[Formula, float], entities: Dict[str, float], **kwargs) -> Dict[Formula, float]:
+        """Select a conflict-free, subsumption-reduced subset of maximum confidence.
+
+        The output is typically the merged translation of all the utterances of a specification
+        (see merge_translations).
+
+        Algorithm (greedy with a relation index, O(n log n) in the number of candidates):
+        - index the candidates by template kind and arguments
+        - scan the candidates by decreasing confidence
+        - if the current formula conflicts with an accepted formula, discard it
+        - if the current formula is subsumed by an accepted formula, discard it
+        - else accept it, and drop the accepted formulas it subsumes
+        """
+        candidates = [formula for formula, confidence in output.items() if confidence >= self.min_confidence]
+        candidates.sort(key=output.__getitem__, reverse=True)
+        index = RelationIndex(candidates)
+
+        accepted: Dict[Formula, float] = {}
+        blocked: Set[Formula] = set()
+        subsumed: Set[Formula] = set()
+        for formula in candidates:
+            if formula in blocked or formula in subsumed:
+                continue
+            formula_conflicts = index.conflicts_of(formula)
+            if any(conflict in accepted for conflict in formula_conflicts):
+                continue
+            accepted[formula] = output[formula]
+            blocked.update(formula_conflicts)
+            for subsumption in index.subsumptions_of(formula):
+                if subsumption is not formula:
+                    subsumed.add(subsumption)
+                    accepted.pop(subsumption, None)
+        return accepted
@@ -0,0 +1,99 @@
+"""Index of the conflict and subsumption relations over a set of templates."""
+import functools
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple, Type
+
+from pylogics.syntax.base import Formula, _BinaryOp
+from pylogics.syntax.ltl import Atomic
+
+from nl2ltl.declare.base import Template
+from nl2ltl.filters.utils.conflicts import conflicts
+from nl2ltl.filters.utils.subsumptions import subsumptions
+
+Relation = Callable[[Formula], Set[Template]]
+RelationRule = Tuple[Type[Template], Tuple[int, ...]]
+"""A related template kind, with the positions of the source arguments it is built from."""
+
+_IndexKey = Tuple[Type[Template], Tuple[str, ...]]
+
+
+@functools.lru_cache(maxsize=None)
+def relation_rules(relation: Relation, template_cls: Type[Template]) -> Tuple[RelationRule, ...]:
+    """Derive the rules of a relation (e.g. conflicts) for a template kind.
+
+    The relation visitor is applied once to a template built on placeholder atoms; each related template is then
+    described by its kind and by the positions of the source arguments it uses, e.g. the conflicts of
+    Response(a, b) include (Precedence, (1, 0)), i.e. Precedence(b, a).
+
+    :param relation: the relation visitor, i.e. conflicts or subsumptions.
+    :param template_cls: the template kind.
+    :return: the relation rules.
+    """
+    arity = 2 if issubclass(template_cls, _BinaryOp) else 1
+    placeholders = tuple(Atomic(f"_{position}") for position in range(arity))
+    related = relation(template_cls(*placeholders))
+    return tuple(
+        sorted(
+            (
+                (type(template), tuple(placeholders.index(argument) for argument in template.arguments))
+                for template in related
+            ),
+            key=lambda rule: (rule[0].__name__, rule[1]),
+        )
+    )
+
+
+class RelationIndex:
+    """Index of a set of candidate formulas, keyed by (template kind, argument names).
+
+    Finding the formulas related to a candidate costs one dict lookup per relation rule, without calling the
+    relation visitors or allocating templates; finding all the related pairs of the set costs one pass over it.
+    """
+
+    def __init__(self, formulas: Iterable[Formula]):
+        """Index the templates among the given formulas."""
+        self._templates: Dict[_IndexKey, Template] = {
+            (type(formula), formula.argument_names): formula for formula in formulas if isinstance(formula, Template)
+        }
+
+    def __len__(self) -> int:
+        """Get the number of indexed templates."""
+        return len(self._templates)
+
+    def __contains__(self, formula: Formula) -> bool:
+        """Check whether a formula is indexed."""
+        return isinstance(formula, Template) and (type(formula), formula.argument_names) in self._templates
+
+    def related(self, formula: Formula, relation: Relation) -> Iterator[Template]:
+        """Get the indexed templates related to a formula."""
+        if not isinstance(formula, Template):
+            return
+        names = formula.argument_names
+        for template_cls, positions in relation_rules(relation, type(formula)):
+            template = self._templates.get((template_cls, tuple(names[position] for position in positions)))
+            if template is not None:
+                yield template
+
+    def conflicts_of(self, formula: Formula) -> List[Template]:
+        """Get the indexed templates in conflict with a formula."""
+        return list(self.related(formula, conflicts))
+
+    def subsumptions_of(self, formula: Formula) -> List[Template]:
+        """Get the indexed templates subsumed by a formula."""
+        return list(self.related(formula, subsumptions))
+
+    def pairs(self, relation: Relation) -> List[Tuple[Template, Template]]:
+        """Get all the pairs (f, g) of distinct indexed templates such that g is related to f."""
+        return [
+            (template, related)
+            for template in self._templates.values()
+            for related in self.related(template, relation)
+            if related is not template
+        ]
+
+    def conflicting_pairs(self) -> List[Tuple[Template, Template]]:
+        """Get all the pairs (f, g) of indexed templates such that g conflicts with f."""
+        return self.pairs(conflicts)
+
+    def subsumption_pairs(self) -> List[Tuple[Template, Template]]:
+        """Get all the pairs (f, g) of indexed templates such that f subsumes g."""
+        return self.pairs(subsumptions)
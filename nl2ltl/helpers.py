@@ -1,13 +1,22 @@
 """This module implements the library exceptions."""
 import functools
-import sys
+import importlib.util
 
 
-def requires_optional(cls):
+def requires_optional(cls=None, *, module: str = "rasa", name: str = "Rasa"):
+    """Make the instantiation of a class fail early if an optional dependency is missing.
+
+    :param cls: the decorated class; Rasa is required when used as a bare decorator.
+    :param module: the module of the optional dependency.
+    :param name: the name of the optional dependency, for the error message.
+    """
+    if cls is None:
+        return functools.partial(requires_optional, module=module, name=name)
+
     @functools.wraps(cls)
     def wrapper_decor(*args, **kwargs):
-        if "rasa" not in sys.modules:
-            raise ModuleNotFoundError(f"Rasa is required to instantiate {cls.__name__}")
+        if importlib.util.find_spec(module) is None:
+            raise ModuleNotFoundError(f"{name} is required to instantiate {cls.__name__}")
         return cls(*args, **kwargs)
 
     return wrapper_decor
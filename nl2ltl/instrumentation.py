@@ -0,0 +1,257 @@
+"""Opt-in instrumentation of the translation pipeline.
+
+The pipeline reports per-stage timings, token usage, cache lookups and errors to the registered hooks.
+With no hook registered, each instrumentation point costs a single truthiness check.
+
+Usage:
+
+    from nl2ltl.instrumentation import MetricsAggregator, instrument
+
+    metrics = MetricsAggregator()
+    with instrument(metrics):
+        translate(utterance, engine)
+    print(metrics.summary()["gpt.request"]["p95"])
+
+"""
+import math
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Type
+
+
+class Hook:
+    """Base class for instrumentation hooks.
+
+    Every callback is a no-op by default, so a hook overrides only the events it is interested in.
+    Callbacks may be invoked concurrently from several threads.
+    """
+
+    def on_stage(self, stage: str, seconds: float) -> None:
+        """Handle the end of a pipeline stage.
+
+        :param stage: the stage name, e.g. 'gpt.request' or 'filtering'.
+        :param seconds: the wall-clock duration of the stage.
+        """
+
+    def on_error(self, stage: str, error: BaseException) -> None:
+        """Handle an error raised within a pipeline stage.
+
+        :param stage: the stage name.
+        :param error: the raised exception.
+        """
+
+    def on_usage(self, prompt_tokens: int, completion_tokens: int) -> None:
+        """Handle the token usage of an LLM request.
+
+        :param prompt_tokens: the number of tokens in the prompt.
+        :param completion_tokens: the number of generated tokens.
+        """
+
+    def on_cache(self, hit: bool) -> None:
+        """Handle a cache lookup.
+
+        :param hit: whether the lookup hit the cache.
+        """
+
+
+_HOOKS: Tuple[Hook, ...] = ()
+_HOOKS_LOCK = threading.Lock()
+
+
+def add_hook(hook: Hook) -> None:
+    """Register an instrumentation hook."""
+    global _HOOKS
+    with _HOOKS_LOCK:
+        _HOOKS = _HOOKS + (hook,)
+
+
+def remove_hook(hook: Hook) -> None:
+    """Unregister an instrumentation hook; it is a no-op if the hook is not registered."""
+    global _HOOKS
+    with _HOOKS_LOCK:
+        _HOOKS = tuple(h for h in _HOOKS if h is not hook)
+
+
+@contextmanager
+def instrument(*hooks: Hook) -> Iterator[None]:
+    """Register the hooks for the duration of a with block."""
+    for hook in hooks:
+        add_hook(hook)
+    try:
+        yield
+    finally:
+        for hook in hooks:
+            remove_hook(hook)
+
+
+def enabled() -> bool:
+    """Check whether any hook is registered."""
+    return bool(_HOOKS)
+
+
+class _NullStage:
+    """The stage returned when instrumentation is disabled."""
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """Time a pipeline stage and report it to a snapshot of the hooks."""
+
+    __slots__ = ("_name", "_hooks", "_start")
+
+    def __init__(self, name: str, hooks: Tuple[Hook, ...]):
+        self._name = name
+        self._hooks = hooks
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]], exc: Optional[BaseException], tb: Any) -> None:
+        seconds = time.perf_counter() - self._start
+        for hook in self._hooks:
+            hook.on_stage(self._name, seconds)
+            if exc is not None:
+                hook.on_error(self._name, exc)
+
+
+def stage(name: str):
+    """Get a context manager timing a pipeline stage.
+
+    :param name: the stage name.
+    :return: the context manager; a shared no-op one if no hook is registered.
+    """
+    hooks = _HOOKS
+    return _Stage(name, hooks) if hooks else _NULL_STAGE
+
+
+def record_usage(usage: Any) -> None:
+    """Report the token usage of an OpenAI response, if any.
+
+    :param usage: the 'usage' field of the response, possibly None.
+    """
+    hooks = _HOOKS
+    if not hooks or usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+    completion_tokens = getattr(usage, "completion_tokens", None) or 0
+    for hook in hooks:
+        hook.on_usage(prompt_tokens, completion_tokens)
+
+
+def record_cache(hit: bool) -> None:
+    """Report a cache lookup."""
+    hooks = _HOOKS
+    if not hooks:
+        return
+    for hook in hooks:
+        hook.on_cache(hit)
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """Get the q-th percentile of sorted values, with the nearest-rank method."""
+    if not sorted_values:
+        return math.nan
+    rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class MetricsAggregator(Hook):
+    """A hook aggregating the events into per-stage latency percentiles and counters.
+
+    Only the latest `max_samples` durations of each stage are kept, so memory stays bounded on long runs.
+    """
+
+    def __init__(self, max_samples: int = 10000):
+        """Initialize the aggregator.
+
+        :param max_samples: the number of most recent durations kept per stage.
+        """
+        self._max_samples = max_samples
+        self._lock = threading.Lock()
+        self._durations: Dict[str, Deque[float]] = {}
+        self._counts: Counter = Counter()
+        self._errors: Counter = Counter()
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def on_stage(self, stage: str, seconds: float) -> None:
+        """Record the duration of a stage."""
+        with self._lock:
+            durations = self._durations.get(stage)
+            if durations is None:
+                durations = self._durations[stage] = deque(maxlen=self._max_samples)
+            durations.append(seconds)
+            self._counts[stage] += 1
+
+    def on_error(self, stage: str, error: BaseException) -> None:
+        """Count an error of a stage."""
+        with self._lock:
+            self._errors[stage] += 1
+
+    def on_usage(self, prompt_tokens: int, completion_tokens: int) -> None:
+        """Accumulate the token usage."""
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def on_cache(self, hit: bool) -> None:
+        """Count a cache lookup."""
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    @property
+    def stages(self) -> List[str]:
+        """Get the names of the recorded stages."""
+        with self._lock:
+            return list(self._durations)
+
+    def percentile(self, stage: str, q: float) -> float:
+        """Get the q-th percentile of the durations of a stage, in seconds; NaN if the stage was never recorded."""
+        with self._lock:
+            values = sorted(self._durations.get(stage, ()))
+        return _percentile(values, q)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Get count, errors, mean, p50, p95 and p99 (in seconds) of every stage."""
+        with self._lock:
+            snapshot = {stage: sorted(durations) for stage, durations in self._durations.items()}
+            counts = dict(self._counts)
+            errors = dict(self._errors)
+        return {
+            stage: {
+                "count": counts[stage],
+                "errors": errors.get(stage, 0),
+                "mean": sum(values) / len(values),
+                "p50": _percentile(values, 50),
+                "p95": _percentile(values, 95),
+                "p99": _percentile(values, 99),
+            }
+            for stage, values in snapshot.items()
+        }
+
+    def reset(self) -> None:
+        """Discard all the recorded events."""
+        with self._lock:
+            self._durations.clear()
+            self._counts.clear()
+            self._errors.clear()
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+            self.cache_hits = 0
+            self.cache_misses = 0
@@ -0,0 +1,415 @@
+"""A long-running HTTP/JSON translation server.
+
+The engine is loaded once and kept warm across requests, e.g. the Rasa agent that is slow and memory-heavy to load.
+Concurrent requests are micro-batched: the utterances queued within a short delay are translated with a single
+engine batch, on a bounded pool of workers, so that the engine is never called by more than a fixed number of
+threads at a time. Only the standard library is required.
+
+Endpoints:
+
+    GET  /health          -> {"status": "ok", "engine": ..., "batcher": {...}}
+    POST /translate       {"utterance": "...", "filter": "greedy"}        -> {"utterance": ..., "formulas": [...]}
+    POST /translate_many  {"utterances": ["...", ...], "filter": "greedy"} -> {"results": [{...}, ...]}
+
+The formulas are serialized by nl2ltl.engines.utils.serialize_result; the filter is optional, see nl2ltl.filters.
+"""
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import asdict, dataclass, replace
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pylogics.syntax.base import Formula
+
+from nl2ltl.engines.base import Engine
+from nl2ltl.engines.utils import serialize_result
+from nl2ltl.exceptions import OverloadedException
+from nl2ltl.filters import get_filter
+from nl2ltl.filters.base import Filter
+from nl2ltl.instrumentation import stage
+
+_MAX_BODY_SIZE = 16 * 2**20
+
+_Item = Tuple[str, Optional[Filter], Future]
+
+
+@dataclass
+class BatcherStats:
+    """Dataclass to represent the counters of a micro-batcher."""
+
+    utterances: int = 0
+    batches: int = 0
+    errors: int = 0
+    rejected: int = 0
+
+    @property
+    def mean_batch_size(self) -> float:
+        """Get the mean number of utterances per engine batch."""
+        return self.utterances / self.batches if self.batches else 0.0
+
+
+class MicroBatcher:
+    """Group the utterances submitted concurrently into engine batches."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        max_batch_size: int = 32,
+        max_delay: float = 0.005,
+        workers: int = 4,
+        max_pending: int = 1024,
+    ):
+        """Start the dispatcher.
+
+        A batch is dispatched when it is full, or `max_delay` seconds after its first utterance. While all the
+        workers are busy, utterances keep queueing, so that batches grow with the load.
+
+        :param engine: the engine translating the batches.
+        :param max_batch_size: the maximum number of utterances per engine batch.
+        :param max_delay: the maximum seconds to wait for a batch to fill.
+        :param workers: the maximum number of engine batches running at the same time.
+        :param max_pending: the maximum number of queued utterances; beyond it, submissions are rejected.
+        """
+        if max_batch_size < 1:
+            raise ValueError(f"The batch size must be positive, found {max_batch_size}.")
+        if max_delay < 0:
+            raise ValueError(f"The delay must be non-negative, found {max_delay}.")
+        if workers < 1:
+            raise ValueError(f"The number of workers must be positive, found {workers}.")
+        if max_pending < 1:
+            raise ValueError(f"The number of pending utterances must be positive, found {max_pending}.")
+        self._engine = engine
+        self._max_batch_size = max_batch_size
+        self._max_delay = max_delay
+        self._workers = workers
+        self._max_pending = max_pending
+        self._queue: "queue.SimpleQueue[Optional[_Item]]" = queue.SimpleQueue()
+        self._pending = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._stats = BatcherStats()
+        self._slots = threading.BoundedSemaphore(workers)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="nl2ltl-worker")
+        self._dispatcher = threading.Thread(target=self._dispatch, name="nl2ltl-batcher", daemon=True)
+        self._dispatcher.start()
+
+    @property
+    def engine(self) -> Engine:
+        """Get the engine translating the batches."""
+        return self._engine
+
+    @property
+    def max_batch_size(self) -> int:
+        """Get the maximum number of utterances per engine batch."""
+        return self._max_batch_size
+
+    @property
+    def max_delay(self) -> float:
+        """Get the maximum seconds to wait for a batch to fill."""
+        return self._max_delay
+
+    @property
+    def workers(self) -> int:
+        """Get the maximum number of engine batches running at the same time."""
+        return self._workers
+
+    @property
+    def max_pending(self) -> int:
+        """Get the maximum number of queued utterances."""
+        return self._max_pending
+
+    @property
+    def pending(self) -> int:
+        """Get the number of queued utterances."""
+        return self._pending
+
+    @property
+    def stats(self) -> BatcherStats:
+        """Get a snapshot of the counters."""
+        with self._lock:
+            return replace(self._stats)
+
+    def submit_many(self, utterances: Sequence[str], filtering: Filter = None) -> List[Future]:
+        """Queue many utterances, all or none.
+
+        :param utterances: the natural language utterances.
+        :param filtering: the filtering function to use.
+        :return: one future per utterance, resolved with its best matching formulas.
+        """
+        if len(utterances) > self._max_pending:
+            raise ValueError(f"Too many utterances: {len(utterances)} > {self._max_pending}.")
+        futures: List[Future] = [Future() for _ in utterances]
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The batcher is closed.")
+            if self._pending + len(utterances) > self._max_pending:
+                self._stats.rejected += len(utterances)
+                raise OverloadedException(f"{self._pending} utterances are pending, the limit is {self._max_pending}.")
+            self._pending += len(utterances)
+            for utterance, future in zip(utterances, futures):
+                self._queue.put((utterance, filtering, future))
+        return futures
+
+    def submit(self, utterance: str, filtering: Filter = None) -> Future:
+        """Queue an utterance.
+
+        :param utterance: the natural language utterance.
+        :param filtering: the filtering function to use.
+        :return: a future resolved with the best matching formulas.
+        """
+        (future,) = self.submit_many([utterance], filtering)
+        return future
+
+    def translate_many(
+        self, utterances: Sequence[str], filtering: Filter = None, timeout: Optional[float] = None
+    ) -> List[Dict[Formula, float]]:
+        """Translate many utterances, batched with the concurrent submissions.
+
+        :param utterances: the natural language utterances.
+        :param filtering: the filtering function to use.
+        :param timeout: the maximum seconds to wait for the results; on timeout, the utterances not yet
+            dispatched are cancelled and concurrent.futures.TimeoutError is raised.
+        :return: the best matching formulas with their confidence, one dict per utterance, in input order.
+        """
+        futures = self.submit_many(utterances, filtering)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            return [
+                future.result(None if deadline is None else max(0.0, deadline - time.monotonic())) for future in futures
+            ]
+        except FutureTimeoutError:
+            for future in futures:
+                future.cancel()
+            raise
+
+    def _next_batch(self, first: _Item) -> Tuple[List[_Item], bool]:
+        """Collect a batch starting with the given item; return it and whether the batcher was closed."""
+        batch = [first]
+        deadline = time.monotonic() + self._max_delay
+        while len(batch) < self._max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _dispatch(self) -> None:
+        """Collect the queued utterances into batches and run them on the workers, until closed."""
+        closed = False
+        while not closed:
+            first = self._queue.get()
+            if first is None:
+                break
+            # wait for a free worker before collecting, so that the batch includes the utterances queued meanwhile
+            self._slots.acquire()
+            batch, closed = self._next_batch(first)
+            with self._lock:
+                self._pending -= len(batch)
+            self._executor.submit(self._run, batch)
+
+    def _run(self, batch: Sequence[_Item]) -> None:
+        """Translate a batch, grouped by filter, and resolve its futures."""
+        try:
+            groups: Dict[Optional[Filter], List[_Item]] = {}
+            for item in batch:
+                if item[2].set_running_or_notify_cancel():
+                    groups.setdefault(item[1], []).append(item)
+            for filtering, items in groups.items():
+                try:
+                    with stage("server.batch"):
+                        results = self._engine.translate_many([utterance for utterance, _, _ in items], filtering)
+                except Exception as e:
+                    with self._lock:
+                        self._stats.batches += 1
+                        self._stats.utterances += len(items)
+                        self._stats.errors += len(items)
+                    for _, _, future in items:
+                        future.set_exception(e)
+                    continue
+                with self._lock:
+                    self._stats.batches += 1
+                    self._stats.utterances += len(items)
+                for (_, _, future), result in zip(items, results):
+                    future.set_result(result)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """Translate the queued utterances, then stop the dispatcher and the workers."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+
+
+class _BadRequest(Exception):
+    """Raise this exception when a request is malformed."""
+
+
+def _parse_utterances(payload: Any, key: str) -> List[str]:
+    """Get the utterances of a request payload."""
+    if not isinstance(payload, dict):
+        raise _BadRequest("The request body must be a JSON object.")
+    utterances = payload.get(key)
+    if key == "utterance":
+        utterances = [utterances]
+    if not isinstance(utterances, list) or not all(isinstance(utterance, str) for utterance in utterances):
+        raise _BadRequest(f"Field {key!r} is missing or is not a {'string' if key == 'utterance' else 'list'}.")
+    return utterances
+
+
+class _TranslationHandler(BaseHTTPRequestHandler):
+    """Handle the requests of a TranslationServer."""
+
+    server: "TranslationServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Log the requests only if the server is verbose."""
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: HTTPStatus, payload: Dict[str, Any]) -> None:
+        """Send a JSON response."""
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Any:
+        """Read the JSON body of a request."""
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > _MAX_BODY_SIZE:
+            raise _BadRequest(f"The request body is larger than {_MAX_BODY_SIZE} bytes.")
+        try:
+            return json.loads(self.rfile.read(length) or b"null")
+        except ValueError as e:
+            raise _BadRequest(f"Invalid JSON: {e}") from e
+
+    def do_GET(self) -> None:
+        """Report the status of the server."""
+        if self.path != "/health":
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {self.path!r}."})
+            return
+        batcher = self.server.batcher
+        stats = batcher.stats
+        self._send(
+            HTTPStatus.OK,
+            {
+                "status": "ok",
+                "engine": type(self.server.engine).__name__,
+                "batcher": {**asdict(stats), "mean_batch_size": stats.mean_batch_size, "pending": batcher.pending},
+            },
+        )
+
+    def do_POST(self) -> None:
+        """Translate the utterances of a request."""
+        if self.path not in ("/translate", "/translate_many"):
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {self.path!r}."})
+            return
+        batcher = self.server.batcher
+        try:
+            payload = self._read_json()
+            utterances = _parse_utterances(payload, "utterance" if self.path == "/translate" else "utterances")
+            filtering = get_filter(payload.get("filter"))
+            if len(utterances) > batcher.max_pending:
+                raise _BadRequest(f"Too many utterances: {len(utterances)} > {batcher.max_pending}.")
+        except (_BadRequest, ValueError) as e:
+            self._send(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+        try:
+            results = batcher.translate_many(utterances, filtering, self.server.request_timeout)
+        except OverloadedException as e:
+            self._send(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)})
+            return
+        except FutureTimeoutError:
+            self._send(HTTPStatus.GATEWAY_TIMEOUT, {"error": "The translation timed out."})
+            return
+        except Exception as e:
+            self._send(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"})
+            return
+        records = [
+            {"utterance": utterance, "formulas": serialize_result(result)}
+            for utterance, result in zip(utterances, results)
+        ]
+        self._send(HTTPStatus.OK, records[0] if self.path == "/translate" else {"results": records})
+
+
+class TranslationServer(ThreadingHTTPServer):
+    """An HTTP server translating utterances with a warm engine."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        engine: Engine,
+        max_batch_size: int = 32,
+        max_delay: float = 0.005,
+        workers: int = 4,
+        max_pending: int = 1024,
+        request_timeout: Optional[float] = 60.0,
+        verbose: bool = False,
+    ):
+        """Bind the server and start the micro-batcher.
+
+        :param address: the host and the port to bind; port 0 picks a free port.
+        :param engine: the engine, kept warm across requests.
+        :param max_batch_size: the maximum number of utterances per engine batch.
+        :param max_delay: the maximum seconds to wait for a batch to fill.
+        :param workers: the maximum number of engine batches running at the same time.
+        :param max_pending: the maximum number of queued utterances; beyond it, requests get a 503.
+        :param request_timeout: the maximum seconds to wait for the results of a request; beyond it, it gets a 504.
+        :param verbose: whether to log every request.
+        """
+        self.engine = engine
+        self.batcher = MicroBatcher(engine, max_batch_size, max_delay, workers, max_pending)
+        self.request_timeout = request_timeout
+        self.verbose = verbose
+        try:
+            super().__init__(address, _TranslationHandler)
+        except BaseException:
+            self.batcher.close()
+            raise
+
+    def server_close(self) -> None:
+        """Close the socket, then drain the micro-batcher."""
+        super().server_close()
+        self.batcher.close()
+
+
+def serve(engine: Engine, host: str = "127.0.0.1", port: int = 8000, **kwargs: Any) -> None:
+    """Serve translations until interrupted, then close the engine.
+
+    :param engine: the engine, kept warm across requests.
+    :param host: the host to bind.
+    :param port: the port to bind.
+    :param kwargs: the other parameters of TranslationServer.
+    """
+    server = TranslationServer((host, port), engine, **kwargs)
+    print(
+        f"Serving {type(engine).__name__} on http://{server.server_address[0]}:{server.server_address[1]}", flush=True
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        close = getattr(engine, "close", None)
+        if callable(close):
+            close()
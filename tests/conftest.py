@@ -1,8 +1,13 @@
 """The conftest.py module for pytest."""
 import inspect
+import itertools
 from pathlib import Path
 
+from pylogics.syntax.base import And, Formula, Implies, Not, Or, _UnaryOp
+from pylogics.syntax.ltl import Always, Atomic, Eventually, Next, Until
+
 import nl2ltl
+from nl2ltl.declare.serialization import TEMPLATES
 
 _current_filepath = inspect.getframeinfo(inspect.currentframe()).filename  # type: ignore
 TEST_DIRECTORY = Path(_current_filepath).absolute().parent
@@ -18,3 +23,39 @@ class UtterancesFixtures:
         "If a new Eventbrite is created, alert me through Slack.",
         "send me a Slack whenever I get a Gmail.",
     ]
+
+
+def _holds(formula: Formula, trace, i: int = 0) -> bool:
+    """Evaluate an LTLf formula at a position of a trace with one activity per event."""
+    if isinstance(formula, Atomic):
+        return i < len(trace) and trace[i] == formula.name
+    if isinstance(formula, Not):
+        return not _holds(formula.argument, trace, i)
+    if isinstance(formula, And):
+        return all(_holds(operand, trace, i) for operand in formula.operands)
+    if isinstance(formula, Or):
+        return any(_holds(operand, trace, i) for operand in formula.operands)
+    if isinstance(formula, Implies):
+        return not _holds(formula.operands[0], trace, i) or _holds(formula.operands[1], trace, i)
+    if isinstance(formula, Eventually):
+        return any(_holds(formula.argument, trace, j) for j in range(i, len(trace)))
+    if isinstance(formula, Always):
+        return all(_holds(formula.argument, trace, j) for j in range(i, len(trace)))
+    if isinstance(formula, Next):
+        return i + 1 < len(trace) and _holds(formula.argument, trace, i + 1)
+    if isinstance(formula, Until):
+        left, right = formula.operands
+        return any(
+            _holds(right, trace, j) and all(_holds(left, trace, k) for k in range(i, j)) for j in range(i, len(trace))
+        )
+    raise TypeError(f"Unsupported formula {formula}.")
+
+
+def _constraints(activities):
+    """Build every constraint over some activities, including those with repeated arguments."""
+    constraints = []
+    for template_cls in TEMPLATES.values():
+        arity = 1 if issubclass(template_cls, _UnaryOp) else 2
+        for names in itertools.product(activities, repeat=arity):
+            constraints.append(template_cls(*map(Atomic, names)))
+    return constraints
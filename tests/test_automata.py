@@ -0,0 +1,79 @@
+"""Tests for the compilation of templates to DFAs and the incremental monitoring."""
+import itertools
+
+import pytest
+from pylogics.syntax.ltl import Atomic
+
+from nl2ltl.declare.automata import DFA, Specification, Verdict, to_dfa
+from nl2ltl.declare.declare import ChainResponse, Existence, Response
+
+from .conftest import _constraints, _holds
+
+
+def _traces(max_length):
+    """Get every trace over the activities a, b, c and d, up to a length."""
+    for length in range(max_length + 1):
+        yield from itertools.product("abcd", repeat=length)
+
+
+class TestAutomata:
+    """Automata and monitoring test class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup any state specific to the execution of the given class (which
+        usually contains tests).
+        """
+        cls.constraints = _constraints(["a", "b", "c", "z"])
+        cls.specification = Specification(cls.constraints)
+
+    def test_matches_ltlf_semantics(self):
+        """Test that the monitor accepts a trace iff it satisfies the LTLf semantics of the templates."""
+        monitor = self.specification.monitor()
+        for trace in _traces(5):
+            monitor.reset()
+            monitor.steps(trace)
+            assert len(monitor) == len(trace)
+            assert monitor.finish() == [_holds(c.to_ltlf(), trace) for c in self.constraints]
+
+    def test_verdicts_are_permanent(self):
+        """Test that satisfied and violated prefixes stay so under every extension, and that pending ones do not."""
+        constraints = _constraints(["a", "b", "c"])
+        monitor = Specification(constraints).monitor()
+        for prefix in _traces(3):
+            monitor.reset()
+            monitor.steps(prefix)
+            verdicts = monitor.verdicts()
+            outcomes = [set() for _ in constraints]
+            for suffix in _traces(2):
+                for position, c in enumerate(constraints):
+                    outcomes[position].add(_holds(c.to_ltlf(), prefix + suffix))
+            for verdict, outcome in zip(verdicts, outcomes):
+                expected = {Verdict.SATISFIED: {True}, Verdict.VIOLATED: {False}, Verdict.PENDING: {True, False}}
+                assert outcome == expected[verdict]
+
+    def test_verdicts(self):
+        """Test the verdicts of a few constraints along a trace."""
+        a, b = Atomic("a"), Atomic("b")
+        monitor = Specification([Existence(a), Response(a, b), ChainResponse(a, b)]).monitor()
+        assert monitor.verdicts() == [Verdict.PENDING, Verdict.PENDING, Verdict.PENDING]
+        monitor.step("a")
+        assert monitor.verdicts() == [Verdict.SATISFIED, Verdict.PENDING, Verdict.PENDING]
+        monitor.step("x")
+        assert monitor.verdicts() == [Verdict.SATISFIED, Verdict.PENDING, Verdict.VIOLATED]
+        assert monitor.verdict(1) is Verdict.PENDING
+        assert monitor.finish() == [True, False, False]
+
+    def test_shared_automata(self):
+        """Test that the constraints with the same shape share their automaton."""
+        a, b, c, d = map(Atomic, "abcd")
+        response, names = to_dfa(Response(a, b))
+        assert names == ("a", "b")
+        assert to_dfa(Response(c, d))[0] is response
+        assert to_dfa(Response(c, c))[0] is not response
+        assert Specification([Response(a, b), Response(c, d)]).automata == (response, response)
+
+    def test_invalid_automaton(self):
+        """Test that incomplete transition tables are rejected."""
+        with pytest.raises(ValueError):
+            DFA(((0, 1), (0,)), frozenset({0}))
@@ -0,0 +1,143 @@
+"""Tests for the bulk translation."""
+import asyncio
+import functools
+import io
+import json
+from typing import Dict
+
+import pytest
+from pylogics.syntax.base import Formula
+
+from nl2ltl.bulk import (
+    Record,
+    atranslate_records,
+    completed_ids,
+    guess_format,
+    read_records,
+    translate_records,
+    translate_records_in_processes,
+)
+from nl2ltl.cli import main
+from nl2ltl.filters.base import Filter
+
+from .conftest import UtterancesFixtures
+from .test_core import _EchoEngine
+
+
+class _FailingEchoEngine(_EchoEngine):
+    """An echo engine failing on the utterances starting with 'fail'."""
+
+    def translate(self, utterance: str, filtering: Filter = None) -> Dict[Formula, float]:
+        """From NL to LTL."""
+        if utterance.startswith("fail"):
+            raise RuntimeError("boom")
+        return super().translate(utterance, filtering)
+
+
+def _records(n: int):
+    """Build records, one every 3 failing."""
+    return [Record(f"r{i}", f"{'fail' if i % 3 == 2 else 'word'}{i} and more") for i in range(n)]
+
+
+def _expected(records):
+    """Get the formula, or None on failure, expected for each record."""
+    return [
+        None if record.utterance.startswith("fail") else f"(Existence {record.utterance.split()[0]})"
+        for record in records
+    ]
+
+
+def _formulas(results):
+    """Get the top formula, or None on failure, of each result."""
+    return [result["formulas"][0]["formula"] if "formulas" in result else None for result in results]
+
+
+class TestBulk:
+    """Bulk translation test class."""
+
+    @pytest.mark.parametrize(
+        "text, input_format, expected",
+        [
+            ('{"id": 7, "utterance": "a b"}\n\n{"utterance": "c"}\n', "jsonl", [Record(7, "a b"), Record(1, "c")]),
+            ('id,utterance\nx,"a, b"\ny,c\n', "csv", [Record("x", "a, b"), Record("y", "c")]),
+            ("a b\n\nc\r\n", "text", [Record(0, "a b"), Record(1, "c")]),
+        ],
+    )
+    def test_read_records(self, text, input_format, expected):
+        """Test the input formats, and the default ids."""
+        assert list(read_records(io.StringIO(text), input_format)) == expected
+
+    def test_read_records_errors(self):
+        """Test that records with no utterance are rejected."""
+        with pytest.raises(ValueError):
+            list(read_records(io.StringIO('{"text": "a"}\n'), "jsonl"))
+        with pytest.raises(ValueError):
+            list(read_records(io.StringIO("a\n"), "xml"))
+        formats = [guess_format(path) for path in ("a.JSONL", "a.csv", "a.txt", None)]
+        assert formats == ["jsonl", "csv", "text", "text"]
+
+    @pytest.mark.parametrize("batch_size", [1, 4, 64])
+    def test_translate_records(self, batch_size):
+        """Test that results are in input order and that failures are isolated."""
+        records = _records(10)
+        results = list(translate_records(records, _FailingEchoEngine(), batch_size=batch_size))
+        assert [result["id"] for result in results] == [record.id for record in records]
+        assert _formulas(results) == _expected(records)
+        assert all(result["error"] == "RuntimeError: boom" for result in results if "formulas" not in result)
+
+    def test_translate_records_in_processes(self):
+        """Test that the process pool preserves the input order."""
+        records = _records(50)
+        results = list(translate_records_in_processes(iter(records), _FailingEchoEngine, batch_size=3, processes=2))
+        assert [result["id"] for result in results] == [record.id for record in records]
+        assert _formulas(results) == _expected(records)
+
+    def test_atranslate_records(self):
+        """Test that concurrent asynchronous batches preserve the input order."""
+        records = _records(50)
+
+        async def _collect():
+            return [result async for result in atranslate_records(iter(records), _FailingEchoEngine(), None, 3, 4)]
+
+        results = asyncio.run(_collect())
+        assert [result["id"] for result in results] == [record.id for record in records]
+        assert _formulas(results) == _expected(records)
+
+    def test_completed_ids(self, tmp_path):
+        """Test that a trailing partial line is truncated."""
+        path = tmp_path / "out.jsonl"
+        assert completed_ids(path) == set()
+        path.write_text('{"id": 1, "formulas": []}\n{"id": "b", "error": "x"}\n{"id": "c", "for')
+        assert completed_ids(path) == {"1", "b"}
+        assert path.read_text().endswith('"x"}\n')
+
+    def test_cli_resume(self, tmp_path, capsys):
+        """Test the command-line translation, resumed after an interruption."""
+        source = tmp_path / "in.jsonl"
+        output = tmp_path / "out.jsonl"
+        utterances = UtterancesFixtures.utterances
+        source.write_text("".join(json.dumps({"id": i, "utterance": u}) + "\n" for i, u in enumerate(utterances)))
+        argv = ["translate", str(source), "-o", str(output), "--engine", "rules", "--filter", "greedy"]
+        assert main(argv) == 0
+        complete = output.read_text().splitlines()
+        assert [json.loads(line)["id"] for line in complete] == list(range(len(utterances)))
+
+        output.write_text("\n".join(complete[:2]) + "\n" + complete[2][:10])
+        assert main([*argv, "--resume"]) == 0
+        assert output.read_text().splitlines() == complete
+        assert "skipped 2" in capsys.readouterr().err
+
+    def test_cli_resume_needs_output(self):
+        """Test that resuming needs an output file."""
+        with pytest.raises(SystemExit):
+            main(["translate", "--engine", "rules", "--resume"])
+
+
+def test_process_pool_engine_factory_is_picklable():
+    """Test that the engine factory of the command line can be sent to worker processes."""
+    import pickle
+
+    from nl2ltl.cli import build_parser, make_engine
+
+    factory = functools.partial(make_engine, build_parser().parse_args(["translate", "--engine", "rules"]))
+    assert type(pickle.loads(pickle.dumps(factory))()).__name__ == "RuleEngine"
@@ -0,0 +1,60 @@
+"""Tests for the caches."""
+import time
+
+import pytest
+
+from nl2ltl.cache.base import make_key, normalize_utterance
+from nl2ltl.cache.memory import LRUCache
+from nl2ltl.cache.sqlite import SqliteCache
+from nl2ltl.engines.gpt.output import GPTOutput
+from nl2ltl.engines.rasa.output import RasaOutput
+
+OUTPUTS = [
+    GPTOutput("response", ("Slack", "Gmail")),
+    RasaOutput("Invite Sales employees.", {"existence": 0.9}, {"Sales": 0.8}, {"existence": 0.9, "absence": 0.1}),
+]
+
+
+class TestCache:
+    """Cache test class."""
+
+    @pytest.mark.parametrize("cache_cls", [LRUCache, SqliteCache])
+    @pytest.mark.parametrize("output", OUTPUTS)
+    def test_roundtrip(self, cache_cls, output):
+        """Test that parsed outputs are stored and retrieved unchanged."""
+        cache = cache_cls()
+        assert cache.get("key") is None
+        cache.set("key", output)
+        assert cache.get("key") == output
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    @pytest.mark.parametrize("cache", [LRUCache(maxsize=2), SqliteCache(max_entries=2)])
+    def test_size_eviction(self, cache):
+        """Test that the least recently used entry is evicted first."""
+        cache.set("a", OUTPUTS[0])
+        time.sleep(0.01)
+        cache.set("b", OUTPUTS[0])
+        time.sleep(0.01)
+        cache.get("a")
+        time.sleep(0.01)
+        cache.set("c", OUTPUTS[0])
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats.evictions == 1
+
+    @pytest.mark.parametrize("cache_cls", [LRUCache, SqliteCache])
+    def test_ttl_expiration(self, cache_cls):
+        """Test that expired entries are not returned."""
+        cache = cache_cls(ttl=0.01)
+        cache.set("key", OUTPUTS[0])
+        time.sleep(0.02)
+        assert cache.get("key") is None
+
+    def test_key(self):
+        """Test that keys ignore whitespace differences but not request parameters."""
+        assert normalize_utterance("  send  me a\tSlack ") == "send me a Slack"
+        assert make_key("send me a Slack", "gpt-4", 0.5) == make_key(
+            normalize_utterance(" send me  a Slack"), "gpt-4", 0.5
+        )
+        assert make_key("send me a Slack", "gpt-4", 0.5) != make_key("send me a Slack", "gpt-4", 0.6)
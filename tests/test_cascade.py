@@ -0,0 +1,154 @@
+"""Tests for the cascading engine."""
+import asyncio
+import time
+from typing import Dict, List, Sequence
+
+import pytest
+from pylogics.syntax.base import Formula
+from pylogics.syntax.ltl import Atomic
+
+from nl2ltl import translate, translate_many
+from nl2ltl.declare.declare import Existence
+from nl2ltl.engines.cascade import CascadeEngine
+from nl2ltl.filters.base import Filter
+
+from .conftest import UtterancesFixtures
+from .test_core import _EchoEngine
+
+
+class _ConstantEngine(_EchoEngine):
+    """An echo engine answering with a fixed confidence, optionally after a delay, and recording its batches."""
+
+    def __init__(self, confidence: float, delay: float = 0.0, name: str = ""):
+        self.confidence = confidence
+        self.delay = delay
+        self.name = name
+        self.batches: List[List[str]] = []
+
+    def translate(self, utterance: str, filtering: Filter = None) -> Dict[Formula, float]:
+        """From NL to LTL."""
+        time.sleep(self.delay)
+        return {Existence(Atomic(self.name or utterance.split()[0].lower())): self.confidence}
+
+    def translate_many(self, utterances: Sequence[str], filtering: Filter = None) -> List[Dict[Formula, float]]:
+        """From many NL utterances to LTL."""
+        self.batches.append(list(utterances))
+        return [self.translate(utterance, filtering) for utterance in utterances]
+
+
+class _SelectiveEngine(_ConstantEngine):
+    """An engine confident only about the utterances starting with a given word."""
+
+    def translate(self, utterance: str, filtering: Filter = None) -> Dict[Formula, float]:
+        """From NL to LTL."""
+        confident = utterance.lower().startswith(self.name)
+        return {Existence(Atomic("cheap")): self.confidence} if confident else {}
+
+
+class _FailingEngine(_ConstantEngine):
+    """An engine always failing."""
+
+    def translate(self, utterance: str, filtering: Filter = None) -> Dict[Formula, float]:
+        """From NL to LTL."""
+        raise RuntimeError("unavailable")
+
+
+class TestCascade:
+    """Cascading engine test class."""
+
+    @pytest.mark.parametrize(
+        "confidence, expected, accepted",
+        [(0.9, "(Existence cheap)", [1, 0]), (0.5, "(Existence expensive)", [0, 1])],
+    )
+    def test_escalation(self, confidence, expected, accepted):
+        """Test that a low-confidence answer is escalated to the next tier."""
+        engine = CascadeEngine(
+            [_ConstantEngine(confidence, name="cheap"), _ConstantEngine(1.0, name="expensive")], thresholds=0.8
+        )
+        output = translate(UtterancesFixtures.utterances[0], engine)
+        assert list(map(str, output)) == [expected]
+        assert [stats.accepted for stats in engine.stats] == accepted
+        assert engine.stats[0].calls == 1
+
+    def test_empty_answers_escalated(self):
+        """Test that a tier with no grounded formula is escalated."""
+        engine = CascadeEngine([_SelectiveEngine(1.0, name="invite"), _ConstantEngine(1.0, name="expensive")])
+        outputs = translate_many(UtterancesFixtures.utterances, engine)
+        assert [list(map(str, output)) for output in outputs] == [
+            ["(Existence expensive)"],
+            ["(Existence cheap)"],
+            ["(Existence expensive)"],
+            ["(Existence expensive)"],
+        ]
+        assert engine.stats[0].escalated == 3
+        assert engine.stats[1].calls == 3
+
+    def test_batches_escalate_only_rejected(self):
+        """Test that each tier translates the utterances rejected by the previous one as a single batch."""
+        cheap, expensive = _SelectiveEngine(1.0, name="invite"), _ConstantEngine(1.0, name="expensive")
+        translate_many(UtterancesFixtures.utterances, CascadeEngine([cheap, expensive]))
+        assert cheap.batches == [UtterancesFixtures.utterances]
+        assert expensive.batches == [[u for u in UtterancesFixtures.utterances if not u.startswith("Invite")]]
+
+    def test_failing_tier_escalated(self):
+        """Test that a failing tier is escalated, and that a failing last tier raises."""
+        engine = CascadeEngine([_FailingEngine(1.0), _ConstantEngine(1.0, name="expensive")])
+        assert list(map(str, translate(UtterancesFixtures.utterances[0], engine))) == ["(Existence expensive)"]
+        assert engine.stats[0].errors == 1
+        with pytest.raises(RuntimeError):
+            translate(UtterancesFixtures.utterances[0], CascadeEngine([_ConstantEngine(0.1), _FailingEngine(1.0)]))
+
+    @pytest.mark.parametrize("asynchronous", [False, True])
+    def test_budget_races_slow_tier(self, asynchronous):
+        """Test that a tier exceeding the latency budget is raced against the next one."""
+        engine = CascadeEngine(
+            [_ConstantEngine(1.0, delay=1.0, name="cheap"), _ConstantEngine(1.0, name="expensive")], budget=0.05
+        )
+
+        async def timed_atranslate():
+            start = time.perf_counter()
+            return await engine.atranslate(UtterancesFixtures.utterances[0]), time.perf_counter() - start
+
+        if asynchronous:
+            output, seconds = asyncio.run(timed_atranslate())
+        else:
+            start = time.perf_counter()
+            output = translate(UtterancesFixtures.utterances[0], engine)
+            seconds = time.perf_counter() - start
+        assert seconds < 0.5
+        assert list(map(str, output)) == ["(Existence expensive)"]
+        assert engine.stats[1].accepted == 1
+        engine.close()
+
+    @pytest.mark.parametrize("asynchronous", [False, True])
+    def test_budget_keeps_fast_tier(self, asynchronous):
+        """Test that a tier answering within the latency budget does not escalate."""
+        expensive = _ConstantEngine(1.0, name="expensive")
+        engine = CascadeEngine([_ConstantEngine(1.0, name="cheap"), expensive], budget=1.0)
+        if asynchronous:
+            output = asyncio.run(engine.atranslate(UtterancesFixtures.utterances[0]))
+        else:
+            output = translate(UtterancesFixtures.utterances[0], engine)
+        assert list(map(str, output)) == ["(Existence cheap)"]
+        assert engine.stats[1].calls == 0
+        engine.close()
+
+    def test_atranslate_many(self):
+        """Test that the asynchronous batch translation matches the synchronous one."""
+        engine = CascadeEngine([_SelectiveEngine(1.0, name="invite"), _ConstantEngine(1.0, name="expensive")])
+        outputs = asyncio.run(engine.atranslate_many(UtterancesFixtures.utterances))
+        expected = translate_many(UtterancesFixtures.utterances, engine)
+        assert [list(map(str, output)) for output in outputs] == [list(map(str, output)) for output in expected]
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"engines": []},
+            {"engines": [_EchoEngine()], "thresholds": [0.5, 0.5]},
+            {"engines": [_EchoEngine()], "budget": -1},
+        ],
+    )
+    def test_invalid_configuration(self, kwargs):
+        """Test that inconsistent configurations are rejected."""
+        with pytest.raises(ValueError):
+            CascadeEngine(**kwargs)
@@ -0,0 +1,63 @@
+"""Tests for the conformance checking of templates."""
+import random
+
+import pytest
+from pylogics.syntax.ltl import Atomic
+
+from nl2ltl.declare.declare import Existence, Precedence, Response
+
+from .conftest import _constraints, _holds
+
+np = pytest.importorskip("numpy")
+
+from nl2ltl.declare.conformance import ConformanceChecker, EventLog, check  # noqa: E402
+
+
+class TestConformance:
+    """Conformance checking test class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup any state specific to the execution of the given class (which
+        usually contains tests).
+        """
+        rng = random.Random(0)
+        cls.traces = [[rng.choice("abcd") for _ in range(rng.randint(0, 6))] for _ in range(300)]
+        cls.constraints = _constraints(["a", "b", "c", "z"])
+
+    @pytest.mark.parametrize("chunk_size", [1, 37, 1024])
+    def test_matches_ltlf_semantics(self, chunk_size):
+        """Test that the satisfaction matrix matches the LTLf semantics of the templates."""
+        satisfied = ConformanceChecker(self.constraints, chunk_size).check_traces(self.traces)
+        expected = [[_holds(c.to_ltlf(), trace) for c in self.constraints] for trace in self.traces]
+        assert satisfied.shape == (len(self.traces), len(self.constraints))
+        assert satisfied.tolist() == expected
+
+    def test_encoded_log(self):
+        """Test a log encoded as activity arrays, with activities unknown to the constraints."""
+        log = EventLog(np.array([0, 1, 2, 1]), np.array([0, 2, 2, 4]), ["a", "b", "x"])
+        a, b = Atomic("a"), Atomic("b")
+        assert len(log) == 3
+        assert check(log, [Response(a, b), Precedence(a, b), Existence(b)]).tolist() == [
+            [True, True, True],
+            [True, True, False],
+            [True, False, True],
+        ]
+
+    def test_no_constraints(self):
+        """Test the empty satisfaction matrix."""
+        assert ConformanceChecker([]).check_traces([["a"], []]).shape == (2, 0)
+
+    @pytest.mark.parametrize(
+        "events, offsets, activities",
+        [([0], [1, 1], ["a"]), ([0, 0], [0, 1], ["a"]), ([1], [0, 1], ["a"]), ([0, 0], [0, 2, 1, 2], ["a"])],
+    )
+    def test_invalid_log(self, events, offsets, activities):
+        """Test that inconsistent encodings are rejected."""
+        with pytest.raises(ValueError):
+            EventLog(np.array(events), np.array(offsets), activities)
+
+    def test_invalid_configuration(self):
+        """Test that inconsistent configurations are rejected."""
+        with pytest.raises(ValueError):
+            ConformanceChecker([], chunk_size=0)
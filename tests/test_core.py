@@ -0,0 +1,50 @@
+"""Tests for the core module."""
+import asyncio
+from typing import Dict
+
+import pytest
+from pylogics.syntax.base import Formula
+from pylogics.syntax.ltl import Atomic
+
+from nl2ltl import atranslate_many, translate, translate_many
+from nl2ltl.declare.declare import Existence
+from nl2ltl.engines.base import Engine
+from nl2ltl.filters.base import Filter
+
+from .conftest import UtterancesFixtures
+
+
+class _EchoEngine(Engine):
+    """An engine that maps every utterance to the existence of its first word."""
+
+    def translate(self, utterance: str, filtering: Filter = None) -> Dict[Formula, float]:
+        """From NL to LTL."""
+        return {Existence(Atomic(utterance.split()[0].lower())): 1.0}
+
+
+class TestCore:
+    """Core test class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup any state specific to the execution of the given class (which
+        usually contains tests).
+        """
+        cls.engine = _EchoEngine()
+
+    def test_translate_many_preserves_order(self):
+        """Test that batch translation returns results in input order."""
+        outputs = translate_many(UtterancesFixtures.utterances, self.engine)
+        expected = [translate(utterance, self.engine) for utterance in UtterancesFixtures.utterances]
+        assert [list(map(str, output)) for output in outputs] == [list(map(str, output)) for output in expected]
+
+    @pytest.mark.parametrize("utterances", [[], UtterancesFixtures.utterances[:1]])
+    def test_translate_many_small_batches(self, utterances):
+        """Test batch translation on empty and singleton batches."""
+        assert len(translate_many(utterances, self.engine)) == len(utterances)
+
+    def test_atranslate_many_default(self):
+        """Test that the default asynchronous batch translation matches the synchronous one."""
+        outputs = asyncio.run(atranslate_many(UtterancesFixtures.utterances, self.engine))
+        expected = translate_many(UtterancesFixtures.utterances, self.engine)
+        assert [list(map(str, output)) for output in outputs] == [list(map(str, output)) for output in expected]
@@ -0,0 +1,53 @@
+"""Tests for the DECLARE templates."""
+import copy
+import pickle
+
+import pytest
+from pylogics.syntax.ltl import Atomic
+
+from nl2ltl.declare.base import to_ltlf_many, to_ppltl_many
+from nl2ltl.declare.declare import Absence, Existence, NotCoExistence, Precedence, Response
+
+a, b = Atomic("a"), Atomic("b")
+
+TEMPLATES = [Existence(a), Absence(b), Response(a, b), Precedence(b, a), NotCoExistence(a, b)]
+
+
+class TestDeclare:
+    """DECLARE templates test class."""
+
+    @pytest.mark.parametrize("template", TEMPLATES)
+    def test_interning(self, template):
+        """Test that building the same template twice returns the same object."""
+        assert type(template)(*template.arguments) is template
+        assert template in set(TEMPLATES)
+
+    def test_atoms_interning(self):
+        """Test that templates are built on interned atoms."""
+        assert Response(Atomic("a"), Atomic("b")).arguments[0] is Existence(Atomic("a")).argument
+        assert Existence(argument=Atomic("a")) is Existence(a)
+
+    def test_distinct_templates(self):
+        """Test that templates with different types or argument orders are distinct."""
+        assert Response(a, b) != Response(b, a)
+        assert Response(a, b) != Precedence(a, b)
+
+    @pytest.mark.parametrize("template", TEMPLATES)
+    def test_pickle_and_copy(self, template):
+        """Test that unpickled and copied templates are interned."""
+        assert pickle.loads(pickle.dumps(template)) is template
+        assert copy.deepcopy(template) is template
+
+    @pytest.mark.parametrize("template", TEMPLATES)
+    def test_memoized_translations(self, template):
+        """Test that translations are computed once per template."""
+        assert template.to_ltlf() is template.to_ltlf()
+        assert template.to_ppltl() is template.to_ppltl()
+        assert template.to_english() is template.to_english()
+
+    def test_translate_many(self):
+        """Test that bulk translations are equal to the single ones and share their subformulas."""
+        expected = [(str(t.to_ltlf()), str(t.to_ppltl())) for t in TEMPLATES]
+        ltlf_formulas, ppltl_formulas = to_ltlf_many(TEMPLATES), to_ppltl_many(TEMPLATES)
+        assert list(zip(map(str, ltlf_formulas), map(str, ppltl_formulas))) == expected
+        assert ltlf_formulas[4].operands[0] is ltlf_formulas[0]
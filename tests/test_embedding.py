@@ -0,0 +1,91 @@
+"""Tests for the embedding-based engine."""
+import asyncio
+import logging
+
+import pytest
+
+from nl2ltl import translate, translate_many
+from nl2ltl.filters.simple_filters import GreedyFilter
+
+from .conftest import UtterancesFixtures
+
+np = pytest.importorskip("numpy")
+
+from nl2ltl.engines.embedding.core import EmbeddingEngine, HashedNgramVectorizer  # noqa: E402
+
+
+class TestEmbedding:
+    """Embedding-based engine test class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup any state specific to the execution of the given class (which
+        usually contains tests).
+        """
+        cls.engine = EmbeddingEngine()
+
+    @pytest.mark.parametrize(
+        "utterance, expected",
+        list(
+            zip(
+                UtterancesFixtures.utterances,
+                [
+                    "(Response slack gmail)",
+                    "(Existence sales)",
+                    "(RespondedExistence eventbrite slack)",
+                    "(Response slack gmail)",
+                ],
+            )
+        ),
+    )
+    def test_translate(self, utterance, expected):
+        """Test that the top formula of the fixture utterances is the expected one."""
+        output = translate(utterance, self.engine, GreedyFilter())
+        assert str(max(output, key=output.get)) == expected
+
+    def test_rank_is_a_distribution(self):
+        """Test that the ranking covers every template with confidences summing to one, in decreasing order."""
+        (ranking,) = self.engine.rank(UtterancesFixtures.utterances[:1])
+        assert set(ranking) == set(self.engine.templates)
+        assert sum(ranking.values()) == pytest.approx(1.0, abs=1e-5)
+        assert list(ranking.values()) == sorted(ranking.values(), reverse=True)
+
+    def test_batch_matches_single(self):
+        """Test that batch classification matches the classification of each utterance."""
+        outputs = translate_many(UtterancesFixtures.utterances, self.engine, GreedyFilter())
+        expected = [translate(utterance, self.engine, GreedyFilter()) for utterance in UtterancesFixtures.utterances]
+        assert [list(map(str, output)) for output in outputs] == [list(map(str, output)) for output in expected]
+        outputs = asyncio.run(self.engine.atranslate_many(UtterancesFixtures.utterances, GreedyFilter()))
+        assert [list(map(str, output)) for output in outputs] == [list(map(str, output)) for output in expected]
+
+    def test_no_symbols(self):
+        """Test that utterances with no known symbol are not grounded."""
+        assert translate("do something nice", self.engine) == {}
+        assert self.engine.rank([]) == []
+
+    def test_multi_word_symbols(self):
+        """Test that multi-word symbols are grounded to legal atoms."""
+        output = translate("send a Microsoft Teams message whenever I get a Gmail", self.engine)
+        assert str(max(output, key=output.get)) == "(Response microsoft_Teams gmail)"
+
+    def test_single_symbol(self, caplog):
+        """Test that only the templates that a single symbol can ground are ranked, with no warning."""
+        with caplog.at_level(logging.WARNING):
+            output = translate("send a Slack", self.engine)
+        assert output and all(len(formula.argument_names) == 1 for formula in output)
+        assert caplog.records == []
+
+    def test_vectorizer(self):
+        """Test that the embeddings are deterministic, L2-normalized and zero for empty texts."""
+        vectorizer = HashedNgramVectorizer(n_features=256)
+        matrix = vectorizer.transform(["send a Slack", "", "send a Slack"])
+        assert matrix.shape == (3, 256)
+        assert np.linalg.norm(matrix, axis=1) == pytest.approx([1.0, 0.0, 1.0], abs=1e-6)
+        assert np.array_equal(matrix[0], matrix[2])
+        assert vectorizer._word_indices.cache_info().maxsize is not None
+
+    @pytest.mark.parametrize("kwargs", [{"temperature": 0}, {"n_features": 0}, {"min_ngram": 3, "max_ngram": 2}])
+    def test_invalid_configuration(self, kwargs):
+        """Test that inconsistent configurations are rejected."""
+        with pytest.raises(ValueError):
+            EmbeddingEngine(**kwargs)
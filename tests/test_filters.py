@@ -0,0 +1,70 @@
+"""Tests for the filters."""
+import itertools
+
+import pytest
+from pylogics.syntax.ltl import Atomic
+
+from nl2ltl.declare.declare import (
+    Absence,
+    ChainResponse,
+    Existence,
+    ExistenceTwo,
+    NotCoExistence,
+    Precedence,
+    RespondedExistence,
+    Response,
+)
+from nl2ltl.filters.simple_filters import GreedyFilter
+from nl2ltl.filters.specification_filters import SpecificationFilter, merge_translations
+from nl2ltl.filters.utils.conflicts import conflicts
+from nl2ltl.filters.utils.relations import RelationIndex
+from nl2ltl.filters.utils.subsumptions import subsumptions
+
+ATOMS = [Atomic("slack"), Atomic("gmail"), Atomic("jira")]
+UNARY = [Existence, ExistenceTwo, Absence]
+BINARY = [RespondedExistence, Response, Precedence, ChainResponse, NotCoExistence]
+CANDIDATES = [cls(atom) for cls in UNARY for atom in ATOMS] + [
+    cls(a1, a2) for cls in BINARY for a1, a2 in itertools.permutations(ATOMS, 2)
+]
+
+
+class TestFilters:
+    """Filters test class."""
+
+    @pytest.mark.parametrize("relation", [conflicts, subsumptions])
+    def test_index_matches_visitors(self, relation):
+        """Test that the relation index finds the same pairs as the visitors."""
+        index = RelationIndex(CANDIDATES)
+        expected = {(f, g) for f in CANDIDATES for g in relation(f) if g in set(CANDIDATES) and g is not f}
+        assert set(index.pairs(relation)) == expected
+
+    def test_greedy_filter(self):
+        """Test that the greedy filter discards conflicts and subsumptions of the best formula."""
+        slack, gmail = ATOMS[:2]
+        output = {Response(slack, gmail): 0.9, Existence(slack): 0.5, Absence(gmail): 0.3, Existence(gmail): 0.1}
+        assert GreedyFilter.enforce(output, {}) == {Response(slack, gmail): 0.9}
+
+    def test_greedy_filter_empty(self):
+        """Test the greedy filter on an empty output."""
+        assert GreedyFilter.enforce({}, {}) == {}
+
+    def test_specification_filter(self):
+        """Test that the specification filter resolves conflicts and subsumptions across utterances."""
+        slack, gmail, jira = ATOMS
+        translations = [
+            {Response(slack, gmail): 0.9, Existence(slack): 0.4},
+            {Absence(slack): 0.2, Existence(jira): 0.7, ExistenceTwo(jira): 0.6},
+            {Precedence(gmail, slack): 0.5, Existence(jira): 0.3},
+        ]
+        output = merge_translations(translations)
+        assert output[Existence(jira)] == 0.7
+        result = SpecificationFilter().enforce(output, {})
+        assert result == {Response(slack, gmail): 0.9, ExistenceTwo(jira): 0.6}
+
+    def test_specification_filter_is_consistent(self):
+        """Test that the selected formulas are pairwise conflict-free and subsumption-reduced."""
+        output = {formula: (i * 7919 % 101) / 100 for i, formula in enumerate(CANDIDATES)}
+        result = SpecificationFilter(min_confidence=0.1).enforce(output, {})
+        index = RelationIndex(result)
+        assert result and not index.conflicting_pairs() and not index.subsumption_pairs()
+        assert all(confidence >= 0.1 for confidence in result.values())
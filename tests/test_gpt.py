@@ -1,9 +1,10 @@
 """Tests for GPT engine."""
+import asyncio
 from typing import Dict
 
 import pytest
 
-from nl2ltl import translate
+from nl2ltl import atranslate_many, translate
 from nl2ltl.engines.gpt.core import GPTEngine
 from nl2ltl.filters.simple_filters import BasicFilter, GreedyFilter
 
@@ -33,3 +34,9 @@ class TestGPT:
         """Test GPT engine for utterances with greedy filter."""
         output = translate(utterance, self.gpt_engine, self.greedy_filter)
         assert isinstance(output, Dict)
+
+    def test_gpt_engine_async_many(self):
+        """Test GPT engine asynchronous batch translation with greedy filter."""
+        outputs = asyncio.run(atranslate_many(UtterancesFixtures.utterances, self.gpt_engine, self.greedy_filter))
+        assert len(outputs) == len(UtterancesFixtures.utterances)
+        assert all(isinstance(output, Dict) for output in outputs)
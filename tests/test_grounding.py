@@ -0,0 +1,36 @@
+"""Tests for the grounding of intents into DECLARE templates."""
+import pytest
+
+from nl2ltl.declare.base import TemplateEnum
+from nl2ltl.engines.utils import GROUNDERS, _get_formulas, _match_template_name
+
+
+class TestGrounding:
+    """Grounding test class."""
+
+    def test_all_templates_registered(self):
+        """Test that every DECLARE template has a registered grounding function."""
+        assert set(GROUNDERS) == {template.value for template in TemplateEnum}
+
+    def test_registry_is_read_only(self):
+        """Test that the registry cannot be mutated directly."""
+        with pytest.raises(TypeError):
+            GROUNDERS["Existence"] = None
+
+    @pytest.mark.parametrize(
+        "intent, template",
+        [
+            ("Response", "Response"),
+            ("chainResponse", "ChainResponse"),
+            ("existencetwo", "ExistenceTwo"),
+            ("reponse", "Response"),
+        ],
+    )
+    def test_match_template_name(self, intent, template):
+        """Test exact, case-insensitive and fuzzy matching of intent names."""
+        assert _match_template_name(intent) == template
+
+    def test_get_formulas(self):
+        """Test the grounding of an intent with its entities."""
+        (formula,) = _get_formulas("response", {"Slack": 1.0, "Gmail": 1.0})
+        assert str(formula) == "(Response slack gmail)"
@@ -0,0 +1,46 @@
+"""Tests for the import side effects of the library."""
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from nl2ltl.engines.gpt import core
+
+HEAVY_MODULES = ("openai", "rasa", "tensorflow")
+
+
+class TestImports:
+    """Imports test class."""
+
+    @pytest.mark.parametrize("module", ["nl2ltl", "nl2ltl.engines.gpt.core", "nl2ltl.engines.rasa.core"])
+    def test_no_heavy_imports(self, module):
+        """Test that importing the library does not import heavy dependencies."""
+        code = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        process = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert process.stdout.strip() == ""
+
+    def test_lazy_client_created_once(self, monkeypatch):
+        """Test that concurrent first uses create a single OpenAI client."""
+        created = []
+        barrier = threading.Barrier(8)
+
+        class _SlowClient:
+            def __init__(self):
+                time.sleep(0.01)
+                created.append(self)
+
+        monkeypatch.setitem(sys.modules, "openai", SimpleNamespace(OpenAI=_SlowClient))
+        monkeypatch.setattr(core, "_client", None)
+
+        def get_client(_):
+            barrier.wait()
+            return core._get_client()
+
+        with ThreadPoolExecutor(8) as executor:
+            clients = list(executor.map(get_client, range(8)))
+        assert len(created) == 1
+        assert all(client is created[0] for client in clients)
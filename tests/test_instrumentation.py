@@ -0,0 +1,78 @@
+"""Tests for the instrumentation hooks."""
+import math
+from types import SimpleNamespace
+
+import pytest
+from pylogics.syntax.ltl import Atomic
+
+from nl2ltl import translate
+from nl2ltl.cache.memory import LRUCache
+from nl2ltl.engines.gpt.output import GPTOutput, parse_gpt_result
+from nl2ltl.filters.simple_filters import BasicFilter
+from nl2ltl.instrumentation import MetricsAggregator, enabled, instrument, record_usage, stage
+
+from .test_core import _EchoEngine
+
+
+class TestInstrumentation:
+    """Instrumentation test class."""
+
+    def test_disabled_by_default(self):
+        """Test that no hook is registered outside of an instrument block."""
+        assert not enabled()
+        with instrument(MetricsAggregator()):
+            assert enabled()
+        assert not enabled()
+
+    def test_pipeline_stages(self):
+        """Test that parsing a GPT output reports the matching, grounding and filtering stages."""
+        metrics = MetricsAggregator()
+        with instrument(metrics):
+            parse_gpt_result(GPTOutput("Response", ("Slack", "Gmail")), BasicFilter())
+        assert set(metrics.stages) == {"match_template", "grounding", "filtering"}
+        assert all(stats["count"] == 1 for stats in metrics.summary().values())
+
+    def test_translate_errors(self):
+        """Test that errors are counted on the failing stage."""
+        metrics = MetricsAggregator()
+        with instrument(metrics), pytest.raises(IndexError):
+            translate("", _EchoEngine())
+        assert metrics.summary()["translate"]["errors"] == 1
+
+    def test_usage_and_cache(self):
+        """Test that token usage and cache lookups are aggregated."""
+        metrics = MetricsAggregator()
+        cache = LRUCache()
+        cache.set("key", GPTOutput("Response", ("Slack", "Gmail")))
+        with instrument(metrics):
+            record_usage(SimpleNamespace(prompt_tokens=100, completion_tokens=10))
+            record_usage(None)
+            cache.get("key")
+            cache.get("missing")
+        assert (metrics.prompt_tokens, metrics.completion_tokens) == (100, 10)
+        assert (metrics.cache_hits, metrics.cache_misses) == (1, 1)
+
+    def test_percentiles(self):
+        """Test the nearest-rank percentiles."""
+        metrics = MetricsAggregator()
+        for seconds in range(1, 101):
+            metrics.on_stage("stage", seconds)
+        summary = metrics.summary()["stage"]
+        assert (summary["p50"], summary["p95"], summary["p99"]) == (50, 95, 99)
+        assert math.isnan(metrics.percentile("missing", 50))
+
+    def test_max_samples(self):
+        """Test that only the latest durations are kept, while counts are exact."""
+        metrics = MetricsAggregator(max_samples=10)
+        for seconds in range(100):
+            metrics.on_stage("stage", seconds)
+        assert metrics.summary()["stage"]["count"] == 100
+        assert metrics.percentile("stage", 0) == 90
+
+    def test_stage_is_timed(self):
+        """Test that a stage reports a non-negative duration."""
+        metrics = MetricsAggregator()
+        with instrument(metrics):
+            with stage("custom"):
+                Atomic("a")
+        assert metrics.percentile("custom", 50) >= 0
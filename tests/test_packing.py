@@ -0,0 +1,72 @@
+"""Tests for the packing of many utterances into a single GPT request."""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from nl2ltl.engines.gpt import core
+from nl2ltl.engines.gpt.core import (
+    PROMPT_PATH,
+    OperationModes,
+    _build_packed_request,
+    _process_packed,
+    _RequestSettings,
+)
+from nl2ltl.engines.gpt.output import GPTOutput, parse_packed_gpt_output
+
+CHAT = OperationModes.CHAT.value
+
+
+def _prediction(content: str) -> SimpleNamespace:
+    """Build a chat completion with the given content."""
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+class TestPacking:
+    """Packing test class."""
+
+    def test_packed_request(self):
+        """Test that the utterances are numbered after the prompt, with room for every answer."""
+        request = _build_packed_request(["send a Slack", "get a Gmail"], "gpt-4", "PROMPT\n", CHAT, 0.5)
+        content = request["messages"][0]["content"]
+        assert content.startswith("PROMPT\n")
+        assert content.endswith("NL 1: send a Slack\nNL 2: get a Gmail\n")
+        assert "stop" not in request and request["max_tokens"] > 0
+
+    @pytest.mark.parametrize(
+        "content, expected",
+        [
+            (
+                "PATTERN 1: response\nSYMBOLS 1: Slack, Gmail\n\nPATTERN 2: existence\nSYMBOLS 2: Sales",
+                [GPTOutput("response", ("Slack", "Gmail")), GPTOutput("existence", ("Sales",))],
+            ),
+            (
+                "PATTERN 2: existence\nSYMBOLS 2: Sales\n\nPATTERN 1: response",
+                [None, GPTOutput("existence", ("Sales",))],
+            ),
+            ("PATTERN 1: %%%\nSYMBOLS 1: Slack\n\nI cannot answer.", [None, None]),
+        ],
+    )
+    def test_parse_packed_output(self, content, expected):
+        """Test that blocks are matched by number, and that missing or invalid blocks are None."""
+        assert parse_packed_gpt_output(_prediction(content), CHAT, 2) == expected
+
+    def test_invalid_items_retried_alone(self, monkeypatch):
+        """Test that a single request is sent for each item missing from the packed answer."""
+        requests = []
+
+        def send_request(request, operation_mode, scheduler, priority):
+            requests.append(request)
+            if len(requests) == 1:
+                return _prediction("PATTERN 1: existence\nSYMBOLS 1: Sales\n\nPATTERN 2: response")
+            return _prediction("PATTERN: response\nSYMBOLS: Slack, Gmail\n")
+
+        monkeypatch.setattr(core, "_send_request", send_request)
+        prompt = json.loads(PROMPT_PATH.read_text())["prompt"]
+        settings = _RequestSettings("gpt-4", prompt, CHAT, 0.5)
+        results = _process_packed(["Invite Sales employees", "send a Gmail for every Slack"], settings, None)
+        assert len(requests) == 2
+        assert requests[0]["messages"][0]["content"].startswith(prompt)
+        assert requests[1]["messages"][0]["content"].endswith("NL: send a Gmail for every Slack\n")
+        assert [list(map(str, result)) for result in results] == [["(Existence sales)"], ["(Response slack gmail)"]]
@@ -0,0 +1,66 @@
+"""Tests for the GPT prompt handling."""
+import json
+
+import pytest
+
+from nl2ltl.engines.gpt.core import PROMPT_PATH, OperationModes, _build_request, _cache_key
+from nl2ltl.engines.gpt.prompt import FewShotSelector, PromptModes, parse_prompt
+
+from .conftest import UtterancesFixtures
+
+
+class TestPrompt:
+    """Prompt test class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup any state specific to the execution of the given class (which
+        usually contains tests).
+        """
+        cls.prompt = json.load(open(PROMPT_PATH))["prompt"]
+        cls.header, cls.examples = parse_prompt(cls.prompt)
+
+    def test_parse_prompt(self):
+        """Test that the prompt is split into its header and all its examples."""
+        assert self.header.startswith("Translate natural language sentences into patterns.")
+        assert "ALLOWED_SYMBOLS" in self.header and "NL:" not in self.header
+        assert len(self.examples) == self.prompt.count("\nNL: ")
+        assert self.examples[-1].render() in self.prompt
+
+    @pytest.mark.parametrize("example_index", [0, 15, 30])
+    def test_select_most_similar(self, example_index):
+        """Test that an example of the prompt is always selected for its own sentence."""
+        selector = FewShotSelector(self.header, self.examples, k=6)
+        example = self.examples[example_index]
+        assert example in selector.select(example.nl)
+
+    @pytest.mark.parametrize("utterance", UtterancesFixtures.utterances)
+    def test_select_covers_patterns(self, utterance):
+        """Test that k examples are selected in prompt order, covering every pattern."""
+        selector = FewShotSelector(self.header, self.examples, k=8)
+        selected = selector.select(utterance)
+        assert len(selected) == 8
+        assert {example.pattern for example in selected} == {example.pattern for example in self.examples}
+        assert selected == sorted(selected, key=self.examples.index)
+
+    def test_inline_request_unchanged(self):
+        """Test that the default request is the whole prompt followed by the utterance, in one user message."""
+        request = _build_request("send a Slack", "gpt-4", self.prompt, OperationModes.CHAT.value, 0.5)
+        assert request["messages"] == [{"role": "user", "content": self.prompt + "NL: send a Slack\n"}]
+
+    def test_prefix_request(self):
+        """Test that the prefix mode sends the static prompt as a system message."""
+        selector = FewShotSelector.from_prompt(self.prompt, k=4)
+        request = _build_request(
+            "send a Slack", "gpt-4", self.prompt, OperationModes.CHAT.value, 0.5, PromptModes.PREFIX.value, selector
+        )
+        system, user = request["messages"]
+        assert (system["role"], system["content"]) == ("system", self.header)
+        assert user["content"].endswith("NL: send a Slack\n") and user["content"].count("NL: ") == 5
+
+    def test_cache_key(self):
+        """Test that the prompt mode and the selection are part of the cache key."""
+        args = ("send a Slack", "gpt-4", self.prompt, OperationModes.CHAT.value, 0.5)
+        selector = FewShotSelector.from_prompt(self.prompt, k=4)
+        keys = {_cache_key(*args), _cache_key(*args, PromptModes.PREFIX.value), _cache_key(*args, "inline", selector)}
+        assert len(keys) == 3
@@ -1,10 +1,13 @@
 """Tests for Rasa engine."""
+import asyncio
+import threading
 from typing import Dict
 
 import pytest
 
 from nl2ltl import translate
 from nl2ltl.engines.rasa.core import RasaEngine
+from nl2ltl.engines.rasa.helpers import _EventLoopThread
 from nl2ltl.filters.simple_filters import BasicFilter, GreedyFilter
 
 from .conftest import UtterancesFixtures
@@ -33,3 +36,63 @@ class TestRasa:
         """Test Rasa engine for utterances with greedy filter."""
         output = translate(utterance, self.rasa_engine, self.greedy_filter)
         assert isinstance(output, Dict)
+
+
+async def _running_loop() -> asyncio.AbstractEventLoop:
+    """Get the event loop running the coroutine."""
+    await asyncio.sleep(0)
+    return asyncio.get_running_loop()
+
+
+class TestEventLoopThread:
+    """Background event loop test class."""
+
+    def setup_method(self):
+        """Start every test with a fresh event loop thread."""
+        self.loop_thread = _EventLoopThread()
+
+    def teardown_method(self):
+        """Stop the event loop thread."""
+        self.loop_thread.close()
+
+    def test_reuse(self):
+        """Test that the coroutines run on one loop in a background thread, across calls."""
+        loop = self.loop_thread.run(_running_loop())
+        assert self.loop_thread.run(_running_loop()) is loop
+        assert self.loop_thread._thread is not threading.current_thread()
+        assert self.loop_thread._thread.is_alive()
+
+    def test_inside_running_loop(self):
+        """Test that coroutines can be run from a thread that already runs an event loop."""
+
+        async def main():
+            return asyncio.get_running_loop(), self.loop_thread.run(_running_loop())
+
+        caller_loop, loop = asyncio.run(main())
+        assert loop is not caller_loop
+
+    def test_async(self):
+        """Test that awaited coroutines run on the background loop, not on the caller's one."""
+
+        async def main():
+            return asyncio.get_running_loop(), await self.loop_thread.arun(_running_loop())
+
+        caller_loop, loop = asyncio.run(main())
+        assert loop is not caller_loop
+        assert self.loop_thread.run(_running_loop()) is loop
+
+    def test_close(self):
+        """Test that closing joins the thread, and is idempotent."""
+        self.loop_thread.run(_running_loop())
+        thread = self.loop_thread._thread
+        self.loop_thread.close()
+        assert not thread.is_alive()
+        self.loop_thread.close()
+
+    def test_restart(self):
+        """Test that a closed event loop thread restarts on the next call."""
+        loop = self.loop_thread.run(_running_loop())
+        self.loop_thread.close()
+        assert loop.is_closed()
+        new_loop = self.loop_thread.run(_running_loop())
+        assert new_loop is not loop and new_loop.is_running()
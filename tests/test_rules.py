@@ -0,0 +1,169 @@
+"""Tests for the rule-based engine."""
+import asyncio
+from typing import Dict, List, Sequence
+
+import pytest
+from pylogics.syntax.base import Formula
+
+from nl2ltl import translate, translate_many
+from nl2ltl.engines.gpt.core import PROMPT_PATH
+from nl2ltl.engines.rasa.core import TRAINING_PATH
+from nl2ltl.engines.rasa.helpers import _parse_nlu_training
+from nl2ltl.engines.rules.core import EXACT_ROUTE, FALLBACK_ROUTE, UNRESOLVED_ROUTE, RuleEngine
+from nl2ltl.engines.symbols import atom_name
+from nl2ltl.engines.utils import _load_examples, _match_template_name
+from nl2ltl.filters.base import Filter
+from nl2ltl.filters.simple_filters import GreedyFilter
+
+from .conftest import UtterancesFixtures
+from .test_core import _EchoEngine
+
+
+class _RecordingEngine(_EchoEngine):
+    """An echo engine recording its batches."""
+
+    def __init__(self):
+        self.batches: List[Sequence[str]] = []
+
+    def translate_many(self, utterances: Sequence[str], filtering: Filter = None) -> List[Dict[Formula, float]]:
+        """From many NL utterances to LTL."""
+        self.batches.append(list(utterances))
+        return super().translate_many(utterances, filtering)
+
+
+class TestRules:
+    """Rule-based engine test class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup any state specific to the execution of the given class (which
+        usually contains tests).
+        """
+        cls.engine = RuleEngine()
+
+    @pytest.mark.parametrize(
+        "utterance, expected",
+        list(
+            zip(
+                UtterancesFixtures.utterances,
+                [
+                    "(Response slack gmail)",
+                    "(Existence sales)",
+                    "(RespondedExistence eventbrite slack)",
+                    "(Response gmail slack)",
+                ],
+            )
+        ),
+    )
+    def test_fast_path(self, utterance, expected):
+        """Test that templated utterances are resolved without a fallback."""
+        output = translate(utterance, self.engine, GreedyFilter())
+        assert list(map(str, output)) == [expected]
+        assert all(confidence >= self.engine.min_confidence for confidence in output.values())
+
+    @pytest.mark.parametrize(
+        "utterance, expected",
+        [
+            ("whenever I get a Slack, send a Gmail.", "(Response slack gmail)"),
+            ("send a Gmail every time I get a Slack", "(Response slack gmail)"),
+            ("for every Slack, send a Gmail", "(Response slack gmail)"),
+            ("send a Gmail right after a Slack", "(ChainResponse slack gmail)"),
+            ("if I get a Slack, then send a Gmail", "(RespondedExistence slack gmail)"),
+            ("send me a Slack whenever I get a Gmail", "(Response gmail slack)"),
+            ("send a Slack whenever I get a Gmail message", "(Response gmail slack)"),
+            ("send a Microsoft Teams message whenever I get a Gmail", "(Response gmail microsoft_Teams)"),
+        ],
+    )
+    def test_argument_order(self, utterance, expected):
+        """Test that the activation is the symbol of the cue clause, whatever the order of mention and the route."""
+        assert list(map(str, translate(utterance, self.engine))) == [expected]
+
+    def test_seed_examples(self):
+        """Test that every seed example translates, through the exact route, to its own template and symbols."""
+        examples, _ = _load_examples(PROMPT_PATH, TRAINING_PATH)
+        for text, pattern, symbols in examples:
+            engine = RuleEngine(fallback=_EchoEngine())
+            (formula,) = engine.translate(text)
+            if engine.route_counts == {EXACT_ROUTE: 1}:
+                assert formula.SYMBOL == _match_template_name(pattern)
+                if all(symbol in text for symbol in symbols):
+                    assert set(formula.argument_names) == set(map(atom_name, symbols))
+            else:
+                assert len(set(symbols)) < len(symbols)
+
+    def test_exact_route_symbols(self):
+        """Test that the exact route grounds the symbols of the seed example, not every mention."""
+        output = self.engine.translate("Invite Sales employees to an Eventbrite event")
+        assert list(map(str, output)) == ["(Existence eventbrite)"]
+
+    @pytest.mark.parametrize(
+        "utterance",
+        [
+            "never send a Slack",
+            "do not ever use Gmail",
+            "don't use Gmail",
+            "send no Slack",
+            "invite Sales without a Gmail",
+            "whenever I get a Slack, never send a Gmail",
+        ],
+    )
+    def test_negation(self, utterance):
+        """Test that negated utterances are routed to the fallback."""
+        engine = RuleEngine()
+        assert engine.translate(utterance) == {}
+        assert engine.route_counts == {UNRESOLVED_ROUTE: 1}
+
+    def test_ambiguous_clauses(self):
+        """Test that binary rules without an activation clause are routed to the fallback."""
+        engine = RuleEngine()
+        assert engine.translate("send a Gmail and a Slack always") == {}
+        assert engine.route_counts == {UNRESOLVED_ROUTE: 1}
+
+    def test_exact_route(self):
+        """Test that the seed examples are matched verbatim, up to their symbols."""
+        engine = RuleEngine()
+        output = engine.translate("Create a new Trello card for a new Asana campaign")
+        assert {str(formula): confidence for formula, confidence in output.items()} == {
+            "(RespondedExistence trello asana)": 1.0
+        }
+        assert engine.route_counts == {EXACT_ROUTE: 1}
+
+    def test_unresolved(self):
+        """Test that unresolved utterances give no formula without a fallback."""
+        engine = RuleEngine()
+        assert engine.translate("send a message") == {}
+        assert engine.route_counts == {UNRESOLVED_ROUTE: 1}
+        assert engine.hit_rate == 0.0
+
+    def test_fallback_batch(self):
+        """Test that the unresolved utterances are sent to the fallback in a single batch, in input order."""
+        fallback = _RecordingEngine()
+        engine = RuleEngine(fallback=fallback)
+        utterances = ["Bake a cake", *UtterancesFixtures.utterances, "Eat the cake"]
+        outputs = translate_many(utterances, engine)
+        assert fallback.batches == [["Bake a cake", "Eat the cake"]]
+        assert list(map(str, outputs[0])) == ["(Existence bake)"]
+        assert list(map(str, outputs[-1])) == ["(Existence eat)"]
+        assert engine.route_counts[FALLBACK_ROUTE] == 2
+        assert engine.hit_rate == pytest.approx(4 / 6)
+
+    def test_async(self):
+        """Test the asynchronous batch translation."""
+        engine = RuleEngine(fallback=_EchoEngine())
+        utterances = [*UtterancesFixtures.utterances, "Bake a cake"]
+        outputs = asyncio.run(engine.atranslate_many(utterances))
+        assert [list(map(str, output)) for output in outputs] == [
+            list(map(str, output)) for output in translate_many(utterances, engine)
+        ]
+
+    def test_min_confidence(self):
+        """Test that rules below the minimum confidence are routed to the fallback."""
+        engine = RuleEngine(fallback=_EchoEngine(), min_confidence=1.0)
+        engine.translate("whenever I get a Slack, send a Gmail.")
+        assert engine.route_counts == {FALLBACK_ROUTE: 1}
+
+    def test_parse_nlu_training(self):
+        """Test that the NLU examples are parsed with their entities, in order."""
+        examples, lookups = _parse_nlu_training(TRAINING_PATH)
+        assert ("send a Gmail whenever I get a Slack message", "response", ("Gmail", "Slack")) in examples
+        assert "Microsoft Teams" in lookups["connector"]
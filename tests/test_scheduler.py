@@ -0,0 +1,163 @@
+"""Tests for the GPT request scheduler."""
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from nl2ltl.engines.gpt.core import _estimate_tokens
+from nl2ltl.engines.gpt.scheduler import Priority, RequestScheduler, TokenBucket, _retry_after
+
+
+def _rate_limit_error(headers=None) -> openai.RateLimitError:
+    """Build a 429 error as raised by the OpenAI client."""
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    return openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+
+def _server_error() -> openai.InternalServerError:
+    """Build a 500 error as raised by the OpenAI client."""
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(500, request=request)
+    return openai.InternalServerError("Server error", response=response, body=None)
+
+
+def _connection_error() -> openai.APIConnectionError:
+    """Build a connection error as raised by the OpenAI client."""
+    return openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+
+
+class _Flaky:
+    """A request failing with the given errors before succeeding."""
+
+    def __init__(self, *errors: Exception):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return SimpleNamespace(usage=SimpleNamespace(total_tokens=10))
+
+
+class TestScheduler:
+    """Scheduler test class."""
+
+    def test_token_bucket(self):
+        """Test that the bucket delays amounts above its level and caps amounts above its capacity."""
+        bucket = TokenBucket(rate_per_minute=600)
+        assert bucket.delay(600) == 0
+        bucket.consume(600)
+        assert bucket.delay(10) == pytest.approx(1.0, abs=0.05)
+        assert bucket.delay(10**6) == pytest.approx(60.0, abs=0.05)
+        bucket.refund(600)
+        assert bucket.level == pytest.approx(600)
+
+    @pytest.mark.parametrize(
+        "headers, expected",
+        [({}, None), ({"retry-after": "2"}, 2.0), ({"retry-after-ms": "250"}, 0.25), ({"retry-after": "soon"}, None)],
+    )
+    def test_retry_after(self, headers, expected):
+        """Test the parsing of the Retry-After headers."""
+        assert _retry_after(_rate_limit_error(headers)) == expected
+
+    def test_retries_honor_retry_after(self):
+        """Test that rate-limit errors are retried after the suggested delay."""
+        scheduler = RequestScheduler(base_delay=0.001)
+        request = _Flaky(_rate_limit_error({"retry-after-ms": "50"}))
+        start = time.monotonic()
+        scheduler.call(request, tokens=10)
+        assert request.calls == 2
+        assert time.monotonic() - start >= 0.05
+
+    def test_max_retries(self):
+        """Test that the last error is raised once the retries are exhausted."""
+        scheduler = RequestScheduler(max_retries=2, base_delay=0.001)
+        request = _Flaky(*(_rate_limit_error() for _ in range(3)))
+        with pytest.raises(openai.RateLimitError):
+            scheduler.call(request, tokens=10)
+        assert request.calls == 3
+
+    @pytest.mark.parametrize("make_error", [_rate_limit_error, _server_error, _connection_error])
+    def test_failed_attempts_refunded(self, make_error):
+        """Test that the failed attempts give back their tokens, so that only the successful one is charged."""
+        scheduler = RequestScheduler(tokens_per_minute=1000, base_delay=0.001)
+        request = _Flaky(make_error(), make_error())
+        scheduler.call(request, tokens=300)
+        assert request.calls == 3
+        assert scheduler._token_bucket.level == pytest.approx(990, abs=1)
+
+    def test_exhausted_retries_refunded(self):
+        """Test that a request failing on every attempt is not charged."""
+        scheduler = RequestScheduler(tokens_per_minute=1000, max_retries=1, base_delay=0.001)
+        with pytest.raises(openai.InternalServerError):
+            scheduler.call(_Flaky(_server_error(), _server_error()), tokens=300)
+        assert scheduler._token_bucket.level == pytest.approx(1000, abs=1)
+
+    def test_non_retryable(self):
+        """Test that other errors are raised immediately."""
+        request = _Flaky(ValueError("bad request"))
+        with pytest.raises(ValueError):
+            RequestScheduler().call(request, tokens=10)
+        assert request.calls == 1
+
+    def test_priority(self):
+        """Test that interactive requests overtake the queued batch ones."""
+        scheduler = RequestScheduler(requests_per_minute=600)
+        scheduler._request_bucket.consume(600)
+        order = []
+
+        def send(name, priority):
+            scheduler.call(lambda: order.append(name), tokens=1, priority=priority)
+
+        threads = [threading.Thread(target=send, args=(f"batch{i}", Priority.BATCH)) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        while scheduler.queued < 3:
+            time.sleep(0.001)
+        threads.append(threading.Thread(target=send, args=("interactive", Priority.INTERACTIVE)))
+        threads[-1].start()
+        for thread in threads:
+            thread.join()
+        assert order.index("interactive") <= 1
+
+    def test_async(self):
+        """Test the asynchronous calls, with the token usage settled on the bucket."""
+        scheduler = RequestScheduler(tokens_per_minute=1000, base_delay=0.001)
+        request = _Flaky(_rate_limit_error())
+
+        async def send():
+            return await scheduler.acall(lambda: asyncio.sleep(0, result=request()), tokens=100)
+
+        assert asyncio.run(send()).usage.total_tokens == 10
+        assert scheduler._token_bucket.level > 980
+
+    @pytest.mark.parametrize("asynchronous", [False, True])
+    def test_queued_requests_wait_for_notification(self, monkeypatch, asynchronous):
+        """Test that the queued requests are only retried when the head of the queue changes, with no polling."""
+        scheduler = RequestScheduler()
+        attempts = []
+        admit = scheduler._admit
+        monkeypatch.setattr(scheduler, "_admit", lambda ticket: attempts.append(ticket) or admit(ticket))
+        head = scheduler._enqueue(tokens=1, priority=Priority.INTERACTIVE)
+        if asynchronous:
+            thread = threading.Thread(target=asyncio.run, args=(scheduler.acall(lambda: asyncio.sleep(0), tokens=1),))
+        else:
+            thread = threading.Thread(target=scheduler.call, args=(lambda: None,), kwargs={"tokens": 1})
+        thread.start()
+        time.sleep(0.2)
+        assert len(attempts) == 1
+        scheduler._dequeue(head)
+        thread.join(timeout=1)
+        assert not thread.is_alive()
+        assert len(attempts) == 2
+
+    def test_estimate_tokens(self):
+        """Test that the estimate accounts for the prompt and the completion."""
+        request = {"messages": [{"role": "user", "content": "x" * 400}], "max_tokens": 200}
+        assert _estimate_tokens(request) == 300
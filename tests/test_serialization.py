@@ -0,0 +1,90 @@
+"""Tests for the serialization of templates and results."""
+import json
+
+import pytest
+from pylogics.syntax.ltl import Atomic
+
+from nl2ltl.declare.declare import Absence, ChainResponse, Existence, NotCoExistence, Response
+from nl2ltl.declare.serialization import (
+    TEMPLATES,
+    dumps,
+    loads,
+    packb,
+    parse_template,
+    result_from_json,
+    result_to_json,
+    results_from_table,
+    results_to_table,
+    template_from_json,
+    template_to_json,
+    unpackb,
+)
+from nl2ltl.engines.utils import serialize_result
+
+a, b, c = Atomic("a"), Atomic("b"), Atomic("c")
+RESULTS = [
+    {Response(a, b): 0.9, Existence(a): 0.5},
+    {},
+    {ChainResponse(b, c): 0.25, Absence(Atomic('"x y"')): 0.125, NotCoExistence(c, a): 1.0},
+]
+
+
+def _items(results):
+    """Get the (formula, confidence) pairs of results, in order."""
+    return [list(result.items()) for result in results]
+
+
+class TestSerialization:
+    """Serialization test class."""
+
+    @pytest.mark.parametrize("template", [formula for result in RESULTS for formula in result])
+    def test_template_round_trip(self, template):
+        """Test that templates load back from JSON and parse back from their string representation."""
+        assert template_from_json(json.loads(json.dumps(template_to_json(template)))) is template
+        assert parse_template(str(template)) is template
+
+    def test_every_template_is_registered(self):
+        """Test that every template kind can be deserialized."""
+        assert {template_cls.__name__ for template_cls in TEMPLATES.values()} == set(TEMPLATES)
+        assert len(TEMPLATES) == 8
+
+    @pytest.mark.parametrize(
+        "text",
+        ["Response a b", "(Unknown a)", "(Response a)", "(Existence a b)", "()", "(Response a B)"],
+    )
+    def test_parse_errors(self, text):
+        """Test that malformed strings are rejected."""
+        with pytest.raises(ValueError):
+            parse_template(text)
+
+    def test_result_round_trip(self):
+        """Test that results, and the records of serialize_result, load back in order."""
+        for result in RESULTS:
+            assert list(result_from_json(result_to_json(result)).items()) == list(result.items())
+            assert result_from_json(serialize_result(result)) == result
+
+    def test_table(self):
+        """Test the columnar table, with its symbol dictionary."""
+        table = results_to_table(RESULTS)
+        assert table["symbols"] == ["a", "b", "c", '"x y"']
+        assert table["offsets"] == [0, 2, 2, 5]
+        assert table["argument2"][1] == -1
+        assert _items(results_from_table(table)) == _items(RESULTS)
+        assert _items(loads(dumps(RESULTS))) == _items(RESULTS)
+
+    def test_msgpack(self):
+        """Test the msgpack table."""
+        pytest.importorskip("msgpack")
+        data = packb(RESULTS)
+        assert isinstance(data, bytes)
+        assert len(data) < len(dumps(RESULTS))
+        assert _items(unpackb(data)) == _items(RESULTS)
+
+    def test_table_errors(self):
+        """Test that unsupported tables and formulas are rejected."""
+        with pytest.raises(ValueError):
+            results_from_table({**results_to_table(RESULTS), "version": 0})
+        with pytest.raises(ValueError):
+            results_from_table({"version": 1, "templates": [], "symbols": []})
+        with pytest.raises(ValueError):
+            results_to_table([{a: 1.0}])
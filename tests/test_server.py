@@ -0,0 +1,208 @@
+"""Tests for the translation server."""
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, List, Sequence
+
+import pytest
+from pylogics.syntax.base import Formula
+from pylogics.syntax.ltl import Atomic
+
+from nl2ltl.cli import build_parser, make_engine
+from nl2ltl.declare.declare import Existence, Response
+from nl2ltl.engines.utils import serialize_result
+from nl2ltl.exceptions import OverloadedException
+from nl2ltl.filters.base import Filter
+from nl2ltl.server import MicroBatcher, TranslationServer
+
+from .conftest import UtterancesFixtures
+from .test_core import _EchoEngine
+
+
+class _RecordingEngine(_EchoEngine):
+    """An echo engine recording its batches, slowed down to let requests pile up."""
+
+    def __init__(self, delay: float = 0.0):
+        """Initialize the engine."""
+        self.delay = delay
+        self.batches: List[List[str]] = []
+        self._lock = threading.Lock()
+
+    def translate_many(self, utterances: Sequence[str], filtering: Filter = None) -> List[Dict[Formula, float]]:
+        """From many NL utterances to LTL, recording the batch."""
+        with self._lock:
+            self.batches.append(list(utterances))
+        time.sleep(self.delay)
+        if "fail" in utterances:
+            raise RuntimeError("boom")
+        return super().translate_many(utterances, filtering)
+
+
+def _post(url: str, payload) -> tuple:
+    """Post a JSON payload, returning the status and the JSON response."""
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode(), headers={"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestServer:
+    """Translation server test class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup any state specific to the execution of the given class (which
+        usually contains tests).
+        """
+        cls.engine = _RecordingEngine(delay=0.01)
+        cls.server = TranslationServer(("127.0.0.1", 0), cls.engine, max_batch_size=8, max_delay=0.02, workers=2)
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def teardown_class(cls):
+        """Teardown any state that was previously setup with a call to setup_class."""
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_translate(self):
+        """Test the single translation endpoint."""
+        status, response = _post(f"{self.url}/translate", {"utterance": "Slack me", "filter": "greedy"})
+        assert status == 200
+        assert response["utterance"] == "Slack me"
+        assert response["formulas"] == serialize_result({Existence(Atomic("slack")): 1.0})
+
+    def test_translate_many(self):
+        """Test that the batch endpoint preserves the input order."""
+        status, response = _post(f"{self.url}/translate_many", {"utterances": UtterancesFixtures.utterances})
+        assert status == 200
+        assert [result["utterance"] for result in response["results"]] == UtterancesFixtures.utterances
+        assert [result["formulas"][0]["formula"] for result in response["results"]] == [
+            str(next(iter(self.engine.translate(utterance)))) for utterance in UtterancesFixtures.utterances
+        ]
+
+    def test_concurrent_requests_are_batched(self):
+        """Test that concurrent single requests share engine batches."""
+        before = self.server.batcher.stats
+        utterances = [f"word{i} and more" for i in range(32)]
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            responses = list(pool.map(lambda u: _post(f"{self.url}/translate", {"utterance": u}), utterances))
+        assert [response["formulas"][0]["formula"] for _, response in responses] == [
+            f"(Existence word{i})" for i in range(32)
+        ]
+        stats = self.server.batcher.stats
+        assert stats.utterances - before.utterances == 32
+        assert stats.batches - before.batches < 32
+
+    @pytest.mark.parametrize(
+        "path, payload, status",
+        [
+            ("/translate", {"utterances": ["a"]}, 400),
+            ("/translate", {"utterance": "a", "filter": "unknown"}, 400),
+            ("/translate_many", {"utterances": "a"}, 400),
+            ("/translate_many", [], 400),
+            ("/translate", {"utterance": "fail"}, 500),
+            ("/unknown", {}, 404),
+        ],
+    )
+    def test_errors(self, path, payload, status):
+        """Test that malformed requests and engine failures get an error status."""
+        actual, response = _post(f"{self.url}{path}", payload)
+        assert actual == status
+        assert "error" in response
+
+    def test_health(self):
+        """Test the health endpoint."""
+        with urllib.request.urlopen(f"{self.url}/health") as response:
+            health = json.loads(response.read())
+        assert health["status"] == "ok"
+        assert health["engine"] == "_RecordingEngine"
+        assert set(health["batcher"]) >= {"utterances", "batches", "errors", "rejected", "mean_batch_size", "pending"}
+
+
+class TestMicroBatcher:
+    """Micro-batcher test class."""
+
+    def test_batches_are_bounded(self):
+        """Test the batch size bound, and that batches group utterances by filter."""
+        engine = _RecordingEngine(delay=0.01)
+        batcher = MicroBatcher(engine, max_batch_size=4, max_delay=0.05, workers=1)
+        filters: List[Filter] = [None, _EchoFilter()]
+        futures = [batcher.submit(f"u{i}", filters[i % 2]) for i in range(10)]
+        results = [future.result(5) for future in futures]
+        batcher.close()
+        assert [str(next(iter(result))) for result in results] == [f"(Existence u{i})" for i in range(10)]
+        assert all(len(batch) <= 4 for batch in engine.batches)
+        assert all(len({int(u[1:]) % 2 for u in batch}) == 1 for batch in engine.batches)
+
+    def test_overload(self):
+        """Test that submissions beyond the pending bound are rejected, all or none."""
+        engine = _RecordingEngine(delay=0.2)
+        batcher = MicroBatcher(engine, max_batch_size=1, max_delay=0, workers=1, max_pending=2)
+        first = batcher.submit("a")
+        time.sleep(0.05)
+        batcher.submit_many(["b", "c"])
+        with pytest.raises(OverloadedException):
+            batcher.submit("d")
+        with pytest.raises(ValueError):
+            batcher.submit_many(["e", "f", "g"])
+        assert batcher.stats.rejected == 1
+        batcher.close()
+        assert first.done()
+        assert engine.batches == [["a"], ["b"], ["c"]]
+
+    def test_timeout_cancels(self):
+        """Test that the utterances of a request that timed out are not translated."""
+        engine = _RecordingEngine(delay=0.2)
+        batcher = MicroBatcher(engine, max_batch_size=1, max_delay=0, workers=1)
+        batcher.submit("a")
+        time.sleep(0.05)
+        with pytest.raises(FutureTimeoutError):
+            batcher.translate_many(["b", "c"], timeout=0.01)
+        batcher.close()
+        assert engine.batches == [["a"]]
+
+    @pytest.mark.parametrize("kwargs", [{"max_batch_size": 0}, {"max_delay": -1}, {"workers": 0}, {"max_pending": 0}])
+    def test_invalid_configuration(self, kwargs):
+        """Test that inconsistent configurations are rejected."""
+        with pytest.raises(ValueError):
+            MicroBatcher(_EchoEngine(), **kwargs)
+
+
+class _EchoFilter(Filter):
+    """A filter keeping everything."""
+
+    def enforce(self, output: Dict[Formula, float], entities: Dict[str, float], **kwargs) -> Dict[Formula, float]:
+        """Keep the output as is."""
+        return output
+
+
+def test_serialize_result_is_stable():
+    """Test that results serialize equally whatever the order of the dict."""
+    a, b = Atomic("a"), Atomic("b")
+    result = {Existence(a): 0.5, Response(a, b): 0.9, Existence(b): 0.5}
+    records = serialize_result(result)
+    assert records == serialize_result(dict(reversed(list(result.items()))))
+    assert [record["formula"] for record in records] == ["(Response a b)", "(Existence a)", "(Existence b)"]
+    assert records[0]["ltlf"] == str(Response(a, b).to_ltlf())
+    assert records[0]["ppltl"] == str(Response(a, b).to_ppltl())
+    assert json.loads(json.dumps(records)) == records
+
+
+def test_make_engine():
+    """Test that a comma-separated list of engines builds a cascade."""
+    parser = build_parser()
+    engine = make_engine(parser.parse_args(["serve", "--engine", "rules"]))
+    assert type(engine).__name__ == "RuleEngine"
+    with pytest.raises(ValueError):
+        make_engine(parser.parse_args(["serve", "--engine", "rules,unknown"]))
+    assert type(make_engine(parser.parse_args(["serve", "--engine", "rules,rules"]))).__name__ == "CascadeEngine"
@@ -0,0 +1,122 @@
+"""Tests for the parsing of streamed GPT outputs."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from nl2ltl.engines.gpt import core
+from nl2ltl.engines.gpt.core import (
+    OperationModes,
+    _aprocess_utterance,
+    _estimate_prompt_tokens,
+    _process_utterance,
+    _RequestSettings,
+)
+from nl2ltl.engines.gpt.output import GPTOutput, aparse_gpt_stream, parse_gpt_output, parse_gpt_stream
+from nl2ltl.engines.gpt.scheduler import RequestScheduler
+from nl2ltl.instrumentation import MetricsAggregator, instrument
+
+PIECES = ["PATTERN: resp", "onse\nSYM", "BOLS: Slack, Gmail", "\nNL: ", "an unrelated", " continuation"]
+
+
+class _Stream:
+    """A stream of chunks recording how many were consumed and whether it was closed."""
+
+    def __init__(self, pieces, operation_mode):
+        chat = operation_mode == OperationModes.CHAT.value
+        self.chunks = [
+            SimpleNamespace(
+                choices=[SimpleNamespace(delta=SimpleNamespace(content=p)) if chat else SimpleNamespace(text=p)]
+            )
+            for p in pieces
+        ]
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.consumed += 1
+            yield chunk
+
+    async def __aiter__(self):
+        for chunk in self:
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+class _AsyncStream(_Stream):
+    """An asynchronous stream, closed with a coroutine."""
+
+    async def close(self):
+        self.closed = True
+
+
+class TestStreaming:
+    """Streaming test class."""
+
+    @pytest.mark.parametrize("operation_mode", [OperationModes.CHAT.value, OperationModes.COMPLETION.value])
+    def test_early_close(self, operation_mode):
+        """Test that the stream is closed once both lines are complete."""
+        stream = _Stream(PIECES, operation_mode)
+        assert parse_gpt_stream(stream, operation_mode) == GPTOutput("response", ("Slack", "Gmail"))
+        assert (stream.consumed, stream.closed) == (4, True)
+
+    def test_unterminated_symbols(self):
+        """Test that the last line is parsed when the stream ends without a newline."""
+        stream = _Stream(PIECES[:3], OperationModes.CHAT.value)
+        assert parse_gpt_stream(stream, OperationModes.CHAT.value) == GPTOutput("response", ("Slack", "Gmail"))
+        assert stream.closed
+
+    @pytest.mark.parametrize("text", ["".join(PIECES), "".join(PIECES[:3])])
+    def test_complete_output(self, text):
+        """Test that complete outputs parse as streamed ones, with or without a final newline."""
+        message = SimpleNamespace(content=text)
+        output = SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        assert parse_gpt_output(output, OperationModes.CHAT.value) == GPTOutput("response", ("Slack", "Gmail"))
+
+    def test_async(self):
+        """Test the asynchronous parsing."""
+        stream = _AsyncStream(PIECES, OperationModes.CHAT.value)
+        output = asyncio.run(aparse_gpt_stream(stream, OperationModes.CHAT.value))
+        assert output == GPTOutput("response", ("Slack", "Gmail"))
+        assert (stream.consumed, stream.closed) == (4, True)
+
+    @pytest.mark.parametrize("asynchronous", [False, True])
+    def test_stream_usage_settled(self, monkeypatch, asynchronous):
+        """Test that streamed requests report their estimated usage and settle it on the token bucket."""
+        requests = []
+
+        def create(**request):
+            requests.append(request)
+            return (_AsyncStream if asynchronous else _Stream)(PIECES, OperationModes.CHAT.value)
+
+        async def acreate(**request):
+            return create(**request)
+
+        client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=acreate if asynchronous else create))
+        )
+        client.with_options = lambda **kwargs: client
+        monkeypatch.setattr(core, "_get_client", lambda: client)
+        monkeypatch.setattr(core, "_get_async_client", lambda: client)
+        scheduler = RequestScheduler(tokens_per_minute=1000)
+        metrics = MetricsAggregator()
+        settings = _RequestSettings(
+            "gpt-4", "PROMPT\n", OperationModes.CHAT.value, 0.5, scheduler=scheduler, stream=True
+        )
+        utterance = "send a Gmail whenever I get a Slack"
+        with instrument(metrics):
+            if asynchronous:
+                output = asyncio.run(_aprocess_utterance(utterance, settings, None))
+            else:
+                output = _process_utterance(utterance, settings, None)
+        assert list(map(str, output)) == ["(Response slack gmail)"]
+        completion_tokens = len("".join(PIECES[:4])) // 4 + 1
+        assert (metrics.prompt_tokens, metrics.completion_tokens) == (
+            _estimate_prompt_tokens(requests[0]),
+            completion_tokens,
+        )
+        used = 1000 - scheduler._token_bucket.level
+        assert used == pytest.approx(metrics.prompt_tokens + completion_tokens, abs=1)
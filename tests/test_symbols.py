@@ -0,0 +1,129 @@
+"""Tests for the symbol extractor."""
+import json
+
+import pytest
+
+from nl2ltl.declare.serialization import parse_template
+from nl2ltl.engines.gpt.core import PROMPT_PATH
+from nl2ltl.engines.gpt.output import GPTOutput, correct_gpt_output, parse_gpt_result
+from nl2ltl.engines.rasa.output import RasaOutput, correct_rasa_output, parse_rasa_result
+from nl2ltl.engines.symbols import SymbolExtractor, atom_name
+
+from .conftest import UtterancesFixtures
+
+SYMBOLS = ["Slack", "Gmail", "Sales", "Salesforce", "SAP and Salesforce", "Microsoft Teams", "Amazon S3", "Eventbrite"]
+
+
+class TestSymbols:
+    """Symbol extractor test class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup any state specific to the execution of the given class (which
+        usually contains tests).
+        """
+        cls.extractor = SymbolExtractor(SYMBOLS)
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("whenever I get a Slack, send a Gmail.", ["Slack", "Gmail"]),
+            ("Synchronize data between SAP and Salesforce", ["SAP and Salesforce"]),
+            ("ping Microsoft Teams, then Salesforce and Sales", ["Microsoft Teams", "Salesforce", "Sales"]),
+            ("upload to Amazon S3 twice", ["Amazon S3"]),
+            ("Slackers and SalesforceX are not symbols, slack is", []),
+            ("Slack Slack", ["Slack", "Slack"]),
+        ],
+    )
+    def test_extract(self, text, expected):
+        """Test leftmost-longest, whole-word extraction of multi-word symbols."""
+        assert self.extractor.extract(text) == expected
+
+    def test_finditer_and_mask(self):
+        """Test the mention offsets and masking."""
+        text = "send Amazon S3 to Microsoft Teams"
+        assert list(self.extractor.finditer(text)) == [(5, 14, "Amazon S3"), (18, 33, "Microsoft Teams")]
+        assert self.extractor.mask(text, "{}") == "send {} to {}"
+
+    def test_extract_many(self):
+        """Test that batch extraction matches the extraction of each utterance."""
+        expected = [self.extractor.extract(utterance) for utterance in UtterancesFixtures.utterances]
+        assert self.extractor.extract_many(UtterancesFixtures.utterances) == expected
+
+    def test_ignore_case(self):
+        """Test that case-insensitive extraction returns the canonical spelling."""
+        extractor = SymbolExtractor(SYMBOLS, ignore_case=True)
+        assert extractor.extract("send a SLACK to microsoft teams") == ["Slack", "Microsoft Teams"]
+        assert "Slack" in extractor and "slack" not in extractor
+
+    def test_empty_vocabulary(self):
+        """Test that an empty vocabulary extracts nothing."""
+        assert SymbolExtractor([]).extract("Slack") == []
+        assert SymbolExtractor([]).correct(["Slack"], "Slack") == []
+
+    @pytest.mark.parametrize(
+        "symbol, expected",
+        [
+            ("slack", "Slack"),
+            (" Gmail ", "Gmail"),
+            ("a Slack message", "Slack"),
+            ("Slack and Gmail", None),
+            ("X", None),
+        ],
+    )
+    def test_canonical(self, symbol, expected):
+        """Test the mapping of predicted symbols to the vocabulary."""
+        assert self.extractor.canonical(symbol) == expected
+
+    @pytest.mark.parametrize(
+        "entities, utterance, expected",
+        [
+            (["slack", "Gmail"], "whenever I get a Slack, send a Gmail.", ["Slack", "Gmail"]),
+            (["Slack app", "mail"], "whenever I get a Slack, send a Gmail.", ["Slack", "Gmail"]),
+            (["Slack", "Hotmail"], "whenever I get a Slack, send a Hotmail.", ["Slack"]),
+        ],
+    )
+    def test_correct(self, entities, utterance, expected):
+        """Test that unknown symbols are replaced with the mentions, or dropped."""
+        assert self.extractor.correct(entities, utterance) == expected
+
+    def test_correct_outputs(self):
+        """Test the correction of the GPT and Rasa outputs."""
+        utterance = UtterancesFixtures.utterances[0]
+        gpt_output = GPTOutput("Response", ("slack", "the Gmail"))
+        assert correct_gpt_output(gpt_output, utterance, None) is gpt_output
+        assert correct_gpt_output(gpt_output, utterance, self.extractor).entities == ("Slack", "Gmail")
+        rasa_output = RasaOutput(utterance, {"response": 0.9}, {"slack": 0.7, "gmail": 0.8}, {"response": 0.9})
+        assert correct_rasa_output(rasa_output, self.extractor).entities == {"Slack": 0.7, "Gmail": 0.8}
+
+    def test_from_prompt(self):
+        """Test that the vocabulary of the GPT prompt includes its allowed symbols."""
+        extractor = SymbolExtractor.from_prompt(json.loads(PROMPT_PATH.read_text())["prompt"])
+        assert {"Slack", "Microsoft Teams", "SAP and Salesforce"} <= set(extractor.symbols)
+
+    @pytest.mark.parametrize(
+        "symbol, expected",
+        [
+            ("Slack", "slack"),
+            ("SurveyMonkey", "surveyMonkey"),
+            ("Microsoft Teams", "microsoft_Teams"),
+            ("Microsoft Dynamics 365", "microsoft_Dynamics_365"),
+            ("SAP and Salesforce", "sAP_and_Salesforce"),
+            ("365 Apps", "_365_Apps"),
+        ],
+    )
+    def test_atom_name(self, symbol, expected):
+        """Test that symbols are normalized to legal atom names."""
+        assert atom_name(symbol) == expected
+
+    def test_ground_corrected_outputs(self):
+        """Test that outputs corrected to multi-word symbols are grounded to templates."""
+        utterance = "send a Microsoft Teams message whenever I get a Slack"
+        gpt_output = correct_gpt_output(GPTOutput("Response", ("slack", "microsoft teams")), utterance, self.extractor)
+        assert gpt_output.entities == ("Slack", "Microsoft Teams")
+        (template,) = parse_gpt_result(gpt_output)
+        assert str(template) == "(Response slack microsoft_Teams)"
+        assert parse_template(str(template)) is template
+        rasa_output = RasaOutput(utterance, {"existence": 0.9}, {"amazon s3": 0.7}, {"existence": 0.9})
+        (template,) = parse_rasa_result(correct_rasa_output(rasa_output, self.extractor))
+        assert str(template) == "(Existence amazon_S3)"